@@ -1,5 +1,6 @@
 import glob
 import os
+from collections.abc import Iterable
 
 import numpy as np
 import pandas as pd
@@ -7,21 +8,23 @@ import plotly.express as px
 import plotly.graph_objects as go
 from PIL import Image
 
-from src.init_test_data import data_TSPLIB, normalisation, trajet_en_df
+from src.init_test_data import (DOSSIER_CACHE_INSTANCES, instance_TSPLIB,
+                                normalisation_coordonnees, trajet_en_df)
+from src.instance import Instance, en_instance
 
 # Chemin de stockage des différents fichiers numériques
 # On retrouve dans ce dossier l'ensemble des figures crées
 ROOT = "resultats/figures/"
 
 
-def representation_itineraire_web(data: pd.DataFrame, chemins: pd.DataFrame, nom_fichier="") -> go.Figure:
+def representation_itineraire_web(data: pd.DataFrame | Instance, chemins: pd.DataFrame, nom_fichier="") -> go.Figure:
     """Affichage des N villes par des points ainsi que le parcours réalisé
        Le parcours est donné par l'ordre des villes dans le dataframe
 
     Parameters
     ----------
-    data : DataFrame
-        dataframe stockant l'intégralité des coordonnées des villes à parcourir
+    data : Instance | DataFrame
+        instance ou dataframe stockant l'intégralité des coordonnées des villes à parcourir
 
     Returns
     -------
@@ -29,7 +32,8 @@ def representation_itineraire_web(data: pd.DataFrame, chemins: pd.DataFrame, nom
         Graphique de visualisation plolty
     """
     # Affichage des villes
-    fig = px.scatter(data, x='x', y='y', template="simple_white",
+    coordonnees = en_instance(data).coordonnees
+    fig = px.scatter(x=coordonnees[:, 0], y=coordonnees[:, 1], template="simple_white",
                      title="Shortest path found by the algorithm")
 
     # On relie les villes dans le bon ordre
@@ -50,14 +54,14 @@ def representation_itineraire_web(data: pd.DataFrame, chemins: pd.DataFrame, nom
     return fig
 
 
-def representation_reseau(data: pd.DataFrame, neurones: np.ndarray, nom_fichier="") -> go.Figure:
+def representation_reseau(data: pd.DataFrame | Instance, neurones: np.ndarray, nom_fichier="") -> go.Figure:
     """Affichage des N villes par des points ainsi que la projection du réseaux
     de neurones sur l'espace des villes
 
     Parameters
     ----------
-    data : DataFrame
-        dataframe stockant l'intégralité des coordonnées des villes à parcourir (villes normalisées)
+    data : Instance | DataFrame
+        instance ou dataframe stockant l'intégralité des coordonnées des villes à parcourir (villes normalisées)
     reseau_neurones : np.ndarray
         vecteur stockant un réseau de neurone de kohonen
 
@@ -67,14 +71,15 @@ def representation_reseau(data: pd.DataFrame, neurones: np.ndarray, nom_fichier=
         Graphique de visualisation plolty
     """
     # Affichage des villes
-    fig = px.scatter(data, x='x', y='y', template="simple_white",
+    coordonnees = en_instance(data).coordonnees
+    fig = px.scatter(x=coordonnees[:, 0], y=coordonnees[:, 1], template="simple_white",
                      title="Organisation of the Kohonen neurons network")
 
     # On relie les neurones dans le bon ordre
     fig.add_trace(
         go.Scatter(
-            x=[neurone[0] for neurone in neurones],
-            y=[neurone[1] for neurone in neurones],
+            x=neurones[:, 0],
+            y=neurones[:, 1],
             mode='lines+markers',
             showlegend=False)
     )
@@ -109,7 +114,7 @@ def representation_temps_calcul(fichier_csv: str) -> go.Figure:
                   labels={"Nombre de villes": "Number of cities", "Temps de calcul (en s)": "Calculation time (in s)",
                           "Algorithme": 'Algorithm'})
 
-    newnames = {'2-opt': '2-opt inversion', 'plus_proche_voisin': 'Nearest neighbor search',
+    newnames = {'2-opt': '2-opt inversion', '3-opt': 'Or-opt and 3-opt', 'plus_proche_voisin': 'Nearest neighbor search',
                 'genetique': 'Genetic algorithm', 'kohonen': 'Kohonen algorithm'}
     fig.for_each_trace(lambda t: t.update(name=newnames[t.name],
                                           legendgroup=newnames[t.name],
@@ -139,13 +144,13 @@ def representation_resultats(fichier_csv: str) -> go.Figure:
 
     fig = px.box(data, x="Algorithme", y="Distance", color="Algorithme", template='plotly_white',
                  title="Distance of the path found according to the algorithm", points="all",
-                 category_orders={'Algorithme': ['2-opt inversion', 'Nearest neighbor search',
+                 category_orders={'Algorithme': ['2-opt inversion', 'Or-opt and 3-opt', 'Nearest neighbor search',
                                                  'Genetic algorithm', 'Kohonen algorithm']},
                  labels={"Nombre de villes": "Number of cities", "Temps de calcul (en s)": "Calculation time (in s)",
                          "Algorithme": 'Algorithm', "Génétique": 'Genetic'}
                  )
 
-    newnames = {'2-opt': '2-opt inversion', 'plus_proche_voisin': 'Nearest neighbor search',
+    newnames = {'2-opt': '2-opt inversion', '3-opt': 'Or-opt and 3-opt', 'plus_proche_voisin': 'Nearest neighbor search',
                 'genetique': 'Genetic algorithm', 'kohonen': 'Kohonen algorithm'}
     fig.for_each_trace(lambda t: t.update(name=newnames[t.name],
                                           legendgroup=newnames[t.name],
@@ -158,7 +163,7 @@ def representation_resultats(fichier_csv: str) -> go.Figure:
     return fig
 
 
-def affichage(df_resolution: pd.DataFrame, data: pd.DataFrame, nom_fichier="") -> go.Figure:
+def affichage(df_resolution: pd.DataFrame, data: pd.DataFrame | Instance, nom_fichier="") -> go.Figure:
     """Affichage d'un trajet et des performances d'un algorithme
 
     Parameters
@@ -166,8 +171,8 @@ def affichage(df_resolution: pd.DataFrame, data: pd.DataFrame, nom_fichier="") -
     df_resolution : Dataframe
         variable stockant un ensemble de variables importantes pour analyser
         l'algorithme
-    data : DataFrame
-        dataframe stockant l'intégralité des coordonnées des villes à parcourir
+    data : Instance | DataFrame
+        instance ou dataframe stockant l'intégralité des coordonnées des villes à parcourir
     nom_fichier : str (optionnel)
         nom du fichier si on souhaite sauvegarder la figure crée
 
@@ -198,13 +203,14 @@ def affichage(df_resolution: pd.DataFrame, data: pd.DataFrame, nom_fichier="") -
     return fig
 
 
-def affichage_chemins_explores(exploration: list[list[int]], algorithme: str, dataset: str):
+def affichage_chemins_explores(exploration: Iterable[list[int]], algorithme: str, dataset: str):
     """Sauvegarde des figures des trajets explorés au format `.png` par un algorithme 
 
     Parameters
     ----------
-    exploration : list[list[int]]
-        variable retraçant la méthode d'exploration de l'algorithme
+    exploration : TraceExploration | list[list[int]]
+        variable retraçant la méthode d'exploration de l'algorithme. Les chemins d'une
+        trace sont reconstruits un par un au fil de l'affichage
     algorithme : str
         nom de l'algorithme à traiter
     dataset : str 
@@ -215,8 +221,8 @@ def affichage_chemins_explores(exploration: list[list[int]], algorithme: str, da
     # chemins_explores = df_resolution.loc[(df_resolution["Algorithme"] == algorithme) & (
     #   df_resolution["Nom dataset"] == dataset)]["Chemins explorés"]
 
-    # On génère le dataframe associé à ce dataset
-    data = data_TSPLIB(f'data/{dataset}.tsp')
+    # On charge l'instance associée à ce dataset
+    data = instance_TSPLIB(f'data/{dataset}.tsp', dossier_cache=DOSSIER_CACHE_INSTANCES)
     # Pour chaque chemin exploré nous allons sauvegarder la figure associée
     for index, chemin in enumerate(exploration):
         df_trajet_explore = trajet_en_df(chemin, data)
@@ -243,11 +249,10 @@ def affichage_reseau_neurones(exploration: list[np.ndarray], algorithme: str, da
     # chemins_explores = df_resolution.loc[(df_resolution["Algorithme"] == algorithme) & (
     #   df_resolution["Nom dataset"] == dataset)]["Chemins explorés"]
 
-    # On génère le dataframe associé à ce dataset
-    data = data_TSPLIB(f'data/{dataset}.tsp')
+    # On charge l'instance associée à ce dataset
+    data = instance_TSPLIB(f'data/{dataset}.tsp', dossier_cache=DOSSIER_CACHE_INSTANCES)
     # On crée des villes artificielles normalisées pour être en cohérence avec le domaine des poids des neurones [0,1]
-    villes = data.copy()
-    villes[['x', 'y']] = normalisation(villes[['x', 'y']])
+    villes = Instance(normalisation_coordonnees(data.coordonnees), data.nom)
     # Pour chaque orgnisation du réseau nous allons sauvegarder la figure associée
     for index, reseau in enumerate(exploration):
         fig = representation_reseau(villes, reseau)
@@ -1,9 +1,12 @@
 import time
+from collections import deque
 
 import numpy as np
 import pandas as pd
 
-from src.distance import distance_trajet
+from src.distance import DistancesCoordonnees, distance_trajet
+from src.exploration import TraceExploration
+from src.instance import distances_instance
 
 
 # En s'inspirant de la documentation wikipedia sur le 2-opt pour résoudre le TSP, nous
@@ -14,6 +17,23 @@ from src.distance import distance_trajet
 
 # Cf. https://fr.wikipedia.org/wiki/2-opt
 
+# Pour les grandes instances on restreint la recherche aux k plus proches voisins de chaque
+# ville et on utilise des "don't-look bits" : seules les villes proches d'une modification
+# récente sont ré-examinées.
+
+# Cf. Bentley, J. L. (1992). Fast algorithms for geometric traveling salesman problems.
+
+# Nombre de plus proches voisins considérés pour chaque ville
+NOMBRE_VOISINS = 10
+
+# Nombre de lignes de la matrice des distances traitées à la fois lors de la
+# construction des listes de voisins
+TAILLE_BLOC_VOISINS = 1024
+
+# Gain minimal pour accepter une inversion. En dessous on considère que le gain n'est
+# dû qu'aux erreurs d'arrondi et la recherche pourrait boucler indéfiniment
+EPSILON = 1e-7
+
 
 def gain(matrice_distance: np.ndarray, chemin_actuel: list[int], i: int, j: int) -> float:
     """Gain de distance en parcourant en sens inverse une suite de villes.
@@ -24,10 +44,11 @@ def gain(matrice_distance: np.ndarray, chemin_actuel: list[int], i: int, j: int)
 
     Parameters
     ----------
-    matrice_distance : np.ndarray
+    matrice_distance : np.ndarray | DistancesCoordonnees
         matrice stockant l'integralité des distances inter villes
     chemin_actuel : list[int]
-        suite de villes donnant le chemin initialement parcouru (le che)
+        suite de villes donnant le chemin initialement parcouru (le che). Si le
+        chemin n'est pas fermé, la ville suivant la dernière est la première
     i : int
         indice de la ville où commence l'inversion
     j : int
@@ -42,7 +63,7 @@ def gain(matrice_distance: np.ndarray, chemin_actuel: list[int], i: int, j: int)
     avant_permutation = chemin_actuel[i-1]
     debut_permutation = chemin_actuel[i]
     fin_permutation = chemin_actuel[j]
-    apres_permuation = chemin_actuel[j+1]
+    apres_permuation = chemin_actuel[(j+1) % len(chemin_actuel)]
 
     # Distance avant inversion
     distance_initiale = matrice_distance[avant_permutation, debut_permutation
@@ -76,10 +97,84 @@ def inversion(liste: list, debut_inversion: int, fin_inversion: int) -> list:
     return nouvelle_liste
 
 
-def deux_opt(itineraire_initial: list[int], matrice_distance: np.ndarray) -> tuple[list[int], float, list[list[int]]]:
+def inversion_cyclique(tour: np.ndarray | list[int], position: np.ndarray | None, debut_inversion: int,
+                       fin_inversion: int):
+    """Inversion en place d'une portion d'un tour vu comme un cycle
+
+    La portion peut faire le tour du tableau : si `debut_inversion > fin_inversion`
+    on inverse les villes de `debut_inversion` jusqu'à la fin puis du début jusqu'à
+    `fin_inversion`. Inverser une portion ou son complémentaire donne le même cycle,
+    on inverse donc toujours le plus court des deux côtés.
+
+    Parameters
+    ----------
+    tour : np.ndarray | list[int]
+        suite de villes du cycle, sans répétition de la première ville à la fin. Une
+        liste est inversée par tranches, sans passer par NumPy
+    position : np.ndarray | None
+        position de chaque ville dans `tour`, mise à jour en place. Elle n'est pas
+        suivie si elle vaut None
+    debut_inversion : int
+        position de la première ville de la portion à inverser
+    fin_inversion : int
+        position de la dernière ville de la portion à inverser
+    """
+    nombre_ville = len(tour)
+    longueur = (fin_inversion - debut_inversion) % nombre_ville + 1
+    if 2 * longueur > nombre_ville:
+        # On inverse le complémentaire de la portion
+        debut_inversion, fin_inversion = fin_inversion + 1, debut_inversion - 1
+        longueur = nombre_ville - longueur
+    if longueur < 2:
+        return
+    if isinstance(tour, list):
+        debut_inversion %= nombre_ville
+        fin = debut_inversion + longueur
+        if fin <= nombre_ville:
+            tour[debut_inversion:fin] = tour[debut_inversion:fin][::-1]
+        else:
+            # La portion fait le tour de la liste
+            villes = (tour[debut_inversion:] + tour[:fin - nombre_ville])[::-1]
+            tour[debut_inversion:] = villes[:nombre_ville - debut_inversion]
+            tour[:fin - nombre_ville] = villes[nombre_ville - debut_inversion:]
+        if position is not None:
+            for index in range(debut_inversion, fin):
+                position[tour[index % nombre_ville]] = index % nombre_ville
+        return
+    index = np.arange(debut_inversion, debut_inversion + longueur) % nombre_ville
+    tour[index] = tour[index[::-1]]
+    if position is not None:
+        position[tour[index]] = index
+
+
+def chemin_ferme(tour: np.ndarray, ville_depart: int) -> list[int]:
+    """Conversion d'un tour en itinéraire commençant et finissant par `ville_depart`
+
+    Parameters
+    ----------
+    tour : np.ndarray
+        suite de villes du cycle, sans répétition de la première ville à la fin
+    ville_depart : int
+        ville par laquelle doit commencer l'itinéraire
+
+    Returns
+    -------
+    list[int]
+        l'itinéraire fermé
+    """
+    depart = int(np.flatnonzero(tour == ville_depart)[0])
+    itineraire = np.roll(tour, -depart).tolist()
+    itineraire.append(itineraire[0])
+    return itineraire
+
+
+def deux_opt(itineraire_initial: list[int], matrice_distance: np.ndarray, trace=None,
+             arret=None) -> tuple[list[int], float, TraceExploration | None]:
     """Recherche de deux arêtes sécantes.
 
-    Cette fonction implémente l'algorithme 2-opt décrit sur wikipédia.
+    Cette fonction implémente l'algorithme 2-opt décrit sur wikipédia. Le parcours
+    quadratique des inversions lit le tour dans une liste d'entiers Python, inversée en
+    place, et la distance parcourue est mise à jour à partir du gain de chaque inversion.
 
     Parameters
     ----------
@@ -88,6 +183,12 @@ def deux_opt(itineraire_initial: list[int], matrice_distance: np.ndarray) -> tup
         sur le temps de calcul.
     matrice_distance : np.ndarray
         matrice stockant l'integralité des distances inter villes
+    trace : TraceExploration (optionnel)
+        trace dans laquelle enregistrer les chemins explorés. Rien n'est enregistré
+        par défaut
+    arret : CritereArret (optionnel)
+        budget de la recherche, une itération par ville de début d'inversion. Le tour
+        courant est rendu dès qu'il est épuisé
 
     Returns
     -------
@@ -95,66 +196,404 @@ def deux_opt(itineraire_initial: list[int], matrice_distance: np.ndarray) -> tup
         le chemin final trouvé
     temps_calcul : float
         temps necessaire à la résolution du problème
-    chemins_explores : list[list[int]]
-        stockage de l'ensemble des chemins explorés
+    trace : TraceExploration | None
+        trace des chemins explorés
     """
     start_time = time.time()
 
     # Variable d'arrêt de la recherche d'arêtes sécantes
     amelioration = True
 
+    # On travaille sur le cycle sans la répétition de la ville de départ, dans une liste :
+    # lire un élément d'un tableau NumPy coûte bien plus cher dans la double boucle
+    tour = [int(ville) for ville in itineraire_initial[:-1]]
+    nombre_ville = len(tour)
+
     # Stockage du meilleur résultat courant
-    meilleur_chemin = itineraire_initial
-    meilleur_distance = distance_trajet(meilleur_chemin, matrice_distance)
-    nombre_ville = len(meilleur_chemin)
+    meilleur_distance = distance_trajet(itineraire_initial, matrice_distance)
+    if arret is not None:
+        arret.amelioration(meilleur_distance)
 
-    # Stockage de l'ensemble des trajets explorés
-    chemins_explores = [meilleur_chemin]
+    # Enregistrement des trajets explorés
+    if trace is not None:
+        trace.depart(itineraire_initial)
 
     while amelioration:
         amelioration = False
-        for debut_inversion in range(1, nombre_ville - 2):
-            for fin_inversion in range(debut_inversion + 1, nombre_ville - 1):
+        for debut_inversion in range(1, nombre_ville - 1):
+            if arret is not None and not arret.continuer():
+                amelioration = False
+                break
+            # Les distances depuis les deux villes fixes de l'inversion sont lues une
+            # fois par ligne, l'évaluation du gain est celle de `gain`
+            ville_a = tour[debut_inversion - 1]
+            distances_a = np.asarray(matrice_distance[ville_a]).tolist()
+            ville_b = tour[debut_inversion]
+            distances_b = np.asarray(matrice_distance[ville_b]).tolist()
+            for fin_inversion in range(debut_inversion + 1, nombre_ville):
                 # Evaluation du gain de l'inversion
-                if (gain(matrice_distance, meilleur_chemin, debut_inversion, fin_inversion)) > 0:
-                    nouveau_chemin = inversion(
-                        meilleur_chemin, debut_inversion, fin_inversion)
-                    nouvelle_distance = distance_trajet(
-                        nouveau_chemin, matrice_distance)
-
-                    if (nouvelle_distance < meilleur_distance):
-                        meilleur_chemin = nouveau_chemin
-                        meilleur_distance = nouvelle_distance
-                        chemins_explores.append(nouveau_chemin)
-                        amelioration = True
+                ville_c = tour[fin_inversion]
+                ville_d = tour[(fin_inversion + 1) % nombre_ville]
+                gain_inversion = (distances_a[ville_b] + matrice_distance[ville_c, ville_d]) - \
+                    (distances_a[ville_c] + distances_b[ville_d])
+                if gain_inversion > EPSILON:
+                    inversion_cyclique(
+                        tour, None, debut_inversion, fin_inversion)
+                    # L'inversion a pu porter sur le complémentaire et déplacer a
+                    ville_a = tour[debut_inversion - 1]
+                    distances_a = np.asarray(matrice_distance[ville_a]).tolist()
+                    ville_b = tour[debut_inversion]
+                    distances_b = np.asarray(matrice_distance[ville_b]).tolist()
+                    # La nouvelle distance se déduit directement du gain
+                    meilleur_distance -= gain_inversion
+                    if arret is not None:
+                        arret.amelioration(meilleur_distance)
+                    if trace is not None:
+                        trace.inversion(debut_inversion, fin_inversion)
+                        trace.instantane()
+                    amelioration = True
+
+    meilleur_chemin = chemin_ferme(np.array(tour, dtype=np.intp), itineraire_initial[0])
 
     temps_calcul = time.time() - start_time
-    return meilleur_chemin, temps_calcul, chemins_explores
+    return meilleur_chemin, temps_calcul, trace
 
 
-def main(matrice_distance: np.ndarray, chemin_initial: list, nom_dataset="") -> tuple[pd.DataFrame, list[list[int]]]:
-    """Lancement de l'algorithme de recherche
+def gains_inversions(matrice_distance: np.ndarray, tour: np.ndarray, i: int) -> np.ndarray:
+    """Gains de toutes les inversions commençant à l'indice `i`.
+
+    Version vectorisée de `gain` : les gains des inversions `(i, j)` pour tous les
+    `j > i` sont calculés en une seule indexation de `matrice_distance`.
 
     Parameters
     ----------
-    data : DataFrame
-        Dataframe stockant l'intégralité des coordonnées des villes à parcourir
     matrice_distance : np.ndarray
         matrice stockant l'integralité des distances inter villes
+    tour : np.ndarray
+        suite de villes du cycle, sans répétition de la première ville à la fin
+    i : int
+        indice de la ville où commence l'inversion
+
+    Returns
+    -------
+    np.ndarray
+        le gain de l'inversion `(i, j)` à l'indice `j - i - 1`
+    """
+    avant_permutation = tour[i-1]
+    debut_permutation = tour[i]
+    fins_permutation = tour[i+1:]
+    apres_permutation = np.roll(tour, -1)[i+1:]
+
+    # Distance avant inversion
+    distance_initiale = matrice_distance[avant_permutation, debut_permutation] + \
+        matrice_distance[fins_permutation, apres_permutation]
+    # Distance après inversion
+    distance_finale = matrice_distance[avant_permutation, fins_permutation] + \
+        matrice_distance[debut_permutation, apres_permutation]
+    return distance_initiale - distance_finale
+
+
+def deux_opt_balayage(itineraire_initial: list[int], matrice_distance: np.ndarray,
+                      premiere_amelioration=False, trace=None, arret=None) -> tuple[list[int], float, TraceExploration | None]:
+    """2-opt par balayage vectorisé des lignes de la matrice des distances.
+
+    Pour chaque indice `i`, les gains de toutes les inversions `(i, j)` sont évalués
+    d'un coup avec `gains_inversions`, puis on applique la meilleure inversion
+    (best-improvement) ou la première inversion rentable.
+
+    Parameters
+    ----------
+    itineraire_initial : list[int]
+        suite de villes donnant le chemin parcouru, la première ville étant répétée
+        à la fin
+    matrice_distance : np.ndarray
+        matrice stockant l'integralité des distances inter villes
+    premiere_amelioration : bool (optionnel)
+        si vrai on applique la première inversion rentable plutôt que la meilleure
+    trace : TraceExploration (optionnel)
+        trace dans laquelle enregistrer les chemins explorés. Rien n'est enregistré
+        par défaut
+    arret : CritereArret (optionnel)
+        budget de la recherche, une itération par ville de début d'inversion. Le tour
+        courant est rendu dès qu'il est épuisé
+
+    Returns
+    -------
+    chemin : list[int]
+        le chemin final trouvé
+    temps_calcul : float
+        temps necessaire à la résolution du problème
+    trace : TraceExploration | None
+        trace des chemins explorés
+    """
+    start_time = time.time()
+
+    # Variable d'arrêt de la recherche d'arêtes sécantes
+    amelioration = True
+
+    # On travaille sur le cycle sans la répétition de la ville de départ
+    tour = np.array(itineraire_initial[:-1], dtype=np.intp)
+    nombre_ville = len(tour)
+    position = np.empty(nombre_ville, dtype=np.intp)
+    position[tour] = np.arange(nombre_ville)
+
+    # La distance courante n'est suivie que pour le critère d'arrêt
+    if arret is not None:
+        distance_courante = distance_trajet(itineraire_initial, matrice_distance)
+        arret.amelioration(distance_courante)
+
+    # Enregistrement des trajets explorés
+    if trace is not None:
+        trace.depart(itineraire_initial)
+
+    while amelioration:
+        amelioration = False
+        for debut_inversion in range(1, nombre_ville - 1):
+            if arret is not None and not arret.continuer():
+                amelioration = False
+                break
+            gains = gains_inversions(matrice_distance, tour, debut_inversion)
+            if premiere_amelioration:
+                rang = int(np.argmax(gains > EPSILON))
+            else:
+                rang = int(np.argmax(gains))
+            if gains[rang] > EPSILON:
+                fin_inversion = debut_inversion + 1 + rang
+                inversion_cyclique(tour, position, debut_inversion, fin_inversion)
+                if arret is not None:
+                    distance_courante -= gains[rang]
+                    arret.amelioration(distance_courante)
+                if trace is not None:
+                    trace.inversion(debut_inversion, fin_inversion)
+                    trace.instantane()
+                amelioration = True
+
+    meilleur_chemin = chemin_ferme(tour, itineraire_initial[0])
+
+    temps_calcul = time.time() - start_time
+    return meilleur_chemin, temps_calcul, trace
+
+
+def liste_voisins(matrice_distance: np.ndarray, nombre_voisins: int) -> np.ndarray:
+    """Recherche des k plus proches voisins de chaque ville.
+
+    La diagonale de la matrice des distances étant infinie, une ville n'est jamais
+    sa propre voisine. Lorsque les distances sont calculées à la demande, on utilise
+    un arbre k-d sur les coordonnées plutôt que de parcourir toutes les lignes.
+
+    Parameters
+    ----------
+    matrice_distance : np.ndarray | DistancesCoordonnees
+        matrice stockant l'integralité des distances inter villes
+    nombre_voisins : int
+        nombre de voisins à conserver par ville
+
+    Returns
+    -------
+    np.ndarray
+        matrice de dimension (nombre de villes, k) des index des voisins de chaque ville
+        triés par distance croissante
+    """
+    if isinstance(matrice_distance, DistancesCoordonnees):
+        return matrice_distance.plus_proches_voisins(nombre_voisins)
+
+    nombre_ville = len(matrice_distance)
+    k = min(nombre_voisins, nombre_ville - 1)
+    voisins = np.empty((nombre_ville, k), dtype=np.intp)
+
+    # Traitement par blocs de lignes pour ne pas dupliquer la matrice en mémoire
+    for debut in range(0, nombre_ville, TAILLE_BLOC_VOISINS):
+        fin = min(debut + TAILLE_BLOC_VOISINS, nombre_ville)
+        bloc = np.asarray(matrice_distance[debut:fin])
+        candidats = np.argpartition(bloc, k - 1, axis=1)[:, :k]
+        # On trie les k candidats par distance croissante
+        ordre = np.argsort(np.take_along_axis(bloc, candidats, axis=1), axis=1)
+        voisins[debut:fin] = np.take_along_axis(candidats, ordre, axis=1)
+    return voisins
+
+
+def deux_opt_voisins(itineraire_initial: list[int], matrice_distance: np.ndarray,
+                     nombre_voisins=NOMBRE_VOISINS, trace=None, voisins=None,
+                     budget=None, arret=None) -> tuple[list[int], float, TraceExploration | None]:
+    """2-opt restreint aux plus proches voisins avec des don't-look bits.
+
+    Pour une ville `a` et son successeur `b`, on ne tente que les inversions créant
+    l'arête `(a, c)` avec `c` parmi les k plus proches voisins de `a`. Une ville n'est
+    ré-examinée que si l'une de ses arêtes a été modifiée (file des villes actives).
+    La recherche peut être bornée par un nombre maximal de villes examinées.
+
+    Parameters
+    ----------
+    itineraire_initial : list[int]
+        suite de villes donnant le chemin parcouru, la première ville étant répétée
+        à la fin
+    matrice_distance : np.ndarray
+        matrice stockant l'integralité des distances inter villes
+    nombre_voisins : int (optionnel)
+        nombre de plus proches voisins considérés pour chaque ville
+    trace : TraceExploration (optionnel)
+        trace dans laquelle enregistrer les chemins explorés. Rien n'est enregistré
+        par défaut
+    voisins : np.ndarray (optionnel)
+        listes de voisins déjà calculées par `liste_voisins`, pour ne pas les
+        recalculer à chaque appel sur la même instance
+    budget : int (optionnel)
+        nombre maximal de villes examinées, sans limite par défaut
+    arret : CritereArret (optionnel)
+        budget de la recherche, une itération par ville examinée. Le tour courant est
+        rendu dès qu'il est épuisé
+
+    Returns
+    -------
+    chemin : list[int]
+        le chemin final trouvé, commençant et finissant par la même ville que
+        l'itinéraire initial
+    temps_calcul : float
+        temps necessaire à la résolution du problème
+    trace : TraceExploration | None
+        trace des chemins explorés
+    """
+    start_time = time.time()
+
+    # On travaille sur le cycle sans la répétition de la ville de départ
+    tour = np.array(itineraire_initial[:-1], dtype=np.intp)
+    nombre_ville = len(tour)
+
+    # Enregistrement des trajets explorés
+    if trace is not None:
+        trace.depart(itineraire_initial)
+
+    if nombre_ville < 4:
+        return list(itineraire_initial), time.time() - start_time, trace
+
+    position = np.empty(nombre_ville, dtype=np.intp)
+    position[tour] = np.arange(nombre_ville)
+
+    if voisins is None:
+        voisins = liste_voisins(matrice_distance, nombre_voisins)
+    # Les distances aux voisins sont lues une seule fois sous forme de listes Python
+    distances_voisins = np.asarray(
+        matrice_distance[np.arange(nombre_ville)[:, np.newaxis], voisins]).tolist()
+    voisins = voisins.tolist()
+
+    # File des villes actives : leur don't-look bit est éteint
+    villes_actives = deque(tour.tolist())
+    est_active = [True] * nombre_ville
+    villes_examinees = 0
+
+    # La distance courante n'est suivie que pour le critère d'arrêt
+    if arret is not None:
+        distance_courante = distance_trajet(itineraire_initial, matrice_distance)
+        arret.amelioration(distance_courante)
+
+    while villes_actives and (budget is None or villes_examinees < budget):
+        if arret is not None and not arret.continuer():
+            break
+        ville_a = villes_actives.popleft()
+        est_active[ville_a] = False
+        villes_examinees += 1
+
+        # On essaie successivement l'arête vers le successeur puis vers le prédécesseur
+        for sens in (1, -1):
+            position_a = position[ville_a]
+            ville_b = tour[(position_a + sens) % nombre_ville]
+            distance_ab = matrice_distance[ville_a, ville_b]
+            amelioration = False
+
+            for ville_c, distance_ac in zip(voisins[ville_a], distances_voisins[ville_a]):
+                # Les voisins sont triés : au delà, l'arête (a, c) ne peut plus être rentable
+                if distance_ac >= distance_ab:
+                    break
+                position_c = position[ville_c]
+                ville_d = tour[(position_c + sens) % nombre_ville]
+                if ville_c == ville_b or ville_d == ville_a:
+                    continue
+                gain_inversion = distance_ab + matrice_distance[ville_c, ville_d] - \
+                    distance_ac - matrice_distance[ville_b, ville_d]
+                if gain_inversion > EPSILON:
+                    # a b ... c d devient a c ... b d (et symétriquement pour le prédécesseur)
+                    if sens == 1:
+                        debut_inversion = (position_a + 1) % nombre_ville
+                        fin_inversion = position_c
+                    else:
+                        debut_inversion = position_c
+                        fin_inversion = (position_a - 1) % nombre_ville
+                    inversion_cyclique(tour, position, debut_inversion, fin_inversion)
+                    if arret is not None:
+                        distance_courante -= gain_inversion
+                        arret.amelioration(distance_courante)
+                    if trace is not None:
+                        trace.inversion(debut_inversion, fin_inversion)
+                        trace.instantane()
+                    # Les extrémités des arêtes modifiées redeviennent actives
+                    for ville in (ville_a, ville_b, ville_c, ville_d):
+                        if not est_active[ville]:
+                            est_active[ville] = True
+                            villes_actives.append(ville)
+                    amelioration = True
+                    break
+            if amelioration:
+                break
+
+    # Le chemin final commence par la même ville que l'itinéraire initial
+    meilleur_chemin = chemin_ferme(tour, itineraire_initial[0])
+
+    temps_calcul = time.time() - start_time
+    return meilleur_chemin, temps_calcul, trace
+
+
+# Stratégies de recherche utilisables depuis `main`
+STRATEGIES = {
+    'complet': deux_opt,
+    'voisins': deux_opt_voisins,
+    'balayage': deux_opt_balayage,
+}
+
+
+def main(matrice_distance: np.ndarray, chemin_initial: list, nom_dataset="", strategie="complet",
+         enregistrer_exploration=False, arret=None, **parametres) -> tuple[pd.DataFrame, TraceExploration | None]:
+    """Lancement de l'algorithme de recherche
+
+    Parameters
+    ----------
+    matrice_distance : np.ndarray | DistancesCoordonnees | Instance
+        matrice stockant l'integralité des distances inter villes, ou l'instance dont
+        on utilise les distances
+    chemin_initial : list
+        chemin à améliorer, la première ville étant répétée à la fin
     nom_dataset : str (optionnel)
         nom du dataset à traiter
+    strategie : str (optionnel)
+        stratégie de recherche parmi les clés de `STRATEGIES` : `'complet'` parcourt
+        toutes les paires d'arêtes, `'voisins'` se restreint aux plus proches voisins,
+        `'balayage'` évalue toutes les inversions d'une ville d'un seul coup
+    enregistrer_exploration : bool (optionnel)
+        si vrai les chemins explorés sont enregistrés pour être affichés
+    arret : CritereArret (optionnel)
+        budget en temps, en itérations et en stagnation de la recherche. Sans
+        budget, la recherche s'arrête sur un optimum local
+    **parametres
+        paramètres optionnels propres à la stratégie choisie (par exemple
+        `nombre_voisins` ou `premiere_amelioration`)
 
     Returns
     -------
     df_resultat_test : Dataframe
         variable stockant un ensemble de variables importantes pour analyser
         l'algorithme
-    chemins_explores : list[list[int]]
-        variable retraçant les chemins explorés par l'algorithme
+    trace : TraceExploration | None
+        variable retraçant les chemins explorés par l'algorithme, None si elle
+        n'est pas enregistrée
     """
+    assert strategie in STRATEGIES, print(
+        "Veuillez choisir une stratégie parmi : {}".format(list(STRATEGIES)))
+
+    matrice_distance = distances_instance(matrice_distance)
+
     # Résolution du TSP
-    itineraire, temps_calcul, chemins_explores = deux_opt(
-        chemin_initial, matrice_distance)
+    trace = TraceExploration() if enregistrer_exploration else None
+    itineraire, temps_calcul, trace = STRATEGIES[strategie](
+        chemin_initial, matrice_distance, trace=trace, arret=arret, **parametres)
 
     # Calcul de la distance du trajet final trouvé par l'algorithme
     distance_chemin_sub_optimal = distance_trajet(itineraire, matrice_distance)
@@ -172,4 +611,4 @@ def main(matrice_distance: np.ndarray, chemin_initial: list, nom_dataset="") ->
         'Temps de calcul (en s)': temps_calcul
     })
 
-    return df_resultat_test, chemins_explores
+    return df_resultat_test, trace
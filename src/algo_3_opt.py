@@ -0,0 +1,439 @@
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+import src.algo_2_opt
+from src.algo_2_opt import (EPSILON, NOMBRE_VOISINS, chemin_ferme,
+                            inversion_cyclique, liste_voisins)
+from src.distance import distance_trajet
+from src.exploration import TraceExploration
+from src.instance import distances_instance
+
+# Le 2-opt reste bloqué dans des optimums locaux qu'un simple déplacement de segment
+# permet de quitter. On implémente ici deux mouvements complémentaires, tous deux évalués
+# en temps constant à partir de la matrice des distances :
+# - le Or-opt qui déplace une suite de 1 à 3 villes consécutives à un autre endroit du
+#   trajet (éventuellement en la renversant)
+# - un 3-opt restreint qui échange deux segments consécutifs sans les renverser
+# Comme pour `algo_2_opt.deux_opt_voisins` les mouvements testés sont restreints aux plus
+# proches voisins des villes et seules les villes proches d'une modification récente sont
+# ré-examinées.
+
+# Cf. Or, I. (1976). Traveling salesman-type combinatorial problems and their relation to
+# the logistics of regional blood banking.
+# Cf. https://en.wikipedia.org/wiki/3-opt
+
+# Longueur maximale des segments déplacés par le Or-opt
+LONGUEUR_SEGMENT_MAX = 3
+
+
+def echange_segments(tour: np.ndarray, position: np.ndarray, debut_a: int, debut_b: int, debut_c: int):
+    """Echange en place de deux segments consécutifs d'un tour vu comme un cycle
+
+    Le cycle est découpé en trois segments `A = [debut_a, debut_b)`,
+    `B = [debut_b, debut_c)` et `C = [debut_c, debut_a)` (indices pris modulo le nombre
+    de villes). Le cycle `A B C` devient `B A C`. Comme `B A C`, `A C B` et `C B A`
+    représentent le même cycle, on ne déplace que les deux segments les plus courts.
+
+    Parameters
+    ----------
+    tour : np.ndarray
+        suite de villes du cycle, sans répétition de la première ville à la fin
+    position : np.ndarray
+        position de chaque ville dans `tour`, mise à jour en place
+    debut_a : int
+        position de la première ville du segment A
+    debut_b : int
+        position de la première ville du segment B
+    debut_c : int
+        position de la première ville du segment C
+    """
+    nombre_ville = len(tour)
+    longueur_a = (debut_b - debut_a) % nombre_ville
+    longueur_b = (debut_c - debut_b) % nombre_ville
+    longueur_c = nombre_ville - longueur_a - longueur_b
+
+    # Choix des deux segments consécutifs les plus courts à échanger
+    debut, longueur_premier, longueur_second = min(
+        (debut_a, longueur_a, longueur_b),
+        (debut_b, longueur_b, longueur_c),
+        (debut_c, longueur_c, longueur_a),
+        key=lambda echange: echange[1] + echange[2])
+
+    index = np.arange(debut, debut + longueur_premier +
+                      longueur_second) % nombre_ville
+    villes = tour[index]
+    tour[index] = np.concatenate(
+        (villes[longueur_premier:], villes[:longueur_premier]))
+    position[tour[index]] = index
+
+
+def activation(villes: tuple, villes_actives: deque, est_active: list[bool]):
+    """Extinction des don't-look bits des villes dont une arête vient d'être modifiée
+
+    Parameters
+    ----------
+    villes : tuple
+        villes à ré-examiner
+    villes_actives : deque
+        file des villes à examiner
+    est_active : list[bool]
+        état de chaque ville, vrai si elle est déjà dans la file
+    """
+    for ville in villes:
+        if not est_active[ville]:
+            est_active[ville] = True
+            villes_actives.append(ville)
+
+
+def or_opt(itineraire_initial: list[int], matrice_distance: np.ndarray, nombre_voisins=NOMBRE_VOISINS,
+           longueur_max=LONGUEUR_SEGMENT_MAX, trace=None, voisins=None,
+           arret=None) -> tuple[list[int], float, TraceExploration | None]:
+    """Déplacement de segments de 1 à `longueur_max` villes.
+
+    Pour un segment `s1 ... s2` encadré par `p` et `n`, on le retire (nouvelle arête
+    `(p, n)`) pour l'insérer entre une ville `c` voisine de `s1` ou de `s2` et l'une des
+    villes qui l'entourent, `c` étant reliée à l'extrémité dont elle est voisine.
+    Les voisins étant triés, on s'arrête dès que la nouvelle arête `(s, c)` coûte plus
+    que le gain du retrait du segment.
+
+    Parameters
+    ----------
+    itineraire_initial : list[int]
+        suite de villes donnant le chemin parcouru, la première ville étant répétée
+        à la fin
+    matrice_distance : np.ndarray
+        matrice stockant l'integralité des distances inter villes
+    nombre_voisins : int (optionnel)
+        nombre de plus proches voisins considérés pour chaque ville
+    longueur_max : int (optionnel)
+        nombre maximal de villes d'un segment déplacé
+    trace : TraceExploration (optionnel)
+        trace dans laquelle enregistrer les chemins explorés. Rien n'est enregistré
+        par défaut
+    voisins : np.ndarray (optionnel)
+        listes de voisins déjà calculées par `liste_voisins`, pour ne pas les
+        recalculer à chaque appel sur la même instance
+    arret : CritereArret (optionnel)
+        budget de la recherche, une itération par ville examinée. Le tour courant est
+        rendu dès qu'il est épuisé
+
+    Returns
+    -------
+    chemin : list[int]
+        le chemin final trouvé, commençant et finissant par la même ville que
+        l'itinéraire initial
+    temps_calcul : float
+        temps necessaire à la résolution du problème
+    trace : TraceExploration | None
+        trace des chemins explorés
+    """
+    start_time = time.time()
+
+    # On travaille sur le cycle sans la répétition de la ville de départ
+    tour = np.array(itineraire_initial[:-1], dtype=np.intp)
+    nombre_ville = len(tour)
+
+    # Enregistrement des trajets explorés
+    if trace is not None:
+        trace.depart(itineraire_initial)
+
+    if nombre_ville < longueur_max + 3:
+        return list(itineraire_initial), time.time() - start_time, trace
+
+    position = np.empty(nombre_ville, dtype=np.intp)
+    position[tour] = np.arange(nombre_ville)
+    if voisins is None:
+        voisins = liste_voisins(matrice_distance, nombre_voisins)
+    # Les distances aux voisins sont lues une seule fois sous forme de listes Python
+    distances_voisins = np.asarray(
+        matrice_distance[np.arange(nombre_ville)[:, np.newaxis], voisins]).tolist()
+    voisins = voisins.tolist()
+
+    # File des villes actives : leur don't-look bit est éteint
+    villes_actives = deque(tour.tolist())
+    est_active = [True] * nombre_ville
+
+    # La distance courante n'est suivie que pour le critère d'arrêt
+    if arret is not None:
+        distance_courante = distance_trajet(itineraire_initial, matrice_distance)
+        arret.amelioration(distance_courante)
+
+    while villes_actives:
+        if arret is not None and not arret.continuer():
+            break
+        ville_s1 = villes_actives.popleft()
+        est_active[ville_s1] = False
+
+        for longueur in range(1, longueur_max + 1):
+            position_s1 = int(position[ville_s1])
+            segment = [int(tour[(position_s1 + k) % nombre_ville])
+                       for k in range(longueur)]
+            ville_s2 = segment[-1]
+            ville_p = int(tour[position_s1 - 1])
+            ville_n = int(tour[(position_s1 + longueur) % nombre_ville])
+
+            # Gain obtenu en retirant le segment du trajet
+            gain_retrait = matrice_distance[ville_p, ville_s1] + matrice_distance[ville_s2, ville_n] - \
+                matrice_distance[ville_p, ville_n]
+            if gain_retrait <= EPSILON:
+                continue
+
+            meilleur_mouvement = None
+            meilleur_gain = EPSILON
+            # Le segment est relié à c par s1 (même sens) ou par s2 (renversé)
+            for renverse, (debut, fin) in enumerate(((ville_s1, ville_s2), (ville_s2, ville_s1))):
+                for ville_c, distance_c in zip(voisins[debut], distances_voisins[debut]):
+                    # Les voisins sont triés : au delà, l'arête (c, debut) coûte plus que
+                    # ce que le retrait du segment rapporte
+                    if distance_c >= gain_retrait:
+                        break
+                    if ville_c in segment:
+                        continue
+                    position_c = int(position[ville_c])
+                    # Insertion entre c et son successeur puis entre son prédécesseur et c
+                    for ville_e in (int(tour[(position_c + 1) % nombre_ville]), int(tour[position_c - 1])):
+                        if ville_e in segment:
+                            continue
+                        gain_deplacement = gain_retrait + matrice_distance[ville_c, ville_e] - \
+                            distance_c - matrice_distance[fin, ville_e]
+                        if gain_deplacement > meilleur_gain:
+                            meilleur_gain = gain_deplacement
+                            meilleur_mouvement = (ville_c, ville_e, renverse)
+
+            if meilleur_mouvement is not None:
+                ville_c, ville_e, renverse = meilleur_mouvement
+                # On se ramène à une insertion entre x et son successeur y : le segment
+                # finit entre x et y, dans le sens c -> e
+                if int(tour[(position[ville_c] + 1) % nombre_ville]) == ville_e:
+                    ville_x, ville_y = ville_c, ville_e
+                    renverse_final = renverse
+                else:
+                    ville_x, ville_y = ville_e, ville_c
+                    renverse_final = 1 - renverse
+                debut_b = (position_s1 + longueur) % nombre_ville
+                debut_c = int(position[ville_y])
+                echange_segments(tour, position, position_s1, debut_b, debut_c)
+                if arret is not None:
+                    distance_courante -= meilleur_gain
+                    arret.amelioration(distance_courante)
+                if trace is not None:
+                    trace.echange(position_s1, debut_b, debut_c)
+                if renverse_final:
+                    debut_inversion = int(position[ville_s1])
+                    fin_inversion = int(position[ville_s2])
+                    inversion_cyclique(tour, position, debut_inversion, fin_inversion)
+                    if trace is not None:
+                        trace.inversion(debut_inversion, fin_inversion)
+                if trace is not None:
+                    trace.instantane()
+                activation((ville_p, ville_n, ville_s1, ville_s2, ville_x, ville_y),
+                           villes_actives, est_active)
+                break
+
+    meilleur_chemin = chemin_ferme(tour, itineraire_initial[0])
+
+    temps_calcul = time.time() - start_time
+    return meilleur_chemin, temps_calcul, trace
+
+
+def trois_opt(itineraire_initial: list[int], matrice_distance: np.ndarray, nombre_voisins=NOMBRE_VOISINS,
+              trace=None, voisins=None, arret=None) -> tuple[list[int], float, TraceExploration | None]:
+    """3-opt restreint à l'échange de deux segments consécutifs.
+
+    Le trajet `a b ... c d ... e f` devient `a d ... e b ... c f` : les arêtes
+    `(a, b)`, `(c, d)` et `(e, f)` sont remplacées par `(a, d)`, `(e, b)` et `(c, f)`.
+    La ville `d` est choisie parmi les voisins de `a` et `e` parmi ceux de `b`, chaque
+    gain partiel devant rester positif.
+
+    Parameters
+    ----------
+    itineraire_initial : list[int]
+        suite de villes donnant le chemin parcouru, la première ville étant répétée
+        à la fin
+    matrice_distance : np.ndarray
+        matrice stockant l'integralité des distances inter villes
+    nombre_voisins : int (optionnel)
+        nombre de plus proches voisins considérés pour chaque ville
+    trace : TraceExploration (optionnel)
+        trace dans laquelle enregistrer les chemins explorés. Rien n'est enregistré
+        par défaut
+    voisins : np.ndarray (optionnel)
+        listes de voisins déjà calculées par `liste_voisins`, pour ne pas les
+        recalculer à chaque appel sur la même instance
+    arret : CritereArret (optionnel)
+        budget de la recherche, une itération par ville examinée. Le tour courant est
+        rendu dès qu'il est épuisé
+
+    Returns
+    -------
+    chemin : list[int]
+        le chemin final trouvé, commençant et finissant par la même ville que
+        l'itinéraire initial
+    temps_calcul : float
+        temps necessaire à la résolution du problème
+    trace : TraceExploration | None
+        trace des chemins explorés
+    """
+    start_time = time.time()
+
+    # On travaille sur le cycle sans la répétition de la ville de départ
+    tour = np.array(itineraire_initial[:-1], dtype=np.intp)
+    nombre_ville = len(tour)
+
+    # Enregistrement des trajets explorés
+    if trace is not None:
+        trace.depart(itineraire_initial)
+
+    if nombre_ville < 6:
+        return list(itineraire_initial), time.time() - start_time, trace
+
+    position = np.empty(nombre_ville, dtype=np.intp)
+    position[tour] = np.arange(nombre_ville)
+    if voisins is None:
+        voisins = liste_voisins(matrice_distance, nombre_voisins)
+    distances_voisins = np.asarray(
+        matrice_distance[np.arange(nombre_ville)[:, np.newaxis], voisins]).tolist()
+    voisins = voisins.tolist()
+
+    # File des villes actives : leur don't-look bit est éteint
+    villes_actives = deque(tour.tolist())
+    est_active = [True] * nombre_ville
+
+    # La distance courante n'est suivie que pour le critère d'arrêt
+    if arret is not None:
+        distance_courante = distance_trajet(itineraire_initial, matrice_distance)
+        arret.amelioration(distance_courante)
+
+    while villes_actives:
+        if arret is not None and not arret.continuer():
+            break
+        ville_a = villes_actives.popleft()
+        est_active[ville_a] = False
+
+        position_b = (int(position[ville_a]) + 1) % nombre_ville
+        ville_b = int(tour[position_b])
+        distance_ab = matrice_distance[ville_a, ville_b]
+        mouvement = None
+
+        for ville_d, distance_ad in zip(voisins[ville_a], distances_voisins[ville_a]):
+            gain_1 = distance_ab - distance_ad
+            # Les voisins sont triés : le gain partiel ne peut plus être positif
+            if gain_1 <= EPSILON:
+                break
+            if ville_d == ville_b:
+                continue
+            # Rang de d en partant de b dans le sens du parcours
+            rang_d = (int(position[ville_d]) - position_b) % nombre_ville
+            ville_c = int(tour[position[ville_d] - 1])
+
+            for ville_e, distance_be in zip(voisins[ville_b], distances_voisins[ville_b]):
+                gain_2 = gain_1 + matrice_distance[ville_c, ville_d] - distance_be
+                if gain_2 <= EPSILON:
+                    break
+                # e doit se trouver entre d (inclus) et a (exclu)
+                rang_e = (int(position[ville_e]) - position_b) % nombre_ville
+                if rang_e < rang_d or ville_e == ville_a:
+                    continue
+                ville_f = int(tour[(position[ville_e] + 1) % nombre_ville])
+                gain_3 = gain_2 + matrice_distance[ville_e, ville_f] - \
+                    matrice_distance[ville_c, ville_f]
+                if gain_3 > EPSILON:
+                    mouvement = (ville_c, ville_d, ville_e, ville_f)
+                    gain_mouvement = gain_3
+                    break
+            if mouvement is not None:
+                break
+
+        if mouvement is not None:
+            ville_c, ville_d, ville_e, ville_f = mouvement
+            debut_d = int(position[ville_d])
+            debut_f = int(position[ville_f])
+            echange_segments(tour, position, position_b, debut_d, debut_f)
+            if arret is not None:
+                distance_courante -= gain_mouvement
+                arret.amelioration(distance_courante)
+            if trace is not None:
+                trace.echange(position_b, debut_d, debut_f)
+                trace.instantane()
+            activation((ville_a, ville_b, ville_c, ville_d, ville_e, ville_f),
+                       villes_actives, est_active)
+
+    meilleur_chemin = chemin_ferme(tour, itineraire_initial[0])
+
+    temps_calcul = time.time() - start_time
+    return meilleur_chemin, temps_calcul, trace
+
+
+def main(matrice_distance: np.ndarray, chemin_initial: list, nom_dataset="", strategie="balayage",
+         enregistrer_exploration=False, arret=None) -> tuple[pd.DataFrame, TraceExploration | None]:
+    """Lancement du 2-opt suivi du Or-opt et du 3-opt restreint
+
+    Parameters
+    ----------
+    matrice_distance : np.ndarray | DistancesCoordonnees | Instance
+        matrice stockant l'integralité des distances inter villes, ou l'instance dont
+        on utilise les distances
+    chemin_initial : list
+        chemin à améliorer, la première ville étant répétée à la fin
+    nom_dataset : str (optionnel)
+        nom du dataset à traiter
+    strategie : str (optionnel)
+        stratégie du 2-opt initial parmi les clés de `algo_2_opt.STRATEGIES`. Le
+        balayage par défaut part d'un meilleur optimum local que la stratégie
+        `'voisins'`, plus rapide mais dont la chaîne finit au dessus du 2-opt complet
+    enregistrer_exploration : bool (optionnel)
+        si vrai les chemins explorés sont enregistrés pour être affichés
+    arret : CritereArret (optionnel)
+        budget en temps, en itérations et en stagnation partagé par les trois
+        recherches locales. Sans budget, chacune s'arrête sur un optimum local
+
+    Returns
+    -------
+    df_resultat_test : Dataframe
+        variable stockant un ensemble de variables importantes pour analyser
+        l'algorithme
+    trace : TraceExploration | None
+        variable retraçant les chemins explorés par l'algorithme, None si elle
+        n'est pas enregistrée
+    """
+    matrice_distance = distances_instance(matrice_distance)
+
+    # Résolution du TSP : chaque recherche locale repart du chemin de la précédente et
+    # complète la même trace
+    trace = TraceExploration() if enregistrer_exploration else None
+    start_time = time.time()
+    # Les listes de voisins sont communes à toutes les recherches locales
+    voisins = liste_voisins(matrice_distance, NOMBRE_VOISINS)
+    temps_calcul = time.time() - start_time
+    if strategie == 'voisins':
+        itineraire, temps_recherche, trace = src.algo_2_opt.deux_opt_voisins(
+            chemin_initial, matrice_distance, trace=trace, voisins=voisins, arret=arret)
+    else:
+        itineraire, temps_recherche, trace = src.algo_2_opt.STRATEGIES[strategie](
+            chemin_initial, matrice_distance, trace=trace, arret=arret)
+    temps_calcul += temps_recherche
+    for recherche_locale in (or_opt, trois_opt):
+        itineraire, temps_recherche, trace = recherche_locale(
+            itineraire, matrice_distance, trace=trace, voisins=voisins, arret=arret)
+        temps_calcul += temps_recherche
+
+    # Calcul de la distance du trajet final trouvé par l'algorithme
+    distance_chemin_sub_optimal = distance_trajet(itineraire, matrice_distance)
+
+    # Création du dataframe à retourner
+    # On inclut pas les chemins explorés pour pas sucharger le fichier csv de résultats
+    df_resultat_test = pd.DataFrame({
+        'Algorithme': "3-opt",
+        'Nom dataset': nom_dataset,
+        'Nombre de villes': len(chemin_initial)-1,
+        # Dans un tableau pour être sur une seule ligne du dataframe
+        'Solution': [itineraire],
+        # Distance du trajet final
+        'Distance': distance_chemin_sub_optimal,
+        'Temps de calcul (en s)': temps_calcul
+    })
+
+    return df_resultat_test, trace
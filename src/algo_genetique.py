@@ -1,15 +1,25 @@
-import copy
-import random
+import multiprocessing
+import os
 import time
+from multiprocessing import shared_memory
 
 import numpy as np
 import pandas as pd
 
-from src.distance import distance_trajet
+from src.algo_2_opt import NOMBRE_VOISINS, deux_opt_voisins, liste_voisins
+from src.algo_proche_voisin import plus_proche_voisin, plus_proche_voisin_kdtree
+from src.arret import CritereArret
+from src.distance import TYPES_POIDS_EUCLIDIENS, DistancesCoordonnees, distance_trajet, distances_trajets
+from src.instance import Instance, en_instance
 
 # En s'inspirant des cours dispensés à l'ENSC en apprentissage automatique j'ai essayé
 # de mettre en place la résolution du TSP via une évolution aléatoire de population.
 
+# La population est stockée dans une matrice d'entiers préallouée de dimension
+# (nombre de trajets, nombre de villes + 1), une ligne par trajet, accompagnée du vecteur
+# des distances des trajets. A chaque épisode les meilleurs trajets sont ramenés en tête
+# de la matrice et les lignes suivantes sont réécrites par leurs enfants.
+
 # Taille de la population initiale
 NOMBRE_TRAJET = 100
 
@@ -19,11 +29,55 @@ POURCENTAGE_SELECTION = 10/100
 # Pourcentage de mutation
 POURCENTAGE_MUTATION = 50/100
 
-# Constante permettant d'arrêter la convergence de l'algorithme
+# Pourcentage des enfants obtenus par croisement de deux trajets originels
+TAUX_CROISEMENT = 80/100
+
+# Constante permettant d'arrêter la convergence de l'algorithme lorsqu'aucun critère
+# d'arrêt n'est donné
 NOMBRE_EPOCH = 100
 
+# Nombre d'inversions appliquées à chaque copie du trajet du plus proche voisin lorsque
+# la population initiale en est issue
+NOMBRE_PERTURBATIONS = 3
+
+# Nombre maximal de villes examinées par le 2-opt lors du raffinement d'un enfant
+BUDGET_RECHERCHE_LOCALE = 1000
+
+# Les croisements combinent deux trajets parents en un enfant qui reste une permutation
+# des villes. Ils sont réalisés sur un lot d'enfants à la fois, sur les trajets sans la
+# répétition de la ville de départ :
+# - OX (order crossover) : l'enfant reprend un segment du premier parent et complète avec
+#   les villes restantes dans l'ordre du second
+# - PMX (partially mapped crossover) : l'enfant reprend un segment du premier parent et
+#   les autres positions du second, les doublons étant corrigés par la correspondance
+#   entre les deux segments
+# - ERX (edge recombination crossover) : l'enfant est construit ville par ville à partir
+#   des arêtes des deux parents, en privilégiant les arêtes communes puis les villes ayant
+#   le moins de voisins restants
+
+# Cf. Larrañaga, P. et al. (1999). Genetic algorithms for the travelling salesman problem:
+# a review of representations and operators.
+
+# En mode hybride (algorithme mémétique) les meilleurs enfants de chaque épisode sont
+# améliorés par un 2-opt restreint aux plus proches voisins et borné en nombre de villes
+# examinées. La population initiale peut aussi être construite autour du trajet du plus
+# proche voisin plutôt que tirée au hasard.
+
+# En mode îles plusieurs populations évoluent en parallèle, une par processus. Les îles
+# sont disposées en anneau : périodiquement chacune dépose ses meilleurs trajets dans une
+# zone de mémoire partagée et remplace ses pires trajets par ceux déposés par l'île
+# précédente. Les échanges sont asynchrones, une île n'attend jamais les autres. La
+# matrice des distances est elle aussi placée en mémoire partagée, en lecture seule.
 
-def init_population(nombre_de_trajet: int, data: pd.DataFrame, matrice_distance: np.ndarray) -> list[dict]:
+# Nombre d'épisodes entre deux migrations
+INTERVALLE_MIGRATION = 10
+
+# Nombre de trajets échangés à chaque migration
+NOMBRE_MIGRANTS = 2
+
+
+def init_population(nombre_de_trajet: int, data: Instance, matrice_distance: np.ndarray,
+                    generateur: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
     """Initialisation de la population initiale
 
     Construction d'une population initiale de N solutions.
@@ -33,93 +87,101 @@ def init_population(nombre_de_trajet: int, data: pd.DataFrame, matrice_distance:
     ----------
     nombre_de_trajet : int
         taille de la population initiale
-    data : DataFrame
-        dataframe stockant l'intégralité des coordonnées des villes à parcourir
+    data : Instance
+        instance stockant l'intégralité des coordonnées des villes à parcourir
     matrice_distance : np.ndarray
         matrice stockant l'integralité des distances inter villes
+    generateur : np.random.Generator
+        générateur de nombres aléatoires
 
     Returns
     -------
-    list[dict]
-        l'ensemble des N trajets distincts crées avec dans le dictionnaire l'information sur
-        le chemin `Villes` et la distance `Distance`
-    """
-    # Liste stockant la population initiale
-    trajets = []
-    for i in range(nombre_de_trajet):
-        # Initialisation de la forme d'une solution. On instancie un nouveau dictionnaire
-        # à chaque fois pour éviter les problématiques du type référence
-        trajet = {"Villes": [], 'Distance': 0}
-        # Génération d'un ordre de parcours des villes de manière aléatoire
-        trajet['Villes'] = random.sample(
-            range(0, data.shape[0]), data.shape[0])
-        # Le marchand revient sur ses pas donc ajout de la première ville à la fin
-        # de la liste
-        trajet['Villes'].append(trajet['Villes'][0])
-        # Calcul de la distance totale du parcours
-        trajet = evaluation(trajet, matrice_distance)
-        trajets.append(trajet)
-    return trajets
-
-
-def individus_ordonnes(trajets: list[dict]) -> list[dict]:
-    """Tri des trajets par ordre croissant de leur distance
-
-    Parameters
-    ----------
-    trajets : list[dict]
-        listes de toute la population de solutions
-
-    Returns
-    -------
-    list[dict]
-        l'ensemble des N trajets triés
+    population : np.ndarray
+        les N trajets crées, de dimension (N, nombre de villes + 1)
+    distances : np.ndarray
+        la distance de chacun des trajets
     """
-    return sorted(trajets, key=lambda x: x['Distance'])
+    nombre_villes = len(data)
+    population = np.empty((nombre_de_trajet, nombre_villes + 1), dtype=np.int32)
+    # Génération d'un ordre de parcours des villes de manière aléatoire
+    population[:, :-1] = generateur.permuted(
+        np.tile(np.arange(nombre_villes, dtype=np.int32), (nombre_de_trajet, 1)), axis=1)
+    # Le marchand revient sur ses pas donc ajout de la première ville à la fin
+    population[:, -1] = population[:, 0]
+    # Calcul de la distance totale des parcours
+    return population, evaluation(population, matrice_distance)
 
 
-def selection(trajets: list[dict], pourcentage: float) -> list[dict]:
-    """Sélection des N meilleurs
+def init_population_plus_proche_voisin(nombre_de_trajet: int, data: Instance, matrice_distance: np.ndarray,
+                                      generateur: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """Initialisation de la population autour du trajet du plus proche voisin
 
-    Parmi la population totale on ne conserve qu'un petit pourcentage
-    de la population
+    Le premier trajet est celui du plus proche voisin, les suivants en sont des copies
+    perturbées par `NOMBRE_PERTURBATIONS` inversions aléatoires. L'arbre k-d n'est
+    utilisé que pour les distances euclidiennes, le trajet est sinon construit sur la
+    matrice des distances.
 
     Parameters
     ----------
-    trajets : list[dict]
-        ordre de parcours des villes et distance du trajet
-    pourcentage : int
-        le pourcentage à garder de la population initiale
+    nombre_de_trajet : int
+        taille de la population initiale
+    data : Instance
+        instance stockant l'intégralité des coordonnées des villes à parcourir
+    matrice_distance : np.ndarray
+        matrice stockant l'integralité des distances inter villes
+    generateur : np.random.Generator
+        générateur de nombres aléatoires
 
     Returns
     -------
-    list[dict]
-        les N meilleurs de la population initiale
+    population : np.ndarray
+        les N trajets crées, de dimension (N, nombre de villes + 1)
+    distances : np.ndarray
+        la distance de chacun des trajets
     """
-    # Nombre de trajet après sélection
-    nombre_selectionne = int(len(trajets)*pourcentage)
-    # Récupération de ces n trajets dans la liste ordonnées
-    trajets = trajets[:nombre_selectionne]
-    return trajets
+    if data.type_poids in TYPES_POIDS_EUCLIDIENS:
+        itineraire, _, _ = plus_proche_voisin_kdtree(data.coordonnees)
+    else:
+        itineraire, _, _ = plus_proche_voisin(matrice_distance)
+    population = np.tile(np.array(itineraire, dtype=np.int32), (nombre_de_trajet, 1))
+    distances = np.full(nombre_de_trajet, distance_trajet(itineraire, matrice_distance))
 
+    if mutation_possible(population):
+        perturbes = population[1:]
+        for _ in range(NOMBRE_PERTURBATIONS):
+            distances[1:] += mutation_inversion(perturbes, matrice_distance, generateur)
+        population[1:] = perturbes
+    return population, distances
+
+
+def selection(population: np.ndarray, distances: np.ndarray, pourcentage: float) -> int:
+    """Sélection des N meilleurs
 
-def probabilite(pourcentage: float) -> bool:
-    """Tirage aléatoire simulant une probabilité de succés
+    Parmi la population totale on ne conserve qu'un petit pourcentage de la population.
+    Les trajets conservés sont ramenés en tête de `population` et `distances`, sans
+    trier l'ensemble de la population.
 
     Parameters
     ----------
+    population : np.ndarray
+        ordre de parcours des villes de chaque trajet, modifié en place
+    distances : np.ndarray
+        distance de chaque trajet, modifiée en place
     pourcentage : float
-        le pourcentage de succés
+        le pourcentage à garder de la population initiale
 
     Returns
     -------
-    bool
-        résultat
+    int
+        nombre de trajets sélectionnés
     """
-    r = random.randint(0, 100)
-    if r <= pourcentage:
-        return True
-    return False
+    # Nombre de trajet après sélection, on conserve au moins le meilleur trajet
+    nombre_selectionne = max(1, int(len(population)*pourcentage))
+    meilleurs = np.argpartition(distances, nombre_selectionne - 1)[
+        :nombre_selectionne]
+    population[:nombre_selectionne] = population[meilleurs]
+    distances[:nombre_selectionne] = distances[meilleurs]
+    return nombre_selectionne
 
 
 # Pour les mutations il est important de conserver l'intégrité de nos trajets. Le point initial est confondu
@@ -147,133 +209,657 @@ def cadre_mutation(nombre_villes: int) -> list[int]:
     return villes_mutables
 
 
-def mutation_aleatoire(trajet: dict) -> dict:
-    """Définition d'une mutation d'un individu
+def mutation_possible(trajets: np.ndarray) -> bool:
+    """Vrai si le cadre de mutation des trajets contient au moins deux positions,
+    c'est à dire pour des trajets d'au moins 5 villes"""
+    villes_mutables = cadre_mutation(trajets.shape[1])
+    return villes_mutables[1] - villes_mutables[0] >= 2
+
+
+def longueur_aretes(trajets: np.ndarray, positions: np.ndarray, matrice_distance: np.ndarray) -> np.ndarray:
+    """Somme des longueurs des arêtes finissant aux positions données de chaque trajet
+
+    Parameters
+    ----------
+    trajets : np.ndarray
+        ordres de parcours des villes, une ligne par trajet
+    positions : np.ndarray
+        positions des arêtes, de dimension (nombre de trajets, nombre d'arêtes). L'arête
+        à la position `p` relie les villes aux positions `p-1` et `p`
+    matrice_distance : np.ndarray
+        matrice stockant l'integralité des distances inter villes
+
+    Returns
+    -------
+    np.ndarray
+        la longueur totale des arêtes de chaque trajet
+    """
+    lignes = np.arange(len(trajets))[:, np.newaxis]
+    return np.asarray(matrice_distance[trajets[lignes, positions - 1], trajets[lignes, positions]],
+                      dtype=np.float64).sum(axis=1)
+
 
-    Cette mutation est une permutation aléatoire de deux villes
+def tirage_positions(trajets: np.ndarray, generateur: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """Tirage de deux positions distinctes et ordonnées par trajet dans le cadre de mutation
 
     Parameters
     ----------
-    trajet : dict
-        ordre de parcours des villes et distance du trajet
+    trajets : np.ndarray
+        ordres de parcours des villes, une ligne par trajet
+    generateur : np.random.Generator
+        générateur de nombres aléatoires
+
+    Returns
+    -------
+    tuple[np.ndarray, np.ndarray]
+        les positions `r0 < r1` de chaque trajet
+    """
+    assert mutation_possible(trajets), print(
+        "Moins de deux positions mutables pour des trajets de {} villes".format(trajets.shape[1] - 1))
+    villes_mutables = cadre_mutation(trajets.shape[1])
+    r0 = generateur.integers(villes_mutables[0], villes_mutables[1], len(trajets))
+    r1 = generateur.integers(villes_mutables[0], villes_mutables[1] - 1, len(trajets))
+    r1 += r1 >= r0
+    return np.minimum(r0, r1), np.maximum(r0, r1)
+
+
+# Chaque mutation est réalisée en place et retourne la variation de distance des trajets.
+# Seules les arêtes modifiées sont lues dans la matrice des distances, supposée symétrique :
+# l'évaluation d'une mutation ne dépend pas du nombre de villes.
+def mutation_aleatoire(trajets: np.ndarray, matrice_distance: np.ndarray, generateur: np.random.Generator) -> np.ndarray:
+    """Définition d'une mutation d'un ensemble d'individus
+
+    Cette mutation est une permutation aléatoire de deux villes de chaque trajet
+
+    Parameters
+    ----------
+    trajets : np.ndarray
+        ordres de parcours des villes à muter, une ligne par trajet
+    matrice_distance : np.ndarray
+        matrice stockant l'integralité des distances inter villes
+    generateur : np.random.Generator
+        générateur de nombres aléatoires
 
     Returns
     -------
-    dict
-        nouvel ordre de parcours des villes après mutation
+    np.ndarray
+        variation de la distance de chaque trajet
     """
-    # Création d'un nouveau dictionnaire pour stocker le trajet muté
-    enfant = {'Villes': [], 'Distance': 0}
-    villes_mutables = cadre_mutation(len(trajet['Villes']))
-    # On ne veux pas modifier le trajet initial. Comme c'est un type référence
-    # on réalise une copie particulière pour ne pas pointer vers la même adresse mémoire
-    enfant['Villes'] = copy.deepcopy(trajet['Villes'])
-    # Indice des éléments à permuter
-    r = random.sample(range(villes_mutables[0], villes_mutables[1]), 2)
+    lignes = np.arange(len(trajets))
+    r0, r1 = tirage_positions(trajets, generateur)
+    # Arêtes autour des deux villes. Si elles sont voisines l'arête qui les relie est
+    # comptée deux fois avant comme après la permutation
+    aretes = np.column_stack((r0, r0 + 1, r1, r1 + 1))
+    avant = longueur_aretes(trajets, aretes, matrice_distance)
     # Permutation des deux éléments
-    enfant['Villes'][r[0]], enfant['Villes'][r[1]
-                                             ] = enfant['Villes'][r[1]], enfant['Villes'][r[0]]
-    return enfant
+    villes_r0 = trajets[lignes, r0]
+    trajets[lignes, r0] = trajets[lignes, r1]
+    trajets[lignes, r1] = villes_r0
+    return longueur_aretes(trajets, aretes, matrice_distance) - avant
 
 
-def generation(trajets_originels: list[dict], nombre_de_trajet: int, pourcentage_mutation: float, matrice_distance: np.ndarray) -> list[dict]:
-    """Génération d'une nouvelle population de N trajets
+def mutation_inversion(trajets: np.ndarray, matrice_distance: np.ndarray, generateur: np.random.Generator) -> np.ndarray:
+    """Inversion de l'ordre de parcours d'une portion de chaque trajet
 
-    Generation de m nouveaux trajets pour compléter la population sélectionnée. Ces nouveaux
-    trajets sont des enfants des trajets originels
+    Parameters
+    ----------
+    trajets : np.ndarray
+        ordres de parcours des villes à muter, une ligne par trajet
+    matrice_distance : np.ndarray
+        matrice stockant l'integralité des distances inter villes
+    generateur : np.random.Generator
+        générateur de nombres aléatoires
+
+    Returns
+    -------
+    np.ndarray
+        variation de la distance de chaque trajet
+    """
+    debut, fin = tirage_positions(trajets, generateur)
+    # Seules les arêtes aux extrémités de la portion changent
+    aretes = np.column_stack((debut, fin + 1))
+    avant = longueur_aretes(trajets, aretes, matrice_distance)
+    positions = np.arange(trajets.shape[1])
+    dans_portion = (positions >= debut[:, np.newaxis]) & (
+        positions <= fin[:, np.newaxis])
+    source = np.where(dans_portion, (debut + fin)[:, np.newaxis] - positions, positions)
+    trajets[:] = np.take_along_axis(trajets, source, axis=1)
+    return longueur_aretes(trajets, aretes, matrice_distance) - avant
+
+
+def mutation_insertion(trajets: np.ndarray, matrice_distance: np.ndarray, generateur: np.random.Generator) -> np.ndarray:
+    """Déplacement d'une ville de chaque trajet à une autre position
 
     Parameters
     ----------
-    trajets_originels : list[dict]
-        ensemble des trajets sélectionnés
-    nombre_de_trajet : int
-        taille de la population initiale
-    pourcentage_mutation : int
-        probabilité qu'un trajet mute
+    trajets : np.ndarray
+        ordres de parcours des villes à muter, une ligne par trajet
     matrice_distance : np.ndarray
         matrice stockant l'integralité des distances inter villes
+    generateur : np.random.Generator
+        générateur de nombres aléatoires
+
+    Returns
+    -------
+    np.ndarray
+        variation de la distance de chaque trajet
+    """
+    r0, r1 = tirage_positions(trajets, generateur)
+    # La ville déplacée est en r0 ou en r1, les villes entre les deux sont décalées
+    vers_la_fin = generateur.random(len(trajets)) < 0.5
+    depart = np.where(vers_la_fin, r0, r1)
+    arrivee = np.where(vers_la_fin, r1, r0)
+
+    # La ville quitte ses deux voisins et s'insère sur l'arête qui la suit (ou la précède)
+    # à sa position d'arrivée
+    lignes = np.arange(len(trajets))
+    ville = trajets[lignes, depart]
+    precedente = trajets[lignes, depart - 1]
+    suivante = trajets[lignes, depart + 1]
+    extremite_a = trajets[lignes, np.where(vers_la_fin, arrivee, arrivee - 1)]
+    extremite_b = trajets[lignes, np.where(vers_la_fin, arrivee + 1, arrivee)]
+    variation = np.asarray(matrice_distance[precedente, suivante] +
+                           matrice_distance[extremite_a, ville] +
+                           matrice_distance[ville, extremite_b] -
+                           matrice_distance[precedente, ville] -
+                           matrice_distance[ville, suivante] -
+                           matrice_distance[extremite_a, extremite_b], dtype=np.float64)
+
+    positions = np.arange(trajets.shape[1])
+    decalees = (positions >= r0[:, np.newaxis]) & (positions <= r1[:, np.newaxis])
+    source = np.where(decalees, positions + np.where(vers_la_fin, 1, -1)[:, np.newaxis], positions)
+    source[lignes, arrivee] = depart
+    trajets[:] = np.take_along_axis(trajets, source, axis=1)
+    return variation
+
+
+# Opérateurs de mutation utilisables depuis `main`
+MUTATIONS = {
+    'echange': mutation_aleatoire,
+    'inversion': mutation_inversion,
+    'insertion': mutation_insertion,
+}
+
+
+def coupures(nombre_enfants: int, nombre_villes: int, generateur: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    """Tirage du segment `[debut, fin)` repris du premier parent pour chaque enfant
+
+    Parameters
+    ----------
+    nombre_enfants : int
+        nombre d'enfants à créer
+    nombre_villes : int
+        nombre de villes d'un trajet
+    generateur : np.random.Generator
+        générateur de nombres aléatoires
+
+    Returns
+    -------
+    debut : np.ndarray
+        position de début de chaque segment, de dimension (nombre d'enfants, 1)
+    fin : np.ndarray
+        position de fin (exclue) de chaque segment, de dimension (nombre d'enfants, 1)
+    """
+    bornes = np.sort(generateur.integers(
+        0, nombre_villes + 1, (nombre_enfants, 2)), axis=1)
+    return bornes[:, :1], bornes[:, 1:]
+
+
+def croisement_ox(parents_a: np.ndarray, parents_b: np.ndarray, generateur: np.random.Generator) -> np.ndarray:
+    """Croisement OX d'un lot de couples de parents
+
+    Parameters
+    ----------
+    parents_a : np.ndarray
+        premiers parents, une permutation des villes par ligne
+    parents_b : np.ndarray
+        seconds parents, une permutation des villes par ligne
+    generateur : np.random.Generator
+        générateur de nombres aléatoires
+
+    Returns
+    -------
+    np.ndarray
+        un enfant par couple de parents
+    """
+    nombre_enfants, nombre_villes = parents_a.shape
+    lignes = np.arange(nombre_enfants)[:, np.newaxis]
+    debut, fin = coupures(nombre_enfants, nombre_villes, generateur)
+    positions = np.arange(nombre_villes)
+    dans_segment = (positions >= debut) & (positions < fin)
+
+    # Villes du segment du premier parent, indexées par ville
+    ville_dans_segment = np.zeros_like(dans_segment)
+    ville_dans_segment[lignes, parents_a] = dans_segment
+
+    # Les positions libres de l'enfant et les villes du second parent sont parcourues à
+    # partir de la fin du segment. Il y a autant de positions libres que de villes
+    # restantes sur chaque ligne : on les associe dans l'ordre
+    positions_tournees = (fin + positions) % nombre_villes
+    villes_tournees = parents_b[lignes, positions_tournees]
+    libres = ~dans_segment[lignes, positions_tournees]
+    restantes = ~ville_dans_segment[lignes, villes_tournees]
+
+    enfants = parents_a.copy()
+    lignes_libres, rangs_libres = np.nonzero(libres)
+    enfants[lignes_libres, positions_tournees[lignes_libres, rangs_libres]] = \
+        villes_tournees[restantes]
+    return enfants
+
+
+def croisement_pmx(parents_a: np.ndarray, parents_b: np.ndarray, generateur: np.random.Generator) -> np.ndarray:
+    """Croisement PMX d'un lot de couples de parents
+
+    Parameters
+    ----------
+    parents_a : np.ndarray
+        premiers parents, une permutation des villes par ligne
+    parents_b : np.ndarray
+        seconds parents, une permutation des villes par ligne
+    generateur : np.random.Generator
+        générateur de nombres aléatoires
+
+    Returns
+    -------
+    np.ndarray
+        un enfant par couple de parents
+    """
+    nombre_enfants, nombre_villes = parents_a.shape
+    lignes = np.arange(nombre_enfants)[:, np.newaxis]
+    debut, fin = coupures(nombre_enfants, nombre_villes, generateur)
+    positions = np.arange(nombre_villes)
+    dans_segment = (positions >= debut) & (positions < fin)
+
+    # Correspondance du segment : la ville a[i] est associée à la ville b[i]
+    ville_dans_segment = np.zeros_like(dans_segment)
+    ville_dans_segment[lignes, parents_a] = dans_segment
+    correspondance = np.empty_like(parents_a)
+    correspondance[lignes, parents_a] = parents_b
+
+    enfants = np.where(dans_segment, parents_a, parents_b)
+    # Une ville hors segment déjà présente dans le segment est remplacée par sa
+    # correspondante, jusqu'à obtenir une ville absente du segment
+    doublons = ~dans_segment & ville_dans_segment[lignes, enfants]
+    while doublons.any():
+        enfants[doublons] = correspondance[np.nonzero(doublons)[0], enfants[doublons]]
+        doublons &= ville_dans_segment[lignes, enfants]
+    return enfants
+
+
+def croisement_erx(parents_a: np.ndarray, parents_b: np.ndarray, generateur: np.random.Generator) -> np.ndarray:
+    """Croisement ERX d'un lot de couples de parents
+
+    Tous les enfants sont construits en parallèle, une position à la fois. Depuis la
+    ville courante on choisit parmi ses voisins non visités dans les deux parents celui
+    d'une arête commune, sinon celui ayant le moins de voisins non visités. Sans voisin
+    disponible on repart d'une ville non visitée tirée au hasard.
+
+    Parameters
+    ----------
+    parents_a : np.ndarray
+        premiers parents, une permutation des villes par ligne
+    parents_b : np.ndarray
+        seconds parents, une permutation des villes par ligne
+    generateur : np.random.Generator
+        générateur de nombres aléatoires
 
     Returns
     -------
-    list[dict]
-        population complète
+    np.ndarray
+        un enfant par couple de parents
     """
-    while len(trajets_originels) < nombre_de_trajet:
-        for trajet in trajets_originels:
-            # Génération des altérations : mutation, croisement, ...
-            if probabilite(pourcentage_mutation):
-                trajet = mutation_aleatoire(trajet)
-                trajet = evaluation(trajet, matrice_distance)
-                trajets_originels.append(trajet)
-    return trajets_originels
+    nombre_enfants, nombre_villes = parents_a.shape
+    lignes = np.arange(nombre_enfants)
+    # Table des voisins de chaque ville : prédécesseur et successeur dans chaque parent
+    voisins = np.empty((nombre_enfants, nombre_villes, 4), dtype=parents_a.dtype)
+    for rang, parents in enumerate((parents_a, parents_b)):
+        voisins[lignes[:, np.newaxis], parents, 2 * rang] = np.roll(parents, 1, axis=1)
+        voisins[lignes[:, np.newaxis], parents, 2 * rang + 1] = np.roll(parents, -1, axis=1)
+    # Arêtes présentes dans les deux parents
+    arete_commune = (voisins[:, :, :, np.newaxis] ==
+                     voisins[:, :, np.newaxis, :]).sum(axis=3) > 1
+
+    enfants = np.empty_like(parents_a)
+    visite = np.zeros((nombre_enfants, nombre_villes), dtype=bool)
+    ville = parents_a[:, 0]
+    for position in range(nombre_villes):
+        enfants[:, position] = ville
+        visite[lignes, ville] = True
+        if position == nombre_villes - 1:
+            break
+
+        candidats = voisins[lignes, ville]
+        disponibles = ~visite[lignes[:, np.newaxis], candidats]
+        # Nombre de voisins non visités de chaque candidat
+        degres = (~visite[lignes[:, np.newaxis, np.newaxis],
+                          voisins[lignes[:, np.newaxis], candidats]]).sum(axis=2)
+        # Les arêtes communes passent en premier, les égalités sont départagées au hasard
+        score = degres - 5 * arete_commune[lignes, ville] + \
+            generateur.random(candidats.shape)
+        score[~disponibles] = np.inf
+        ville = candidats[lignes, np.argmin(score, axis=1)]
 
+        bloques = ~disponibles.any(axis=1)
+        if bloques.any():
+            tirage = generateur.random((np.count_nonzero(bloques), nombre_villes))
+            tirage[visite[bloques]] = -1
+            ville[bloques] = np.argmax(tirage, axis=1)
+    return enfants
+
+
+# Opérateurs de croisement utilisables depuis `main`
+CROISEMENTS = {
+    'ox': croisement_ox,
+    'pmx': croisement_pmx,
+    'erx': croisement_erx,
+}
+
+
+def generation(population: np.ndarray, distances: np.ndarray, nombre_selectionne: int, pourcentage_mutation: float,
+               matrice_distance: np.ndarray, generateur: np.random.Generator, croisement="ox",
+               taux_croisement=TAUX_CROISEMENT, mutation="echange", verification=False):
+    """Génération d'une nouvelle population de N trajets
+
+    Les lignes suivant les `nombre_selectionne` trajets originels sont remplacées par
+    leurs enfants. Avec la probabilité `taux_croisement` un enfant est le croisement de
+    deux trajets originels tirés au hasard, sinon la copie de l'un d'eux. Il est ensuite
+    muté avec la probabilité `pourcentage_mutation`. Seuls les enfants croisés sont
+    entièrement réévalués, la distance des enfants mutés est mise à jour à partir de la
+    variation retournée par la mutation.
+
+    Parameters
+    ----------
+    population : np.ndarray
+        ordre de parcours des villes de chaque trajet, modifié en place
+    distances : np.ndarray
+        distance de chaque trajet, modifiée en place
+    nombre_selectionne : int
+        nombre de trajets originels en tête de `population`
+    pourcentage_mutation : float
+        probabilité qu'un trajet mute
+    matrice_distance : np.ndarray
+        matrice stockant l'integralité des distances inter villes
+    generateur : np.random.Generator
+        générateur de nombres aléatoires
+    croisement : str (optionnel)
+        opérateur de croisement parmi les clés de `CROISEMENTS`
+    taux_croisement : float (optionnel)
+        probabilité qu'un enfant soit obtenu par croisement
+    mutation : str (optionnel)
+        opérateur de mutation parmi les clés de `MUTATIONS`
+    verification : bool (optionnel)
+        si vrai on vérifie que les distances mises à jour sont égales aux distances
+        recalculées entièrement. A n'utiliser que pour déboguer
+    """
+    nombre_enfants = len(population) - nombre_selectionne
+    parents = generateur.integers(0, nombre_selectionne, nombre_enfants)
+    population[nombre_selectionne:] = population[parents]
+    distances[nombre_selectionne:] = distances[parents]
 
-def evaluation(trajet: dict, matrice_distance: np.ndarray) -> dict:
+    # Croisement sur les trajets sans la répétition de la ville de départ
+    croises = generateur.random(nombre_enfants) < taux_croisement
+    if croises.any():
+        seconds_parents = generateur.integers(
+            0, nombre_selectionne, np.count_nonzero(croises))
+        enfants = CROISEMENTS[croisement](
+            population[nombre_selectionne:][croises, :-1], population[seconds_parents, :-1], generateur)
+        croises = nombre_selectionne + np.flatnonzero(croises)
+        population[croises] = np.column_stack((enfants, enfants[:, 0]))
+        distances[croises] = evaluation(population[croises], matrice_distance)
+
+    # Mutation, impossible pour les trajets de moins de 5 villes
+    if mutation_possible(population):
+        mutes = nombre_selectionne + \
+            np.flatnonzero(generateur.random(nombre_enfants) < pourcentage_mutation)
+        enfants = population[mutes]
+        distances[mutes] += MUTATIONS[mutation](enfants, matrice_distance, generateur)
+        population[mutes] = enfants
+
+    if verification:
+        assert np.allclose(distances, evaluation(population, matrice_distance)), print(
+            "Les distances mises à jour ne correspondent pas aux trajets")
+
+
+def raffinement(population: np.ndarray, distances: np.ndarray, nombre_selectionne: int, nombre_raffines: int,
+                matrice_distance: np.ndarray, voisins: np.ndarray, budget: int):
+    """Amélioration des meilleurs enfants par un 2-opt borné
+
+    Parameters
+    ----------
+    population : np.ndarray
+        ordre de parcours des villes de chaque trajet, modifié en place
+    distances : np.ndarray
+        distance de chaque trajet, modifiée en place
+    nombre_selectionne : int
+        nombre de trajets originels en tête de `population`, les enfants les suivent
+    nombre_raffines : int
+        nombre d'enfants améliorés
+    matrice_distance : np.ndarray
+        matrice stockant l'integralité des distances inter villes
+    voisins : np.ndarray
+        listes des plus proches voisins de chaque ville, voir `algo_2_opt.liste_voisins`
+    budget : int
+        nombre maximal de villes examinées par le 2-opt pour chaque enfant
+    """
+    nombre_raffines = min(nombre_raffines, len(population) - nombre_selectionne)
+    if nombre_raffines <= 0:
+        return
+    meilleurs_enfants = nombre_selectionne + np.argpartition(
+        distances[nombre_selectionne:], nombre_raffines - 1)[:nombre_raffines]
+    for ligne in meilleurs_enfants:
+        population[ligne], _, _ = deux_opt_voisins(
+            population[ligne].tolist(), matrice_distance, voisins=voisins, budget=budget)
+    distances[meilleurs_enfants] = evaluation(
+        population[meilleurs_enfants], matrice_distance)
+
+
+def evaluation(trajets: np.ndarray, matrice_distance: np.ndarray) -> np.ndarray:
     """Fonction d'évaluation de l'algorithme
 
     Evaluation de la population. Plus un trajet est court plus il est considéré comme bon
 
     Parameters
     ----------
-    trajet : dict
-        ordre de parcours des villes avec distance relative
+    trajets : np.ndarray
+        ordres de parcours des villes, une ligne par trajet
     matrice_distance : np.ndarray
         matrice stockant l'integralité des distances inter villes
 
     Returns
     -------
-    dict
-        un trajet avec sa distance mise à jour
+    np.ndarray
+        la distance de chacun des trajets
     """
-    maj_trajet = copy.deepcopy(trajet)
-    maj_trajet['Distance'] = distance_trajet(
-        trajet['Villes'], matrice_distance)
-    return maj_trajet
+    return distances_trajets(trajets, matrice_distance)
+
 
+# Constructions de la population initiale utilisables depuis `main`
+INITIALISATIONS = {
+    'aleatoire': init_population,
+    'plus_proche_voisin': init_population_plus_proche_voisin,
+}
 
-def main(data: pd.DataFrame, matrice_distance: np.ndarray, nom_dataset="") -> pd.DataFrame:
-    """Lancement de l'algorithme de recherche 
+
+def evolution_population(data: Instance, matrice_distance: np.ndarray, generateur: np.random.Generator,
+                         arret: CritereArret, nombre_de_trajet=NOMBRE_TRAJET, initialisation="aleatoire",
+                         croisement="ox", taux_croisement=TAUX_CROISEMENT, mutation="echange", nombre_raffines=0,
+                         budget_recherche_locale=BUDGET_RECHERCHE_LOCALE, verification=False,
+                         migration=None) -> tuple[np.ndarray, np.ndarray, float]:
+    """Evolution d'une population jusqu'à épuisement du critère d'arrêt
 
     Parameters
     ----------
-    data : DataFrame
-        Dataframe stockant l'intégralité des coordonnées des villes à parcourir
-    matrice_distance : np.ndarray
+    data : Instance
+        instance stockant l'intégralité des coordonnées des villes à parcourir
+    matrice_distance : np.ndarray | DistancesCoordonnees
         matrice stockant l'integralité des distances inter villes
+    generateur : np.random.Generator
+        générateur de nombres aléatoires
+    arret : CritereArret
+        budget en temps, en épisodes et en stagnation de l'évolution
+    nombre_de_trajet : int (optionnel)
+        taille de la population
+    initialisation : str (optionnel)
+        population initiale parmi les clés de `INITIALISATIONS`
+    croisement : str (optionnel)
+        opérateur de croisement parmi les clés de `CROISEMENTS`
+    taux_croisement : float (optionnel)
+        probabilité qu'un enfant soit obtenu par croisement
+    mutation : str (optionnel)
+        opérateur de mutation parmi les clés de `MUTATIONS`
+    nombre_raffines : int (optionnel)
+        nombre d'enfants améliorés par un 2-opt à chaque épisode
+    budget_recherche_locale : int (optionnel)
+        nombre maximal de villes examinées par le 2-opt pour chaque enfant amélioré
+    verification : bool (optionnel)
+        si vrai les distances mises à jour sont vérifiées à chaque épisode
+    migration : callable (optionnel)
+        fonction appelée à la fin de chaque épisode avec son numéro, la population et
+        les distances, qu'elle peut modifier en place
+
+    Returns
+    -------
+    population : np.ndarray
+        les trajets de la population finale
+    distances : np.ndarray
+        la distance de chacun des trajets
+    distance_initiale : float
+        distance du meilleur trajet de la population initiale
+    """
+    # Initialisation de n individus initiaux (Génèse)
+    population, distances = INITIALISATIONS[initialisation](
+        nombre_de_trajet, data, matrice_distance, generateur)
+    distance_initiale = float(distances.min())
+
+    # Les listes de voisins du 2-opt ne sont calculées qu'une fois
+    if nombre_raffines > 0:
+        voisins = liste_voisins(matrice_distance, NOMBRE_VOISINS)
+
+    arret.amelioration(distances.min())
+    episode = 0
+    while arret.continuer():
+        episode += 1
+        # Sélection
+        nombre_selectionne = selection(
+            population, distances, POURCENTAGE_SELECTION)
+
+        # Génération
+        generation(population, distances, nombre_selectionne, POURCENTAGE_MUTATION,
+                   matrice_distance, generateur, croisement, taux_croisement, mutation, verification)
+
+        # Recherche locale
+        if nombre_raffines > 0:
+            raffinement(population, distances, nombre_selectionne, nombre_raffines,
+                        matrice_distance, voisins, budget_recherche_locale)
+
+        if migration is not None:
+            migration(episode, population, distances)
+
+        arret.amelioration(distances.min())
+
+    return population, distances, distance_initiale
+
+
+def main(data: pd.DataFrame | Instance, matrice_distance=None, nom_dataset="", nombre_de_trajet=NOMBRE_TRAJET,
+         nombre_epoch=NOMBRE_EPOCH, croisement="ox", taux_croisement=TAUX_CROISEMENT, mutation="echange",
+         initialisation="aleatoire", nombre_raffines=0, budget_recherche_locale=BUDGET_RECHERCHE_LOCALE,
+         graine=None, verification=False, arret=None, nombre_iles=1, intervalle_migration=INTERVALLE_MIGRATION,
+         nombre_migrants=NOMBRE_MIGRANTS) -> pd.DataFrame:
+    """Lancement de l'algorithme de recherche
+
+    Parameters
+    ----------
+    data : Instance | DataFrame
+        instance ou dataframe stockant l'intégralité des coordonnées des villes à parcourir
+    matrice_distance : np.ndarray | DistancesCoordonnees (optionnel)
+        matrice stockant l'integralité des distances inter villes, par défaut les
+        distances de l'instance
     nom_dataset : str (optionnel)
         nom du dataset à traiter
+    nombre_de_trajet : int (optionnel)
+        taille de la population, celle de chaque île en mode îles
+    nombre_epoch : int (optionnel)
+        nombre d'épisodes réalisés
+    croisement : str (optionnel)
+        opérateur de croisement parmi les clés de `CROISEMENTS` : `'ox'`, `'pmx'` ou
+        `'erx'`
+    taux_croisement : float (optionnel)
+        probabilité qu'un enfant soit obtenu par croisement, 0 pour n'utiliser que
+        des mutations
+    mutation : str (optionnel)
+        opérateur de mutation parmi les clés de `MUTATIONS` : `'echange'`,
+        `'inversion'` ou `'insertion'`
+    initialisation : str (optionnel)
+        population initiale parmi les clés de `INITIALISATIONS` : `'aleatoire'` ou
+        `'plus_proche_voisin'`
+    nombre_raffines : int (optionnel)
+        nombre d'enfants améliorés par un 2-opt à chaque épisode, 0 pour l'algorithme
+        génétique seul
+    budget_recherche_locale : int (optionnel)
+        nombre maximal de villes examinées par le 2-opt pour chaque enfant amélioré
+    graine : int (optionnel)
+        graine du générateur de nombres aléatoires
+    verification : bool (optionnel)
+        si vrai les distances mises à jour sont comparées à chaque épisode aux
+        distances recalculées entièrement
+    arret : CritereArret (optionnel)
+        budget en temps, en épisodes et en stagnation remplaçant `nombre_epoch`. Les
+        meilleurs trajets étant conservés d'un épisode à l'autre, le meilleur trajet
+        de la population est le meilleur trouvé jusque là. En mode îles, chaque île
+        dispose de ce budget, le temps étant compté depuis la création du critère
+    nombre_iles : int (optionnel)
+        nombre de populations évoluant en parallèle (mode îles), None pour une île
+        par coeur. Par défaut une seule population évolue dans le processus courant
+    intervalle_migration : int (optionnel)
+        nombre d'épisodes entre deux migrations en mode îles
+    nombre_migrants : int (optionnel)
+        nombre de trajets envoyés à l'île suivante à chaque migration
 
     Returns
     -------
     Dataframe
         variable stockant un ensemble de variables importantes pour analyser
-        l'algorithme
+        l'algorithme. En mode îles s'y ajoutent la distance initiale et finale du
+        meilleur trajet de chaque île
     """
-    # Initialisation de n individus initiaux (Génèse)
-    trajets_initiaux = init_population(NOMBRE_TRAJET, data, matrice_distance)
+    assert croisement in CROISEMENTS, print(
+        "Veuillez choisir un croisement parmi : {}".format(list(CROISEMENTS)))
+    assert mutation in MUTATIONS, print(
+        "Veuillez choisir une mutation parmi : {}".format(list(MUTATIONS)))
+    assert initialisation in INITIALISATIONS, print(
+        "Veuillez choisir une initialisation parmi : {}".format(list(INITIALISATIONS)))
 
-    # Initialisation du nombre d'epoch
-    epoch = 0
+    data = en_instance(data)
+    if matrice_distance is None:
+        matrice_distance = data.distances
+    if nombre_iles is None:
+        nombre_iles = os.cpu_count() or 1
+    parametres = {
+        'nombre_de_trajet': nombre_de_trajet, 'initialisation': initialisation,
+        'croisement': croisement, 'taux_croisement': taux_croisement, 'mutation': mutation,
+        'nombre_raffines': nombre_raffines, 'budget_recherche_locale': budget_recherche_locale,
+        'verification': verification,
+    }
 
     # Evaluation du temps de calcul
     start = time.time()
-    # On arrete l'algorithme après un nombre d'epoch fixé. Pour permettre de visualiser
-    # un résultat même si la solution est moyenne.
-    while epoch <= NOMBRE_EPOCH:
-        epoch += 1
-        # Tri
-        trajets_ordonnes = individus_ordonnes(trajets_initiaux)
+    # Sans critère d'arrêt, on arrete l'algorithme après un nombre d'epoch fixé. Pour
+    # permettre de visualiser un résultat même si la solution est moyenne.
+    if arret is None:
+        arret = CritereArret(iterations_max=nombre_epoch)
 
-        # Sélection
-        meilleurs_trajets = selection(trajets_ordonnes, POURCENTAGE_SELECTION)
-
-        # Génération
-        trajets_initiaux = generation(
-            meilleurs_trajets, NOMBRE_TRAJET, POURCENTAGE_MUTATION, matrice_distance)
+    if nombre_iles > 1:
+        resultats = evolution_iles(data, matrice_distance, nombre_iles, intervalle_migration,
+                                   nombre_migrants, arret, graine, parametres)
+        solution = min(resultats, key=lambda resultat: resultat[1])[0]
+    else:
+        population, distances, _ = evolution_population(
+            data, matrice_distance, np.random.default_rng(graine), arret, **parametres)
+        solution = population[np.argmin(distances)].tolist()
 
     # Chemin final trouvé
-    solution = trajets_initiaux[0]['Villes']
     distance = distance_trajet(solution, matrice_distance)
+    arret.amelioration(distance)
     temps_calcul = time.time() - start
 
     # Création du dataframe à retourner
@@ -286,5 +872,187 @@ def main(data: pd.DataFrame, matrice_distance: np.ndarray, nom_dataset="") -> pd
         'Distance': distance,
         'Temps de calcul (en s)': temps_calcul
     })
+    if nombre_iles > 1:
+        # Statistiques de chaque île
+        df_resultat_test['Distance initiale par île'] = [[resultat[2] for resultat in resultats]]
+        df_resultat_test['Distance par île'] = [[resultat[1] for resultat in resultats]]
 
     return df_resultat_test
+
+
+# Ressources partagées par les processus des îles, initialisées par `init_ile`
+RESSOURCES_ILE = {}
+
+
+def init_ile(matrice: tuple, migrants: tuple, verrou):
+    """Initialisation d'un processus de la pool : accès aux ressources partagées
+
+    Parameters
+    ----------
+    matrice : tuple
+        `('coordonnees', coordonnees, type_poids)` pour des distances calculées à la
+        demande ou `(nom, forme, type)` du bloc de mémoire partagée contenant la
+        matrice
+    migrants : tuple
+        `(nom, forme)` du bloc de mémoire partagée des trajets migrants et
+        `(nom, forme)` de celui de leurs distances
+    verrou : multiprocessing.Lock
+        verrou protégeant les zones de migration
+    """
+    blocs = []
+    if matrice[0] == 'coordonnees':
+        matrice_distance = DistancesCoordonnees(matrice[1], type_poids=matrice[2])
+    else:
+        bloc = shared_memory.SharedMemory(name=matrice[0])
+        blocs.append(bloc)
+        matrice_distance = np.ndarray(matrice[1], dtype=matrice[2], buffer=bloc.buf)
+        matrice_distance.flags.writeable = False
+
+    (nom_trajets, forme_trajets), (nom_distances, forme_distances) = migrants
+    bloc_trajets = shared_memory.SharedMemory(name=nom_trajets)
+    bloc_distances = shared_memory.SharedMemory(name=nom_distances)
+    blocs += [bloc_trajets, bloc_distances]
+
+    RESSOURCES_ILE.update({
+        'matrice_distance': matrice_distance,
+        'trajets_migrants': np.ndarray(forme_trajets, dtype=np.int32, buffer=bloc_trajets.buf),
+        'distances_migrants': np.ndarray(forme_distances, dtype=np.float64, buffer=bloc_distances.buf),
+        'verrou': verrou,
+        # Conservés pour que les blocs restent ouverts pendant la vie du processus
+        'blocs': blocs,
+    })
+
+
+def evolution_ile(indice_ile: int, data: Instance, intervalle_migration: int, arret: CritereArret,
+                  graine: np.random.SeedSequence, parametres: dict) -> tuple[list[int], float, float]:
+    """Evolution de la population d'une île avec migrations
+
+    Parameters
+    ----------
+    indice_ile : int
+        position de l'île dans l'anneau
+    data : Instance
+        instance stockant l'intégralité des coordonnées des villes à parcourir
+    intervalle_migration : int
+        nombre d'épisodes entre deux migrations
+    arret : CritereArret
+        budget de l'île, copié dans chaque processus
+    graine : np.random.SeedSequence
+        graine propre à l'île
+    parametres : dict
+        paramètres de l'évolution de la population, voir `evolution_population`
+
+    Returns
+    -------
+    solution : list[int]
+        meilleur trajet de l'île
+    distance : float
+        distance de ce trajet
+    distance_initiale : float
+        distance du meilleur trajet de la population initiale
+    """
+    matrice_distance = RESSOURCES_ILE['matrice_distance']
+    trajets_migrants = RESSOURCES_ILE['trajets_migrants']
+    distances_migrants = RESSOURCES_ILE['distances_migrants']
+    verrou = RESSOURCES_ILE['verrou']
+    nombre_iles, nombre_migrants = distances_migrants.shape
+
+    def migration(episode: int, population: np.ndarray, distances: np.ndarray):
+        """Dépôt des meilleurs trajets de l'île et accueil de ceux de la précédente"""
+        if episode % intervalle_migration or nombre_iles < 2:
+            return
+        meilleurs = np.argpartition(distances, nombre_migrants - 1)[:nombre_migrants]
+        with verrou:
+            trajets_migrants[indice_ile] = population[meilleurs]
+            distances_migrants[indice_ile] = distances[meilleurs]
+            arrivants = trajets_migrants[indice_ile - 1].copy()
+            distances_arrivants = distances_migrants[indice_ile - 1].copy()
+        # L'île précédente n'a peut être pas encore migré
+        valides = np.isfinite(distances_arrivants)
+        pires = np.argpartition(distances, len(distances) - nombre_migrants)[
+            len(distances) - nombre_migrants:][valides]
+        population[pires] = arrivants[valides]
+        distances[pires] = distances_arrivants[valides]
+
+    population, distances, distance_initiale = evolution_population(
+        data, matrice_distance, np.random.default_rng(graine), arret, migration=migration,
+        **parametres)
+
+    meilleur = int(np.argmin(distances))
+    return population[meilleur].tolist(), float(distances[meilleur]), distance_initiale
+
+
+def evolution_iles(data: Instance, matrice_distance: np.ndarray, nombre_iles: int, intervalle_migration: int,
+                   nombre_migrants: int, arret: CritereArret, graine, parametres: dict) -> list[tuple[list[int], float, float]]:
+    """Evolution de plusieurs populations en parallèle, une par processus
+
+    Parameters
+    ----------
+    data : Instance
+        instance stockant l'intégralité des coordonnées des villes à parcourir
+    matrice_distance : np.ndarray | DistancesCoordonnees
+        matrice stockant l'integralité des distances inter villes
+    nombre_iles : int
+        nombre de populations évoluant en parallèle
+    intervalle_migration : int
+        nombre d'épisodes entre deux migrations
+    nombre_migrants : int
+        nombre de trajets envoyés à l'île suivante à chaque migration
+    arret : CritereArret
+        budget de chaque île
+    graine : int
+        graine du générateur de nombres aléatoires, chaque île en dérivant la sienne
+    parametres : dict
+        paramètres de l'évolution de chaque population, voir `evolution_population`
+
+    Returns
+    -------
+    list[tuple[list[int], float, float]]
+        meilleur trajet de chaque île, sa distance et celle du meilleur trajet de la
+        population initiale de l'île
+    """
+    nombre_villes = len(data)
+    # Les migrants sont choisis parmi les trajets conservés par la sélection
+    nombre_migrants = min(nombre_migrants, max(1, int(
+        parametres['nombre_de_trajet']*POURCENTAGE_SELECTION)))
+
+    blocs = []
+    try:
+        # Les distances calculées à la demande ne nécessitent que les coordonnées
+        if isinstance(matrice_distance, DistancesCoordonnees):
+            matrice = ('coordonnees', matrice_distance.coordonnees,
+                       matrice_distance.type_poids)
+        else:
+            bloc = shared_memory.SharedMemory(
+                create=True, size=max(1, matrice_distance.nbytes))
+            blocs.append(bloc)
+            np.ndarray(matrice_distance.shape, dtype=matrice_distance.dtype,
+                       buffer=bloc.buf)[:] = matrice_distance
+            matrice = (bloc.name, matrice_distance.shape,
+                       matrice_distance.dtype.str)
+
+        forme_trajets = (nombre_iles, nombre_migrants, nombre_villes + 1)
+        forme_distances = (nombre_iles, nombre_migrants)
+        bloc_trajets = shared_memory.SharedMemory(
+            create=True, size=max(1, int(np.prod(forme_trajets)) * 4))
+        bloc_distances = shared_memory.SharedMemory(
+            create=True, size=max(1, int(np.prod(forme_distances)) * 8))
+        blocs += [bloc_trajets, bloc_distances]
+        # Aucune île n'a encore migré
+        np.ndarray(forme_distances, dtype=np.float64,
+                   buffer=bloc_distances.buf)[:] = np.inf
+        migrants = ((bloc_trajets.name, forme_trajets),
+                    (bloc_distances.name, forme_distances))
+
+        graines = np.random.SeedSequence(graine).spawn(nombre_iles)
+        with multiprocessing.Pool(nombre_iles, initializer=init_ile,
+                                  initargs=(matrice, migrants, multiprocessing.Lock())) as pool:
+            resultats = pool.starmap(evolution_ile, [
+                (indice_ile, data, intervalle_migration, arret, graines[indice_ile], parametres)
+                for indice_ile in range(nombre_iles)])
+    finally:
+        for bloc in blocs:
+            bloc.close()
+            bloc.unlink()
+
+    return resultats
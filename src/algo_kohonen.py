@@ -2,10 +2,13 @@ import time
 
 import numpy as np
 import pandas as pd
+from scipy.spatial import cKDTree
 
 from src.affichage_resultats import representation_reseau
+from src.arret import CritereArret
 from src.distance import distance_trajet, neurone_gagnant
-from src.init_test_data import normalisation
+from src.init_test_data import normalisation_coordonnees
+from src.instance import Instance, en_instance
 
 # En s'inspirant des cours dispensés à l'ENSC en apprentissage automatique j'ai essayé
 # de mettre en place une carte auto-génératrice afin de résoudre le TSP.
@@ -15,11 +18,45 @@ from src.init_test_data import normalisation
 # Cf. https://github.com/diego-vicente/som-tsp
 # Cf. https://github.com/sdpython/ensae_teaching_cs/blob/be65e97cf24abf05cb3471f3989cb7c7d5938236/src/ensae_teaching_cs/special/tsp_kohonen.py#L202
 
-# Nombre d'epoch maximal pour entrainer le réseau
+# Nombre d'epoch maximal pour entrainer le réseau lorsqu'aucun critère d'arrêt n'est donné
 EPOCH_MAX = 100000
 
+# Nombre d'itérations entre deux sauvegardes du réseau, et entre deux évaluations du
+# trajet courant lorsqu'un critère d'arrêt est donné
+INTERVALLE_SAUVEGARDE = 1000
 
-def creation_reseau(taille: int) -> np.ndarray:
+# Nombre de villes tirées à la fois pour être présentées au réseau
+TAILLE_BLOC_TIRAGES = 10000
+
+# Demi largeur, en nombre d'écarts types, de la fenêtre de neurones mis à jour autour du
+# neurone gagnant. Au delà les poids de la gaussienne sont négligeables
+LARGEUR_FENETRE = 3
+
+# Le neurone gagnant peut être cherché parmi tous les neurones ('exhaustive') ou dans un
+# arbre k-d construit sur les neurones ('kdtree'). Pendant l'apprentissage les neurones
+# bougent à chaque itération : l'arbre n'est reconstruit que toutes les
+# `INTERVALLE_INDEX` itérations et le gagnant est le plus proche, à leur position
+# courante, des `NOMBRE_CANDIDATS_GAGNANT` neurones qu'il renvoie. La recherche est donc
+# approchée, et n'est utilisée qu'une fois la mise à jour restreinte à une fenêtre.
+RECHERCHES = ('exhaustive', 'kdtree')
+
+# Nombre d'itérations entre deux reconstructions de l'arbre k-d des neurones
+INTERVALLE_INDEX = 100
+
+# Nombre de neurones candidats demandés à l'arbre k-d pendant l'apprentissage
+NOMBRE_CANDIDATS_GAGNANT = 8
+
+# En mode croissance, le réseau commence avec `NOMBRE_NEURONES_INITIAL` neurones. Le rayon
+# de voisinage est défini pour le réseau final : exprimé en neurones du réseau courant,
+# il est proportionnel à sa taille. Dès qu'il devient inférieur à `RAYON_CROISSANCE`
+# neurones, on double le nombre de neurones par interpolation, jusqu'à la taille finale.
+# Les premières itérations, où le voisinage couvre une grande partie du cycle, se font
+# ainsi sur un petit réseau.
+NOMBRE_NEURONES_INITIAL = 64
+RAYON_CROISSANCE = 4
+
+
+def creation_reseau(taille: int, generateur=None) -> np.ndarray:
     """
     Création d'un réseau d'un taille donnée. Le réseau est une suite 1D de neurones
 
@@ -27,13 +64,17 @@ def creation_reseau(taille: int) -> np.ndarray:
     ----------
     taille : int 
         nombre de neuronnes à créer
+    generateur : np.random.Generator (optionnel)
+        générateur de nombres aléatoires, celui de numpy par défaut
 
     Returns
     -------
     np.ndarray
         un vecteur de dimension `taille` composé de neurones à 2 dimensions à valeur dans l'intervalle [0,1)
     """
-    return np.random.rand(taille, 2)
+    if generateur is None:
+        return np.random.rand(taille, 2)
+    return generateur.random((taille, 2))
 
 
 def voisinage(index_neuronne_gagnant: int, rayon: float, nombre_neurones: int) -> np.ndarray:
@@ -71,46 +112,150 @@ def voisinage(index_neuronne_gagnant: int, rayon: float, nombre_neurones: int) -
     return np.exp(-(distances*distances) / (2*(rayon*rayon)))  # type: ignore
 
 
-def chemin_final(villes: pd.DataFrame, neurones: np.ndarray) -> list[int]:
+def chemin_final(villes: np.ndarray, neurones: np.ndarray, recherche="kdtree") -> list[int]:
     """Recherche du chemin final trouvé par le réseau. 
 
     Pour cela on attribut à chacune des villes son neurone gagnant et ensuite
-    on vient trier les villes dans le même ordre que celui effectif dans le réseau
+    on vient trier les villes dans le même ordre que celui effectif dans le réseau.
+    Avec un arbre k-d, les gagnants de toutes les villes sont cherchés en une requête
 
     Parameters
     ----------
-    villes : DataFrame 
-        dataframe stockant l'intégralité des coordonnées des villes à parcourir
+    villes : np.ndarray 
+        coordonnées normalisées des villes à parcourir de dimension (nombre de villes, 2)
     neurones : np.ndarray 
         un ensemble de neuronnes de dimension 2 dans l'intervalle [0,1)
+    recherche : str (optionnel)
+        recherche des neurones gagnants parmi `RECHERCHES`
 
     Returns
     -------
-    Dataframe
-        dataframe final des villes ordonnées
+    list[int]
+        index des villes ordonnées, la première ville étant répétée à la fin
     """
-    villes['ordre'] = villes[['x', 'y']].apply(
-        # convertion en int et non plus intp
-        lambda c: int(neurone_gagnant(neurones, c)),
-        # 1 or 'columns': on applique la fonction à chaque ligne.
-        axis=1, raw=True)
-    # Retourne un array représentant les données de l'index
-    route = villes.sort_values('ordre').index.values
+    if recherche == 'kdtree':
+        # Un arbre non équilibré aux boîtes non resserrées se construit et s'interroge
+        # bien plus vite lorsque le réseau est encore replié sur une courbe étroite
+        _, ordre = cKDTree(neurones, compact_nodes=False, balanced_tree=False).query(villes)
+    else:
+        ordre = [neurone_gagnant(neurones, ville) for ville in villes]
+    route = np.argsort(ordre, kind='stable').tolist()
     # On fait attention à fermer le cycle
-    return list(np.append(route, route[0]))
+    route.append(route[0])
+    return route
+
+
+def ecarts_cycle(nombre_neurones: int) -> np.ndarray:
+    """Carré de la distance dans le cycle entre deux neurones selon leur écart d'index
+
+    Parameters
+    ----------
+    nombre_neurones : int
+        nombre de neurones dans le réseau
 
+    Returns
+    -------
+    np.ndarray
+        carré de la distance pour chaque écart de 0 à `nombre_neurones - 1`
+    """
+    ecarts = np.arange(nombre_neurones)
+    return np.minimum(ecarts, nombre_neurones - ecarts).astype(np.float64)**2
+
+
+def reechantillonnage(neurones: np.ndarray, taille: int) -> np.ndarray:
+    """Changement du nombre de neurones du cycle par interpolation linéaire
 
-def carte_auto_adaptatives(data: pd.DataFrame, iterations: int, taux_apprentissage=0.8) -> tuple[list[int], float, list[np.ndarray]]:
+    Parameters
+    ----------
+    neurones : np.ndarray
+        réseau de neurones de dimension (nombre de neurones, 2)
+    taille : int
+        nombre de neurones du nouveau réseau
+
+    Returns
+    -------
+    np.ndarray
+        réseau de `taille` neurones régulièrement répartis le long du cycle
+    """
+    nombre_neurones = len(neurones)
+    positions = np.arange(taille) * (nombre_neurones / taille)
+    gauches = positions.astype(np.intp)
+    poids = (positions - gauches)[:, np.newaxis]
+    droites = (gauches + 1) % nombre_neurones
+    return (1 - poids) * neurones[gauches] + poids * neurones[droites]
+
+
+def tranches_cycliques(debut: int, longueur: int, nombre_neurones: int) -> list[tuple[slice, slice]]:
+    """Découpage d'une portion du cycle de neurones en tranches contiguës
+
+    Parameters
+    ----------
+    debut : int
+        index, éventuellement négatif ou supérieur au nombre de neurones, du premier
+        neurone de la portion
+    longueur : int
+        nombre de neurones de la portion, au plus `nombre_neurones`
+    nombre_neurones : int
+        nombre de neurones dans le réseau
+
+    Returns
+    -------
+    list[tuple[slice, slice]]
+        une ou deux tranches : les neurones concernés et leurs positions dans la portion
+    """
+    debut %= nombre_neurones
+    fin = debut + longueur
+    if fin <= nombre_neurones:
+        return [(slice(debut, fin), slice(0, longueur))]
+    coupure = nombre_neurones - debut
+    return [(slice(debut, nombre_neurones), slice(0, coupure)),
+            (slice(0, fin - nombre_neurones), slice(coupure, longueur))]
+
+
+def carte_auto_adaptatives(data: pd.DataFrame | Instance, iterations: int, taux_apprentissage=0.8, arret=None,
+                           matrice_distance=None, graine=None,
+                           largeur_fenetre=LARGEUR_FENETRE, recherche_gagnant="exhaustive",
+                           assignation="kdtree", croissance=False) -> tuple[list[int], float, list[np.ndarray]]:
     """Résolution du TSP en utilisant une Cartes auto-adaptatives
 
+    L'apprentissage s'arrête lorsque le taux d'apprentissage ou le rayon de voisinage
+    sont devenus trop faibles, ou lorsque le critère d'arrêt est atteint. Si une matrice
+    des distances est donnée, le trajet du réseau est évalué à chaque sauvegarde et on
+    rend le meilleur des trajets évalués.
+
+    L'apprentissage se fait sur un tableau de coordonnées : les villes présentées au
+    réseau sont tirées par blocs et les neurones sont mis à jour en place dans des
+    tableaux alloués une seule fois. Seuls les neurones à moins de `largeur_fenetre`
+    écarts types du neurone gagnant dans le cycle sont mis à jour : lorsque le rayon
+    diminue, une itération ne coûte plus que de l'ordre du rayon.
+
     Parameters
     ----------
-    data : DataFrame
-        Dataframe stockant l'intégralité des coordonnées des villes à parcourir
+    data : Instance | DataFrame
+        instance ou dataframe stockant l'intégralité des coordonnées des villes à parcourir
     iterations : int 
         nombre d'itérations maximal
     taux_apprentissage : float
         taux d'apprentissage du réseau de kohonen
+    arret : CritereArret (optionnel)
+        budget en temps, en itérations et en stagnation remplaçant `iterations`, une
+        itération par ville présentée au réseau
+    matrice_distance : np.ndarray (optionnel)
+        matrice stockant l'integralité des distances inter villes, nécessaire au
+        suivi du meilleur trajet et à la fenêtre de stagnation
+    graine : int (optionnel)
+        graine du générateur de nombres aléatoires
+    largeur_fenetre : float (optionnel)
+        demi largeur en écarts types de la fenêtre de neurones mis à jour, None pour
+        mettre à jour tout le réseau
+    recherche_gagnant : str (optionnel)
+        recherche du neurone gagnant pendant l'apprentissage parmi `RECHERCHES`
+    assignation : str (optionnel)
+        recherche des neurones gagnants des villes pour construire le trajet parmi
+        `RECHERCHES`
+    croissance : bool (optionnel)
+        si vrai le réseau commence avec `NOMBRE_NEURONES_INITIAL` neurones et grandit
+        lorsque le rayon diminue, sinon il a sa taille finale dès le départ
 
     Returns
     -------
@@ -122,37 +267,136 @@ def carte_auto_adaptatives(data: pd.DataFrame, iterations: int, taux_apprentissa
         stockage de l'évolution du réseau de neurones
     """
     start_time = time.time()
+    generateur = np.random.default_rng(graine)
 
     # On crée des villes artificielles normalisées
-    villes = data.copy()
-    villes[['x', 'y']] = normalisation(villes[['x', 'y']])
+    villes = normalisation_coordonnees(en_instance(data).coordonnees)
+    nombre_villes = len(villes)
 
     # Hyperparamètre
     # La taille de la population de neuronne est 8 fois celle du nombre de villes
-    n = villes.shape[0]*8
-    # Génération du réseau de neurones
-    neurones = creation_reseau(n)
+    nombre_neurones = nombre_villes*8
+    n = nombre_neurones
+    # Génération du réseau de neurones, éventuellement plus petit au départ
+    taille_reseau = min(NOMBRE_NEURONES_INITIAL,
+                        nombre_neurones) if croissance else nombre_neurones
+    neurones = creation_reseau(taille_reseau, generateur)
     # print('Réseau de {} neurones créé. On commence les itérations :'.format(n))
 
+    # Carré de la distance dans le cycle entre un neurone et le neurone gagnant selon
+    # leur écart d'index : la gaussienne de `voisinage` centrée en 0
+    ecarts_carres = ecarts_cycle(taille_reseau)
+    # Tableaux de travail alloués une seule fois, pour la taille finale du réseau
+    gaussienne = np.empty(nombre_neurones)
+    coefficients = np.empty(nombre_neurones)
+    ecarts_villes = np.empty((nombre_neurones, 2))
+    distances = np.empty(nombre_neurones)
+    rayon = None
+    # Arbre k-d des neurones et itération de sa construction
+    arbre, construction_arbre = None, 0
+    nombre_candidats = min(NOMBRE_CANDIDATS_GAGNANT, nombre_neurones)
+
     # Stockage de l'évolution du réseau de neurones
     evolution_reseau = []
 
-    for i in range(1, iterations):
+    if arret is None:
+        arret = CritereArret(iterations_max=iterations - 1)
+    meilleur_itineraire, meilleure_distance = None, np.inf
+    # Durée de la dernière évaluation du trajet du réseau. Sous une limite de temps, on
+    # la mesure dès le départ pour réserver le temps de l'assignation finale
+    duree_evaluation = 0.0
+    if matrice_distance is not None and arret.temps_max is not None:
+        debut_evaluation = time.time()
+        meilleur_itineraire = chemin_final(villes, neurones, assignation)
+        meilleure_distance = distance_trajet(meilleur_itineraire, matrice_distance)
+        duree_evaluation = time.time() - debut_evaluation
+
+    # Les villes présentées au réseau sont tirées par blocs
+    tirages = generateur.integers(0, nombre_villes, TAILLE_BLOC_TIRAGES)
+
+    i = 0
+    while arret.continuer():
+        # On garde de quoi faire l'assignation finale, avec une marge
+        if arret.temps_restant() < 2*duree_evaluation:
+            break
+        i += 1
         # Intervalle de sauvegarde du réseau
-        if not i % 1000:
+        if not i % INTERVALLE_SAUVEGARDE:
             # Représentation de l'état du réseau
             # representation_reseau(villes, neurones).show()
             evolution_reseau.append(neurones.copy())
-
-        # On choisit une ville aléatoire. On retourne ses coordonnées
-        ville = villes.sample(1)[['x', 'y']].values
-        index_gagnant = neurone_gagnant(neurones, ville)
-        # Génération d'un filtre gaussien modélisant l'attraction entre un le neurone gagnant et ses voisins
-        gaussian = voisinage(int(index_gagnant), n//10, neurones.shape[0])
-        # Mise à jour des poids des neurones (proche de la ville initiale)
-        # np.newaxis pour contrôler le broadcasting
-        neurones += gaussian[:, np.newaxis] * \
-            taux_apprentissage * (ville - neurones)
+            # L'évaluation n'est faite que si elle tient dans le temps restant avec
+            # l'assignation finale, d'une durée comparable
+            if matrice_distance is not None and 2*duree_evaluation < arret.temps_restant():
+                debut_evaluation = time.time()
+                itineraire = chemin_final(villes, neurones, assignation)
+                distance = distance_trajet(itineraire, matrice_distance)
+                if distance < meilleure_distance:
+                    meilleur_itineraire, meilleure_distance = itineraire, distance
+                arret.amelioration(distance)
+                duree_evaluation = time.time() - debut_evaluation
+
+        # On choisit une ville aléatoire
+        if not i % TAILLE_BLOC_TIRAGES:
+            tirages = generateur.integers(0, nombre_villes, TAILLE_BLOC_TIRAGES)
+        ville = villes[tirages[i % TAILLE_BLOC_TIRAGES]]
+
+        # Insertion de neurones lorsque le rayon couvre trop peu de neurones du réseau
+        if taille_reseau < nombre_neurones and \
+                n//10 * taille_reseau / nombre_neurones < RAYON_CROISSANCE:
+            taille_reseau = min(2*taille_reseau, nombre_neurones)
+            neurones = reechantillonnage(neurones, taille_reseau)
+            ecarts_carres = ecarts_cycle(taille_reseau)
+            rayon, arbre = None, None
+
+        # Filtre gaussien modélisant l'attraction entre le neurone gagnant et ses
+        # voisins, recalculé seulement lorsque le rayon change. Le rayon est ramené au
+        # réseau courant et l'écart type ne peut pas être inférieur 1 pour prévenir de
+        # valeurs NaN
+        if rayon != max(n//10 * taille_reseau / nombre_neurones, 1):
+            rayon = max(n//10 * taille_reseau / nombre_neurones, 1)
+            demi_largeur = taille_reseau if largeur_fenetre is None else int(
+                np.ceil(largeur_fenetre*rayon))
+            if 2*demi_largeur + 1 >= taille_reseau:
+                # Le filtre couvre tout le cycle, il est centré en 0
+                decalage, longueur = 0, taille_reseau
+                np.multiply(ecarts_carres, -1 / (2*(rayon*rayon)),
+                            out=gaussienne[:longueur])
+            else:
+                # Le filtre couvre les écarts de -demi_largeur à demi_largeur
+                decalage, longueur = demi_largeur, 2*demi_largeur + 1
+                ecarts_fenetre = np.arange(-demi_largeur, demi_largeur + 1)
+                np.multiply(ecarts_fenetre*ecarts_fenetre, -1 / (2*(rayon*rayon)),
+                            out=gaussienne[:longueur])
+            np.exp(gaussienne[:longueur], out=gaussienne[:longueur])
+        np.multiply(gaussienne[:longueur], taux_apprentissage, out=coefficients[:longueur])
+
+        # Recherche du neurone gagnant sur le carré des distances. Tant que tout le
+        # réseau est mis à jour, une recherche exhaustive ne change pas la complexité
+        par_index = recherche_gagnant == 'kdtree' and longueur < taille_reseau
+        if par_index:
+            if arbre is None or i - construction_arbre >= INTERVALLE_INDEX:
+                arbre, construction_arbre = cKDTree(neurones), i
+            _, candidats = arbre.query(ville, nombre_candidats)
+            ecarts_candidats = ville - neurones[candidats]
+            index_gagnant = int(candidats[np.einsum(
+                'ij,ij->i', ecarts_candidats, ecarts_candidats).argmin()])
+        else:
+            ecarts_reseau = ecarts_villes[:taille_reseau]
+            np.subtract(ville, neurones, out=ecarts_reseau)
+            np.einsum('ij,ij->i', ecarts_reseau, ecarts_reseau,
+                      out=distances[:taille_reseau])
+            index_gagnant = int(distances[:taille_reseau].argmin())
+
+        # Mise à jour des poids des neurones (proche de la ville initiale). Le filtre
+        # est décalé de l'index du neurone gagnant dans le cycle
+        for tranche_neurones, tranche_filtre in tranches_cycliques(
+                index_gagnant - decalage, longueur, taille_reseau):
+            ecarts_tranche = ecarts_villes[tranche_neurones]
+            if par_index:
+                np.subtract(ville, neurones[tranche_neurones], out=ecarts_tranche)
+            ecarts_tranche *= coefficients[tranche_filtre, np.newaxis]
+            neurones[tranche_neurones] += ecarts_tranche
         # Mise à jour du taux d'apprentissage
         taux_apprentissage = taux_apprentissage * 0.99997
         # Réduction de la distance d'influence d'un neurone
@@ -168,23 +412,212 @@ def carte_auto_adaptatives(data: pd.DataFrame, iterations: int, taux_apprentissa
             #      "à l'itération {}".format(i))
             break
 
-    itineraire = chemin_final(villes, neurones)
+    if meilleur_itineraire is not None and arret.temps_restant() < duree_evaluation:
+        # L'assignation finale dépasserait le budget : on rend le trajet déjà évalué
+        itineraire = meilleur_itineraire
+    else:
+        itineraire = chemin_final(villes, neurones, assignation)
+        if matrice_distance is not None and \
+                distance_trajet(itineraire, matrice_distance) > meilleure_distance:
+            itineraire = meilleur_itineraire
     temps_calcul = time.time() - start_time
 
     return itineraire, temps_calcul, evolution_reseau
 
 
-def main(data: pd.DataFrame, mat_distance: np.ndarray, nom_dataset="") -> tuple[pd.DataFrame, list[np.ndarray]]:
+def carte_auto_adaptatives_lots(data: pd.DataFrame | Instance, iterations: int, taille_lot: int, taux_apprentissage=0.8,
+                                arret=None, matrice_distance=None, graine=None, largeur_fenetre=LARGEUR_FENETRE,
+                                assignation="kdtree") -> tuple[list[int], float, list[np.ndarray]]:
+    """Résolution du TSP en utilisant une Cartes auto-adaptatives entraînée par lots
+
+    A chaque épisode un lot de villes est présenté d'un coup au réseau : leurs neurones
+    gagnants sont cherchés en une requête dans un arbre k-d, puis chaque neurone est
+    rapproché de la moyenne des villes pondérée par la gaussienne de voisinage. Les
+    sommes pondérées sont des convolutions sur le cycle de neurones, calculées par
+    transformée de Fourier. Le déplacement d'un neurone est celui de la somme des mises
+    à jour du mode en ligne pour ce lot, sans dépasser la moyenne pondérée.
+
+    Le taux d'apprentissage et le rayon décroissent après chaque lot comme après
+    `taille_lot` itérations du mode en ligne, avec les mêmes critères d'arrêt.
+
+    Parameters
+    ----------
+    data : Instance | DataFrame
+        instance ou dataframe stockant l'intégralité des coordonnées des villes à parcourir
+    iterations : int 
+        nombre maximal de villes présentées au réseau
+    taille_lot : int
+        nombre de villes présentées à chaque épisode. Au delà du nombre de villes,
+        toutes les villes sont présentées une fois par épisode
+    taux_apprentissage : float
+        taux d'apprentissage du réseau de kohonen
+    arret : CritereArret (optionnel)
+        budget en temps, en itérations et en stagnation remplaçant `iterations`, une
+        itération par lot
+    matrice_distance : np.ndarray (optionnel)
+        matrice stockant l'integralité des distances inter villes, nécessaire au
+        suivi du meilleur trajet et à la fenêtre de stagnation
+    graine : int (optionnel)
+        graine du générateur de nombres aléatoires
+    largeur_fenetre : float (optionnel)
+        demi largeur en écarts types de la gaussienne de voisinage, None pour ne pas
+        la tronquer
+    assignation : str (optionnel)
+        recherche des neurones gagnants des villes pour construire le trajet parmi
+        `RECHERCHES`
+
+    Returns
+    -------
+    itineraire : list[int]
+        le chemin final trouvé
+    temps_calcul : float
+        temps necessaire à la résolution du problème
+    evolution_reseau : list[np.ndarray]
+        stockage de l'évolution du réseau de neurones
+    """
+    start_time = time.time()
+    generateur = np.random.default_rng(graine)
+
+    # On crée des villes artificielles normalisées
+    villes = normalisation_coordonnees(en_instance(data).coordonnees)
+    nombre_villes = len(villes)
+    lot_complet = taille_lot >= nombre_villes
+    if lot_complet:
+        taille_lot = nombre_villes
+
+    # La taille de la population de neuronne est 8 fois celle du nombre de villes
+    nombre_neurones = nombre_villes*8
+    n = nombre_neurones
+    neurones = creation_reseau(nombre_neurones, generateur)
+
+    # Carré de la distance dans le cycle entre deux neurones selon leur écart d'index
+    ecarts_carres = ecarts_cycle(nombre_neurones)
+    rayon = None
+
+    # Décroissance des paramètres pour un lot
+    decroissance_taux = 0.99997**taille_lot
+    decroissance_rayon = 0.9997**taille_lot
+
+    # Stockage de l'évolution du réseau de neurones
+    evolution_reseau = []
+
+    if arret is None:
+        arret = CritereArret(iterations_max=-(-(iterations - 1) // taille_lot))
+    meilleur_itineraire, meilleure_distance = None, np.inf
+    # Durée de la dernière évaluation du trajet du réseau. Sous une limite de temps, on
+    # la mesure dès le départ pour réserver le temps de l'assignation finale
+    duree_evaluation = 0.0
+    if matrice_distance is not None and arret.temps_max is not None:
+        debut_evaluation = time.time()
+        meilleur_itineraire = chemin_final(villes, neurones, assignation)
+        meilleure_distance = distance_trajet(meilleur_itineraire, matrice_distance)
+        duree_evaluation = time.time() - debut_evaluation
+
+    villes_presentees = 0
+    while arret.continuer():
+        # On garde de quoi faire l'assignation finale, avec une marge
+        if arret.temps_restant() < 2*duree_evaluation:
+            break
+        # Sauvegarde du réseau toutes les `INTERVALLE_SAUVEGARDE` villes présentées
+        if villes_presentees // INTERVALLE_SAUVEGARDE != \
+                (villes_presentees + taille_lot) // INTERVALLE_SAUVEGARDE:
+            evolution_reseau.append(neurones.copy())
+            # L'évaluation n'est faite que si elle tient dans le temps restant avec
+            # l'assignation finale, d'une durée comparable
+            if matrice_distance is not None and 2*duree_evaluation < arret.temps_restant():
+                debut_evaluation = time.time()
+                itineraire = chemin_final(villes, neurones, assignation)
+                distance = distance_trajet(itineraire, matrice_distance)
+                if distance < meilleure_distance:
+                    meilleur_itineraire, meilleure_distance = itineraire, distance
+                arret.amelioration(distance)
+                duree_evaluation = time.time() - debut_evaluation
+        villes_presentees += taille_lot
+
+        # Transformée de la gaussienne de voisinage centrée en 0, recalculée seulement
+        # lorsque le rayon change
+        if rayon != max(n//10, 1):
+            rayon = max(n//10, 1)
+            gaussienne = np.exp(ecarts_carres * (-1 / (2*(rayon*rayon))))
+            if largeur_fenetre is not None:
+                gaussienne[ecarts_carres > (largeur_fenetre*rayon)**2] = 0
+            transformee_gaussienne = np.fft.rfft(gaussienne)
+
+        # Neurones gagnants des villes du lot, cherchés sur tous les coeurs
+        lot = villes if lot_complet else villes[generateur.integers(
+            0, nombre_villes, taille_lot)]
+        _, gagnants = cKDTree(neurones).query(lot, workers=-1)
+
+        # Sommes des poids et des villes pondérées reçus par chaque neurone
+        cumuls = np.stack((np.bincount(gagnants, minlength=nombre_neurones),
+                           np.bincount(gagnants, lot[:, 0], nombre_neurones),
+                           np.bincount(gagnants, lot[:, 1], nombre_neurones)))
+        poids, sommes_x, sommes_y = np.fft.irfft(
+            np.fft.rfft(cumuls) * transformee_gaussienne, nombre_neurones)
+
+        # Rapprochement des neurones de la moyenne pondérée des villes
+        actifs = poids > 1e-12
+        moyennes = np.column_stack((sommes_x[actifs], sommes_y[actifs])) / \
+            poids[actifs, np.newaxis]
+        pas = np.minimum(taux_apprentissage * poids[actifs], 1)
+        neurones[actifs] += pas[:, np.newaxis] * (moyennes - neurones[actifs])
+
+        # Décroissance du taux d'apprentissage et du rayon pour le lot entier
+        taux_apprentissage = taux_apprentissage * decroissance_taux
+        n = n * decroissance_rayon
+
+        # Si un des paramètres a trop diminué
+        if n < 1 or taux_apprentissage < 0.001:
+            break
+
+    if meilleur_itineraire is not None and arret.temps_restant() < duree_evaluation:
+        # L'assignation finale dépasserait le budget : on rend le trajet déjà évalué
+        itineraire = meilleur_itineraire
+    else:
+        itineraire = chemin_final(villes, neurones, assignation)
+        if matrice_distance is not None and \
+                distance_trajet(itineraire, matrice_distance) > meilleure_distance:
+            itineraire = meilleur_itineraire
+    temps_calcul = time.time() - start_time
+
+    return itineraire, temps_calcul, evolution_reseau
+
+
+def main(data: pd.DataFrame | Instance, mat_distance=None, nom_dataset="", arret=None, graine=None,
+         largeur_fenetre=LARGEUR_FENETRE, recherche_gagnant="exhaustive",
+         assignation="kdtree", taille_lot=None, croissance=False) -> tuple[pd.DataFrame, list[np.ndarray]]:
     """Lancement de l'algorithme de kohonen
 
     Parameters
     ----------
-    data : DataFrame
-        dataframe stockant l'intégralité des coordonnées des villes à parcourir
-    matrice_distance : np.ndarray
-        matrice stockant l'integralité des distances inter villes
+    data : Instance | DataFrame
+        instance ou dataframe stockant l'intégralité des coordonnées des villes à parcourir
+    mat_distance : np.ndarray | DistancesCoordonnees (optionnel)
+        matrice stockant l'integralité des distances inter villes, par défaut les
+        distances de l'instance
     nom_dataset : str (optionnel)
         nom du dataset à traiter
+    arret : CritereArret (optionnel)
+        budget en temps, en itérations et en stagnation de l'apprentissage. Le trajet
+        du réseau est alors évalué régulièrement et le meilleur est conservé
+    graine : int (optionnel)
+        graine du générateur de nombres aléatoires
+    largeur_fenetre : float (optionnel)
+        demi largeur en écarts types de la fenêtre de neurones mis à jour autour du
+        neurone gagnant, None pour mettre à jour tout le réseau
+    recherche_gagnant : str (optionnel)
+        recherche du neurone gagnant pendant l'apprentissage parmi `RECHERCHES` :
+        `'kdtree'` utilise un arbre k-d reconstruit périodiquement, plus rapide sur
+        les grandes instances mais approché
+    assignation : str (optionnel)
+        recherche des neurones gagnants des villes pour construire le trajet final
+        parmi `RECHERCHES`
+    taille_lot : int (optionnel)
+        nombre de villes présentées à la fois au réseau pour un apprentissage par lots
+        (`carte_auto_adaptatives_lots`), None pour l'apprentissage ville par ville
+    croissance : bool (optionnel)
+        si vrai, pour l'apprentissage ville par ville, le réseau commence avec peu de
+        neurones et grandit à mesure que le rayon diminue
 
     Returns
     -------
@@ -194,9 +627,24 @@ def main(data: pd.DataFrame, mat_distance: np.ndarray, nom_dataset="") -> tuple[
     evolution_reseau : list
         variable retraçant l'évolution du réseau de neurones
     """
+    assert recherche_gagnant in RECHERCHES and assignation in RECHERCHES, print(
+        "Veuillez choisir une recherche parmi : {}".format(list(RECHERCHES)))
+
+    data = en_instance(data)
+    if mat_distance is None:
+        mat_distance = data.distances
+
     # Résolution du TSP
-    itineraire, temps_calcul, evolution_reseau = carte_auto_adaptatives(
-        data, EPOCH_MAX)
+    if taille_lot is None:
+        itineraire, temps_calcul, evolution_reseau = carte_auto_adaptatives(
+            data, EPOCH_MAX, arret=arret, matrice_distance=None if arret is None else mat_distance,
+            graine=graine, largeur_fenetre=largeur_fenetre, recherche_gagnant=recherche_gagnant,
+            assignation=assignation, croissance=croissance)
+    else:
+        itineraire, temps_calcul, evolution_reseau = carte_auto_adaptatives_lots(
+            data, EPOCH_MAX, taille_lot, arret=arret,
+            matrice_distance=None if arret is None else mat_distance, graine=graine,
+            largeur_fenetre=largeur_fenetre, assignation=assignation)
 
     # Calcul de la distance du trajet final trouvé par l'algorithme
     distance_chemin_sub_optimal = distance_trajet(itineraire, mat_distance)
@@ -2,8 +2,11 @@ import time
 
 import numpy as np
 import pandas as pd
+from scipy.spatial import cKDTree
 
-from src.distance import distance_trajet
+from src.distance import TYPES_POIDS_EUCLIDIENS, DistancesCoordonnees, distance_trajet
+from src.exploration import TraceExploration
+from src.instance import Instance
 
 # Implémentation de l'algorithme du 1-plus proche voisin adapté à la résolution
 # du TSP. C'est un algorithme simple afin d'obtenir très rapidement une solution
@@ -11,16 +14,54 @@ from src.distance import distance_trajet
 
 # Cf. : https://fr.wikipedia.org/wiki/Recherche_des_plus_proches_voisins
 
+# Pour les grandes instances la recherche se fait dans un arbre k-d construit sur les
+# coordonnées des villes, sans matrice des distances. L'arbre n'est pas modifié à chaque
+# visite : on demande plus de candidats tant que les plus proches sont déjà visités, et
+# on le reconstruit sur les seules villes restantes dès que la moitié de ses villes a
+# été visitée.
 
-def plus_proche_voisin(matrice_distance: np.ndarray) -> tuple[list[int], float, list[list[int]]]:
+# Si le critère d'arrêt est atteint pendant la construction, les villes restantes sont
+# ajoutées dans l'ordre de leur index afin de toujours rendre un tour complet.
+
+# Nombre de candidats demandés à l'arbre k-d lors d'une première recherche
+NOMBRE_CANDIDATS = 8
+
+
+def completion(itineraire: list[int], visite: np.ndarray, trace=None):
+    """Ajout en place des villes non visitées à la fin de l'itinéraire, par index croissant
+
+    Parameters
+    ----------
+    itineraire : list[int]
+        chemin en cours de construction
+    visite : np.ndarray
+        état de visite de chaque ville, mis à jour en place
+    trace : TraceExploration (optionnel)
+        trace dans laquelle enregistrer les villes ajoutées
+    """
+    for ville in np.flatnonzero(~visite).tolist():
+        itineraire.append(ville)
+        if trace is not None:
+            trace.ajout(ville)
+    visite[:] = True
+    if trace is not None:
+        trace.instantane()
+
+
+def plus_proche_voisin(matrice_distance: np.ndarray, trace=None, arret=None) -> tuple[list[int], float, TraceExploration | None]:
     """Retourne le trajet trouvé en se déplacement de proche en proche.
 
     La ville de départ étant arbitraire on choisit la ville d'index 0
 
     Parameters
     ----------
-    matrice_distance : np.array
+    matrice_distance : np.array | DistancesCoordonnees
         matrice stockant l'integralité des distances inter villes
+    trace : TraceExploration (optionnel)
+        trace dans laquelle enregistrer les chemins explorés, construite avec
+        `cycle=False`. Rien n'est enregistré par défaut
+    arret : CritereArret (optionnel)
+        budget de la construction, une itération par ville ajoutée
 
     Returns
     -------
@@ -28,8 +69,8 @@ def plus_proche_voisin(matrice_distance: np.ndarray) -> tuple[list[int], float,
         le chemin finalement trouvé
     temps_calcul : float
         temps necessaire à la résolution du problème
-    chemins_explores : list[list[int]]
-        stockage de l'ensemble des chemins explorés
+    trace : TraceExploration | None
+        trace des chemins explorés
     """
     start_time = time.time()
 
@@ -40,15 +81,22 @@ def plus_proche_voisin(matrice_distance: np.ndarray) -> tuple[list[int], float,
     itineraire = [0]
     visite[0] = True
 
-    # Variable de stockage de l'ensemble des trajets explorés
-    chemins_explores = []
+    # Les chemins explorés commencent par la ville de départ
+    if trace is not None:
+        trace.depart(itineraire, instantane=False)
 
     while False in visite:
+        if arret is not None and not arret.continuer():
+            completion(itineraire, visite, trace)
+            break
+
         # A chaque itération on cherche la ville la plus proche de la ville actuelle
         # la ville actuelle étant la dernière de l'itinéraire
 
-        # Pour ne pas modifier les valeurs de matrice_distance
-        distance_a_ville = np.copy(matrice_distance[itineraire[-1], :])
+        # Pour ne pas modifier les valeurs de matrice_distance. La copie est flottante
+        # pour accepter des distances infinies même si la matrice est entière
+        distance_a_ville = np.array(
+            matrice_distance[itineraire[-1], :], dtype=np.float64)
 
         for index in range(len(distance_a_ville)):
             if visite[index]:
@@ -62,38 +110,145 @@ def plus_proche_voisin(matrice_distance: np.ndarray) -> tuple[list[int], float,
 
         itineraire.append(int(plus_proche))
 
-        # On sauvegarde l'état actuel de l'itinéraire en faisant attention au type
-        # référence des listes
-        chemins_explores.append(itineraire.copy())
+        # On sauvegarde l'état actuel de l'itinéraire
+        if trace is not None:
+            trace.ajout(plus_proche)
+            trace.instantane()
 
     # On pense à fermer le cycle
     itineraire.append(itineraire[0])
 
     temps_calcul = time.time() - start_time
-    return itineraire, temps_calcul, chemins_explores
+    return itineraire, temps_calcul, trace
+
 
+def plus_proche_voisin_kdtree(coordonnees: np.ndarray, trace=None, arret=None) -> tuple[list[int], float, TraceExploration | None]:
+    """Retourne le trajet du plus proche voisin en s'appuyant sur un arbre k-d.
 
-def main(matrice_distance: np.ndarray, nom_dataset="") -> tuple[pd.DataFrame, list[list[int]]]:
+    Le trajet est le même que celui de `plus_proche_voisin` sur la matrice des distances
+    euclidiennes : on part de la ville d'index 0 et, en cas d'égalité, on choisit la
+    ville de plus petit index. Le temps de calcul est de l'ordre de O(n log n).
+
+    Parameters
+    ----------
+    coordonnees : np.ndarray
+        coordonnées 2D des villes de dimension (nombre de villes, 2)
+    trace : TraceExploration (optionnel)
+        trace dans laquelle enregistrer les chemins explorés, construite avec
+        `cycle=False`. Rien n'est enregistré par défaut
+    arret : CritereArret (optionnel)
+        budget de la construction, une itération par ville ajoutée
+
+    Returns
+    -------
+    itineraire : list[int]
+        le chemin finalement trouvé
+    temps_calcul : float
+        temps necessaire à la résolution du problème
+    trace : TraceExploration | None
+        trace des chemins explorés
+    """
+    start_time = time.time()
+
+    coordonnees = np.asarray(coordonnees, dtype=np.float64)
+    nombre_ville = len(coordonnees)
+
+    visite = np.zeros(nombre_ville, dtype=bool)
+    itineraire = [0]
+    visite[0] = True
+    if trace is not None:
+        trace.depart(itineraire, instantane=False)
+
+    # Villes indexées par l'arbre et nombre d'entre elles visitées depuis sa construction
+    restantes = np.arange(1, nombre_ville)
+    arbre = cKDTree(coordonnees[restantes]) if nombre_ville > 1 else None
+    nombre_visitees_arbre = 0
+
+    for _ in range(nombre_ville - 1):
+        if arret is not None and not arret.continuer():
+            completion(itineraire, visite, trace)
+            break
+
+        ville_actuelle = coordonnees[itineraire[-1]]
+        nombre_candidats = min(NOMBRE_CANDIDATS, len(restantes))
+        while True:
+            distances, index = arbre.query(ville_actuelle, nombre_candidats)
+            distances = np.atleast_1d(distances)
+            candidats = restantes[np.atleast_1d(index)]
+            libres = ~visite[candidats]
+            if nombre_candidats == len(restantes):
+                break
+            # Les candidats sont triés par distance : une ville non renvoyée peut être
+            # à égalité avec le dernier candidat
+            if libres.any() and distances[libres].min() < distances[-1]:
+                break
+            nombre_candidats = min(2 * nombre_candidats, len(restantes))
+
+        distance_min = distances[libres].min()
+        plus_proche = candidats[libres & (distances == distance_min)].min()
+
+        visite[plus_proche] = True
+        itineraire.append(int(plus_proche))
+        if trace is not None:
+            trace.ajout(plus_proche)
+            trace.instantane()
+
+        # Reconstruction de l'arbre sur les villes restant à visiter
+        nombre_visitees_arbre += 1
+        if 2 * nombre_visitees_arbre >= len(restantes) and len(itineraire) < nombre_ville:
+            restantes = np.flatnonzero(~visite)
+            arbre = cKDTree(coordonnees[restantes])
+            nombre_visitees_arbre = 0
+
+    # On pense à fermer le cycle
+    itineraire.append(itineraire[0])
+
+    temps_calcul = time.time() - start_time
+    return itineraire, temps_calcul, trace
+
+
+def main(matrice_distance: np.ndarray, nom_dataset="", enregistrer_exploration=False,
+         arret=None) -> tuple[pd.DataFrame, TraceExploration | None]:
     """Lancement de l'algorithme de recherche 
 
     Parameters
     ----------
-    matrice_distance : np.array
-        matrice stockant l'integralité des distances inter villes
+    matrice_distance : np.array | DistancesCoordonnees | Instance
+        matrice stockant l'integralité des distances inter villes, ou l'instance dont
+        on utilise les coordonnées et les distances
     nom_dataset : str (optionnel)
         Nom du dataset à traiter
+    enregistrer_exploration : bool (optionnel)
+        si vrai les chemins explorés sont enregistrés pour être affichés
+    arret : CritereArret (optionnel)
+        budget de la construction, les villes restantes étant ajoutées par index
+        croissant lorsqu'il est épuisé
 
     Returns
     -------
     Dataframe
         variable stockant un ensemble de variables importantes pour analyser
         l'algorithme
-    chemins_explores : list[list[int]]
-        variable retraçant le parcour suivi par l'algorithme
+    trace : TraceExploration | None
+        variable retraçant le parcour suivi par l'algorithme, None si elle n'est
+        pas enregistrée
     """
-    # Résolution du TSP
-    itineraire, temps_calcul, chemins_explores = plus_proche_voisin(
-        matrice_distance)
+    trace = TraceExploration(cycle=False) if enregistrer_exploration else None
+
+    # Résolution du TSP, sans parcourir de lignes de la matrice lorsque les coordonnées
+    # sont connues et les distances ordonnées comme les distances euclidiennes
+    coordonnees = None
+    if isinstance(matrice_distance, (Instance, DistancesCoordonnees)) and \
+            matrice_distance.type_poids in TYPES_POIDS_EUCLIDIENS:
+        coordonnees = matrice_distance.coordonnees
+    if isinstance(matrice_distance, Instance):
+        matrice_distance = matrice_distance.distances
+    if coordonnees is not None:
+        itineraire, temps_calcul, trace = plus_proche_voisin_kdtree(
+            coordonnees, trace, arret)
+    else:
+        itineraire, temps_calcul, trace = plus_proche_voisin(
+            matrice_distance, trace, arret)
 
     # Calcul de la distance du trajet final trouvé par l'algorithme
     distance_chemin_sub_optimal = distance_trajet(itineraire, matrice_distance)
@@ -110,4 +265,4 @@ def main(matrice_distance: np.ndarray, nom_dataset="") -> tuple[pd.DataFrame, li
         'Temps de calcul (en s)': temps_calcul
     })
 
-    return df_resultat_test, chemins_explores
+    return df_resultat_test, trace
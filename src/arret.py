@@ -0,0 +1,72 @@
+import time
+
+import numpy as np
+
+# Critère d'arrêt commun aux algorithmes. Une résolution peut être bornée en temps, en
+# nombre d'itérations et par une fenêtre de stagnation : on s'arrête lorsque la meilleure
+# distance connue ne s'est pas améliorée depuis un nombre donné d'itérations. Ce qu'est une
+# itération dépend de l'algorithme (une ville ajoutée, une ville examinée par le 2-opt, un
+# épisode de l'algorithme génétique, une ville présentée au réseau de kohonen).
+
+# Amélioration minimale de la distance pour réinitialiser la fenêtre de stagnation
+EPSILON_AMELIORATION = 1e-7
+
+
+class CritereArret:
+    """Budget d'une résolution
+
+    Le temps est compté à partir de la création du critère. Les algorithmes appellent
+    `continuer` avant chaque itération et `amelioration` dès qu'ils connaissent la
+    distance de leur meilleur trajet.
+
+    Parameters
+    ----------
+    temps_max : float (optionnel)
+        temps de calcul maximal en secondes
+    iterations_max : int (optionnel)
+        nombre maximal d'itérations
+    fenetre_stagnation : int (optionnel)
+        nombre d'itérations sans amélioration au bout duquel on s'arrête
+    """
+
+    def __init__(self, temps_max=None, iterations_max=None, fenetre_stagnation=None):
+        self.temps_max = temps_max
+        self.iterations_max = iterations_max
+        self.fenetre_stagnation = fenetre_stagnation
+        self.debut = time.time()
+        self.iterations = 0
+        self.meilleure_distance = np.inf
+        self.derniere_amelioration = 0
+
+    def continuer(self) -> bool:
+        """Décompte d'une itération, vrai si le budget permet de la réaliser"""
+        if self.iterations_max is not None and self.iterations >= self.iterations_max:
+            return False
+        # La stagnation n'a de sens que pour un algorithme qui évalue ses trajets
+        if self.fenetre_stagnation is not None and self.meilleure_distance < np.inf and \
+                self.iterations - self.derniere_amelioration >= self.fenetre_stagnation:
+            return False
+        if self.temps_max is not None and time.time() - self.debut >= self.temps_max:
+            return False
+        self.iterations += 1
+        return True
+
+    def temps_restant(self) -> float:
+        """Temps de calcul restant en secondes, infini sans limite de temps"""
+        if self.temps_max is None:
+            return np.inf
+        return self.temps_max - (time.time() - self.debut)
+
+    def amelioration(self, distance: float) -> bool:
+        """Enregistrement de la distance du meilleur trajet courant
+
+        Returns
+        -------
+        bool
+            vrai si elle améliore la meilleure distance connue
+        """
+        if distance < self.meilleure_distance - EPSILON_AMELIORATION:
+            self.meilleure_distance = distance
+            self.derniere_amelioration = self.iterations
+            return True
+        return False
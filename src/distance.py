@@ -1,6 +1,52 @@
+import hashlib
+import math
+import os
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
-from scipy.spatial import distance
+from scipy.spatial import cKDTree, distance
+
+# Au delà de ce nombre de villes la matrice dense des distances n'est plus construite :
+# les distances sont calculées à la demande à partir des coordonnées
+TAILLE_MAX_MATRICE_DENSE = 5000
+
+# Nombre de lignes de la matrice des distances conservées en cache
+TAILLE_CACHE_LIGNES = 256
+
+# Nombre de lignes de la matrice des distances calculées à la fois
+TAILLE_BLOC_MATRICE = 1024
+
+# Types de stockage possibles de la matrice des distances. `nint` correspond à l'arrondi
+# à l'entier le plus proche de la norme TSPLIB, stocké sur 32 bits
+TYPES_DISTANCE = {'float64': np.float64, 'float32': np.float32, 'nint': np.int32}
+
+# Nombre maximal de distances lues à la fois lors de l'évaluation d'un ensemble de trajets
+TAILLE_BLOC_TRAJETS = 1 << 20
+
+# Un entier ne pouvant pas être infini, la distance d'une ville à elle même est
+# remplacée par le plus grand entier représentable
+DISTANCE_INFINIE_ENTIERE = np.iinfo(np.int32).max
+
+# Types de distance de la norme TSPLIB (`EDGE_WEIGHT_TYPE`) supportés. Le type d'une
+# instance est conservé dans `Instance.type_poids` par `init_test_data.instance_TSPLIB`
+# (`villes.attrs['type_poids']` pour un dataframe), `EUC_2D` par défaut. Les distances
+# `EUC_2D` ne sont pas arrondies (l'arrondi de la norme s'obtient avec le stockage `nint`).
+# Les distances `MAN_2D` et `MAX_2D` sont arrondies à l'entier le plus proche et les
+# distances `CEIL_2D`, `ATT` et `GEO` sont entières, comme dans la norme. Pour `EXPLICIT`,
+# la matrice des distances est lue dans le fichier et conservée dans `Instance.poids`
+TYPES_POIDS = ('EUC_2D', 'MAN_2D', 'MAX_2D', 'CEIL_2D', 'ATT', 'GEO', 'EXPLICIT')
+
+# Métriques de `scipy.spatial.distance.cdist` des types calculés sur les coordonnées
+METRIQUES = {'MAN_2D': 'cityblock', 'MAX_2D': 'chebyshev'}
+
+# Types pour lesquels l'ordre des distances est celui des distances euclidiennes :
+# les recherches de plus proches voisins peuvent se faire dans un arbre k-d
+TYPES_POIDS_EUCLIDIENS = ('EUC_2D', 'CEIL_2D', 'ATT')
+
+# Constantes de la norme TSPLIB pour les distances géographiques
+PI_TSPLIB = 3.141592
+RAYON_TERRE = 6378.388
 
 
 def distance_euclidienne(a: np.ndarray, b: np.ndarray) -> np.ndarray:
@@ -22,6 +68,200 @@ def distance_euclidienne(a: np.ndarray, b: np.ndarray) -> np.ndarray:
     return np.linalg.norm(a - b, axis=1)
 
 
+def type_poids(villes) -> str:
+    """Type de distance TSPLIB d'une instance (`Instance` ou dataframe), `EUC_2D` s'il
+    n'est pas renseigné"""
+    if isinstance(villes, pd.DataFrame):
+        return villes.attrs.get('type_poids', 'EUC_2D')
+    return villes.type_poids
+
+
+def coordonnees_villes(villes) -> np.ndarray:
+    """Coordonnées des villes d'une instance (`Instance` ou dataframe)"""
+    if isinstance(villes, pd.DataFrame):
+        return villes[['x', 'y']].to_numpy(dtype=np.float64)
+    return villes.coordonnees
+
+
+def poids_explicites(villes) -> np.ndarray:
+    """Matrice des distances lue dans le fichier d'une instance `EXPLICIT`"""
+    if isinstance(villes, pd.DataFrame):
+        return villes.attrs['poids']
+    return villes.poids
+
+
+def coordonnees_geographiques(coordonnees: np.ndarray) -> np.ndarray:
+    """Conversion des coordonnées `DDD.MM` (degrés et minutes) TSPLIB en radians
+
+    Parameters
+    ----------
+    coordonnees : np.ndarray
+        latitudes et longitudes des villes de dimension (..., 2)
+
+    Returns
+    -------
+    np.ndarray
+        latitudes et longitudes en radians
+    """
+    degres = np.trunc(coordonnees)
+    return PI_TSPLIB * (degres + 5.0 * (coordonnees - degres) / 3.0) / 180.0
+
+
+def distance_geographique(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Distances `GEO` de la norme TSPLIB, en kilomètres entiers
+
+    Parameters
+    ----------
+    a : np.ndarray
+        coordonnées `DDD.MM` de dimension (..., 2)
+    b : np.ndarray
+        coordonnées `DDD.MM` de dimension (..., 2), diffusables avec `a`
+
+    Returns
+    -------
+    np.ndarray
+        distances entre les villes de `a` et de `b`
+    """
+    a = coordonnees_geographiques(a)
+    b = coordonnees_geographiques(b)
+    q1 = np.cos(a[..., 1] - b[..., 1])
+    q2 = np.cos(a[..., 0] - b[..., 0])
+    q3 = np.cos(a[..., 0] + b[..., 0])
+    # Le cosinus peut légèrement dépasser 1 par erreur d'arrondi
+    cosinus = np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)
+    return np.floor(RAYON_TERRE * np.arccos(cosinus) + 1.0)
+
+
+def arrondi_tsplib(distances: np.ndarray, type_poids: str) -> np.ndarray:
+    """Arrondi en place des distances des types entiers de la norme TSPLIB
+
+    Parameters
+    ----------
+    distances : np.ndarray
+        distances euclidiennes, ou de la métrique du type pour `MAN_2D` et `MAX_2D`
+    type_poids : str
+        type de distance parmi `TYPES_POIDS`
+
+    Returns
+    -------
+    np.ndarray
+        les distances arrondies
+    """
+    if type_poids in ('MAN_2D', 'MAX_2D'):
+        # nint(x) = (int) (x + 0.5) pour des distances positives
+        distances += 0.5
+        np.floor(distances, out=distances)
+    elif type_poids == 'CEIL_2D':
+        np.ceil(distances, out=distances)
+    elif type_poids == 'ATT':
+        # Distance pseudo-euclidienne : r = sqrt((dx² + dy²) / 10), arrondie à
+        # l'entier supérieur si l'entier le plus proche lui est inférieur
+        distances /= np.sqrt(10.0)
+        arrondi = np.floor(distances + 0.5)
+        distances[...] = arrondi + (arrondi < distances)
+    return distances
+
+
+def distances_bloc(a: np.ndarray, b: np.ndarray, type_poids="EUC_2D") -> np.ndarray:
+    """Distances entre toutes les villes de `a` et toutes les villes de `b`
+
+    Parameters
+    ----------
+    a : np.ndarray
+        coordonnées 2D de dimension (nombre de villes de a, 2)
+    b : np.ndarray
+        coordonnées 2D de dimension (nombre de villes de b, 2)
+    type_poids : str (optionnel)
+        type de distance parmi `TYPES_POIDS`, hors `EXPLICIT`
+
+    Returns
+    -------
+    np.ndarray
+        matrice des distances de dimension (nombre de villes de a, nombre de villes de b)
+    """
+    if type_poids == 'GEO':
+        return distance_geographique(a[:, np.newaxis], b[np.newaxis])
+    return arrondi_tsplib(distance.cdist(a, b, METRIQUES.get(type_poids, 'euclidean')), type_poids)
+
+
+def distances_couples(a: np.ndarray, b: np.ndarray, type_poids="EUC_2D") -> np.ndarray:
+    """Distances entre les villes de `a` et les villes de `b` de même position
+
+    Parameters
+    ----------
+    a : np.ndarray
+        coordonnées 2D de dimension (..., 2)
+    b : np.ndarray
+        coordonnées 2D de même dimension que `a`
+    type_poids : str (optionnel)
+        type de distance parmi `TYPES_POIDS`, hors `EXPLICIT`
+
+    Returns
+    -------
+    np.ndarray
+        distances de chaque couple de villes
+    """
+    if type_poids == 'GEO':
+        return distance_geographique(a, b)
+    ecarts = np.abs(a - b)
+    if type_poids == 'MAN_2D':
+        return arrondi_tsplib(ecarts.sum(axis=-1), type_poids)
+    if type_poids == 'MAX_2D':
+        return arrondi_tsplib(ecarts.max(axis=-1), type_poids)
+    return arrondi_tsplib(np.hypot(ecarts[..., 0], ecarts[..., 1]), type_poids)
+
+
+def coordonnee_geographique(coordonnee: float) -> float:
+    """Conversion d'une coordonnée `DDD.MM` TSPLIB en radians, voir `coordonnees_geographiques`"""
+    degres = math.trunc(coordonnee)
+    return PI_TSPLIB * (degres + 5.0 * (coordonnee - degres) / 3.0) / 180.0
+
+
+def distance_couple(xa: float, ya: float, xb: float, yb: float, type_poids="EUC_2D") -> float:
+    """Distance entre deux villes, calculée sur des flottants Python
+
+    Elle donne les mêmes valeurs que `distances_bloc` sans passer par des tableaux,
+    dont la construction coûte bien plus que le calcul d'une seule distance.
+
+    Parameters
+    ----------
+    xa, ya : float
+        coordonnées de la première ville
+    xb, yb : float
+        coordonnées de la seconde ville
+    type_poids : str (optionnel)
+        type de distance parmi `TYPES_POIDS`, hors `EXPLICIT`
+
+    Returns
+    -------
+    float
+        distance entre les deux villes
+    """
+    if type_poids == 'GEO':
+        lat_a, lon_a = coordonnee_geographique(xa), coordonnee_geographique(ya)
+        lat_b, lon_b = coordonnee_geographique(xb), coordonnee_geographique(yb)
+        q1 = math.cos(lon_a - lon_b)
+        q2 = math.cos(lat_a - lat_b)
+        q3 = math.cos(lat_a + lat_b)
+        cosinus = min(1.0, max(-1.0, 0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3)))
+        return float(math.floor(RAYON_TERRE * math.acos(cosinus) + 1.0))
+    dx = abs(xa - xb)
+    dy = abs(ya - yb)
+    if type_poids == 'MAN_2D':
+        return float(math.floor(dx + dy + 0.5))
+    if type_poids == 'MAX_2D':
+        return float(math.floor(max(dx, dy) + 0.5))
+    # Même calcul que `distance.cdist`, pour que la valeur soit identique à celle des lignes
+    distance_euclidienne = math.sqrt(dx * dx + dy * dy)
+    if type_poids == 'CEIL_2D':
+        return float(math.ceil(distance_euclidienne))
+    if type_poids == 'ATT':
+        r = distance_euclidienne / math.sqrt(10.0)
+        arrondi = math.floor(r + 0.5)
+        return float(arrondi + 1 if arrondi < r else arrondi)
+    return distance_euclidienne
+
+
 def matrice_distance(villes: pd.DataFrame) -> np.ndarray:
     """
     Retourne une matrice stockant les distances inter villes. Cette matrice renseigne
@@ -29,22 +269,261 @@ def matrice_distance(villes: pd.DataFrame) -> np.ndarray:
 
     Parameters
     ----------
-    villes : DataFrame
-        dataframe stockant l'intégralité des coordonnées des villes à parcourir
+    villes : Instance | DataFrame
+        instance ou dataframe stockant l'intégralité des coordonnées des villes à parcourir
 
     Returns
     -------
     np.ndarray
         matrice stockant l'integralité des distances inter villes
     """
-    dist_matrice = distance.cdist(
-        villes[['x', 'y']], villes[['x', 'y']], 'euclidean')
+    if type_poids(villes) == 'EXPLICIT':
+        dist_matrice = np.array(poids_explicites(villes), dtype=np.float64)
+    else:
+        coordonnees = coordonnees_villes(villes)
+        dist_matrice = distances_bloc(coordonnees, coordonnees, type_poids(villes))
+
+    # On remplace les zéros des diagonales, en place. Deux villes distinctes de mêmes
+    # coordonnées restent à une distance nulle
+    np.fill_diagonal(dist_matrice, np.Inf)
+    return dist_matrice
+
+
+def empreinte_instance(coordonnees: np.ndarray, type_distance: str, type_poids="EUC_2D") -> str:
+    """Empreinte identifiant une matrice des distances dans le cache
+
+    Parameters
+    ----------
+    coordonnees : np.ndarray
+        coordonnées 2D des villes de dimension (nombre de villes, 2)
+    type_distance : str
+        type de stockage de la matrice parmi les clés de `TYPES_DISTANCE`
+    type_poids : str (optionnel)
+        type de distance parmi `TYPES_POIDS`, hors `EXPLICIT`
+
+    Returns
+    -------
+    str
+        empreinte hexadécimale
+    """
+    empreinte = hashlib.sha1(np.ascontiguousarray(
+        coordonnees, dtype=np.float64).tobytes())
+    empreinte.update(type_distance.encode())
+    # Les matrices euclidiennes gardent l'empreinte qu'elles avaient avant les types TSPLIB
+    if type_poids != 'EUC_2D':
+        empreinte.update(type_poids.encode())
+    return empreinte.hexdigest()
+
+
+def matrice_distance_compacte(villes: pd.DataFrame, type_distance="float64", taille_bloc=TAILLE_BLOC_MATRICE,
+                              dossier_cache=None) -> np.ndarray:
+    """Construction de la matrice des distances par blocs de lignes
+
+    Contrairement à `matrice_distance`, la matrice est remplie bloc par bloc : seul un
+    bloc de `taille_bloc` lignes est calculé en double précision à la fois. Elle peut
+    être stockée en `float32` ou arrondie à l'entier le plus proche (`nint`) comme
+    dans la norme TSPLIB. Les distances sont celles du type TSPLIB de l'instance. Si un dossier de cache est donné, la matrice y est écrite au
+    format `.npy` et les appels suivants sur la même instance la projettent en mémoire
+    (`np.memmap`) sans la recalculer.
 
-    # On remplace les zéros des diagonales
-    dist_matrice = np.where(dist_matrice == 0, np.Inf, dist_matrice)
+    Parameters
+    ----------
+    villes : Instance | DataFrame
+        instance ou dataframe stockant l'intégralité des coordonnées des villes à parcourir
+    type_distance : str (optionnel)
+        type de stockage de la matrice parmi les clés de `TYPES_DISTANCE`
+    taille_bloc : int (optionnel)
+        nombre de lignes calculées à la fois
+    dossier_cache : str (optionnel)
+        dossier de stockage des matrices déjà calculées
+
+    Returns
+    -------
+    np.ndarray
+        matrice stockant l'integralité des distances inter villes, en lecture seule
+        si elle provient du cache
+    """
+    assert type_distance in TYPES_DISTANCE, print(
+        "Veuillez choisir un type parmi : {}".format(list(TYPES_DISTANCE)))
+
+    coordonnees = coordonnees_villes(villes)
+    nombre_ville = len(coordonnees)
+    forme = (nombre_ville, nombre_ville)
+    dtype = TYPES_DISTANCE[type_distance]
+    poids = type_poids(villes)
+    assert poids != 'EXPLICIT', print(
+        "Les distances d'une instance EXPLICIT sont lues dans le fichier")
+
+    if dossier_cache is not None:
+        fichier = os.path.join(dossier_cache, "{}.npy".format(
+            empreinte_instance(coordonnees, type_distance, poids)))
+        if os.path.exists(fichier):
+            return np.load(fichier, mmap_mode='r')
+        os.makedirs(dossier_cache, exist_ok=True)
+        # Ecriture dans un fichier temporaire pour ne jamais laisser de matrice incomplète
+        fichier_temporaire = "{}.{}.tmp".format(fichier, os.getpid())
+        dist_matrice = np.lib.format.open_memmap(
+            fichier_temporaire, mode='w+', dtype=dtype, shape=forme)
+    else:
+        dist_matrice = np.empty(forme, dtype=dtype)
+
+    for debut in range(0, nombre_ville, taille_bloc):
+        fin = min(debut + taille_bloc, nombre_ville)
+        bloc = distances_bloc(coordonnees[debut:fin], coordonnees, poids)
+        if type_distance == 'nint':
+            # nint(x) = (int) (x + 0.5) pour des distances positives
+            bloc += 0.5
+            np.floor(bloc, out=bloc)
+        dist_matrice[debut:fin] = bloc
+
+    # Seule la diagonale est remplacée, en place
+    if type_distance == 'nint':
+        np.fill_diagonal(dist_matrice, DISTANCE_INFINIE_ENTIERE)
+    else:
+        np.fill_diagonal(dist_matrice, np.Inf)
+
+    if dossier_cache is not None:
+        dist_matrice.flush()  # type: ignore
+        del dist_matrice
+        os.replace(fichier_temporaire, fichier)
+        return np.load(fichier, mmap_mode='r')
     return dist_matrice
 
 
+class DistancesCoordonnees:
+    """Fournisseur de distances calculées à la demande à partir des coordonnées.
+
+    Il remplace la matrice dense des distances pour les grandes instances : la mémoire
+    utilisée est en O(n) plus un cache LRU des lignes les plus utilisées. Les indexations
+    utilisées par les algorithmes sur `matrice_distance` sont supportées :
+    `m[i, j]`, `m[i, :]`, `m[i, tableau]`, `m[tableau, tableau]` et `m[debut:fin]`.
+    Comme pour la matrice dense, la distance d'une ville à elle même est infinie.
+
+    Parameters
+    ----------
+    coordonnees : np.ndarray
+        coordonnées 2D des villes de dimension (nombre de villes, 2)
+    taille_cache : int (optionnel)
+        nombre maximal de lignes conservées en cache
+    type_poids : str (optionnel)
+        type de distance parmi `TYPES_POIDS`, hors `EXPLICIT`
+    """
+
+    def __init__(self, coordonnees: np.ndarray, taille_cache=TAILLE_CACHE_LIGNES, type_poids="EUC_2D"):
+        self.coordonnees = np.ascontiguousarray(coordonnees, dtype=np.float64)
+        self.type_poids = type_poids
+        self.taille_cache = taille_cache
+        self.cache = OrderedDict()
+        self.shape = (len(self.coordonnees), len(self.coordonnees))
+        self.dtype = self.coordonnees.dtype
+
+    def __len__(self) -> int:
+        return self.shape[0]
+
+    def distance(self, i: int, j: int) -> float:
+        """Distance entre les villes `i` et `j`"""
+        if i == j:
+            return np.Inf
+        coordonnees = self.coordonnees
+        return distance_couple(coordonnees.item(i, 0), coordonnees.item(i, 1),
+                               coordonnees.item(j, 0), coordonnees.item(j, 1), self.type_poids)
+
+    def ligne(self, i: int) -> np.ndarray:
+        """Distances de la ville `i` à toutes les villes, en passant par le cache"""
+        i = int(i)
+        if i in self.cache:
+            self.cache.move_to_end(i)
+            return self.cache[i]
+        ligne = distances_couples(self.coordonnees, self.coordonnees[i], self.type_poids)
+        ligne[i] = np.Inf
+        # Les lignes sont partagées entre les appels, on interdit leur modification
+        ligne.flags.writeable = False
+        self.cache[i] = ligne
+        if len(self.cache) > self.taille_cache:
+            self.cache.popitem(last=False)
+        return ligne
+
+    def plus_proches_voisins(self, nombre_voisins: int) -> np.ndarray:
+        """Index des k plus proches voisins de chaque ville triés par distance croissante
+
+        Les voisins sont cherchés dans un arbre k-d avec la norme du type de distance.
+        Pour les distances `GEO` ce sont les voisins sur les coordonnées en radians,
+        une approximation des voisins sur la sphère.
+        """
+        k = min(nombre_voisins, len(self) - 1)
+        if self.type_poids == 'GEO':
+            coordonnees = coordonnees_geographiques(self.coordonnees)
+        else:
+            coordonnees = self.coordonnees
+        norme = {'MAN_2D': 1, 'MAX_2D': np.inf}.get(self.type_poids, 2)
+        _, voisins = cKDTree(coordonnees).query(coordonnees, k + 1, p=norme)
+        # On retire la ville elle même. En cas de doublon elle n'est pas forcément
+        # en première position
+        villes = np.arange(len(self))[:, np.newaxis]
+        est_voisin = voisins != villes
+        est_voisin[est_voisin.all(axis=1), -1] = False
+        return voisins[est_voisin].reshape(len(self), k)
+
+    def __getitem__(self, index):
+        if not isinstance(index, tuple):
+            index = (index, slice(None))
+        lignes, colonnes = index
+
+        if isinstance(lignes, (int, np.integer)):
+            if isinstance(colonnes, (int, np.integer)):
+                return self.distance(lignes, colonnes)
+            return self.ligne(lignes)[colonnes]
+
+        toutes_villes = np.arange(len(self))
+        lignes = toutes_villes[lignes] if isinstance(
+            lignes, slice) else np.asarray(lignes)
+        if isinstance(colonnes, slice):
+            # Bloc de lignes complètes
+            colonnes = toutes_villes[colonnes]
+            bloc = distances_bloc(
+                self.coordonnees[lignes], self.coordonnees[colonnes], self.type_poids)
+            bloc[lignes[:, np.newaxis] == colonnes] = np.Inf
+            return bloc
+
+        # Distances entre des couples de villes
+        lignes, colonnes = np.broadcast_arrays(lignes, np.asarray(colonnes))
+        distances = distances_couples(
+            self.coordonnees[lignes], self.coordonnees[colonnes], self.type_poids)
+        distances[lignes == colonnes] = np.Inf
+        return distances
+
+
+def fournisseur_distance(villes: pd.DataFrame, taille_max_dense=TAILLE_MAX_MATRICE_DENSE, type_distance="float64",
+                         dossier_cache=None) -> np.ndarray | DistancesCoordonnees:
+    """Choix de la représentation des distances inter villes selon la taille de l'instance
+
+    Parameters
+    ----------
+    villes : Instance | DataFrame
+        instance ou dataframe stockant l'intégralité des coordonnées des villes à parcourir
+    taille_max_dense : int (optionnel)
+        nombre de villes au delà duquel on ne construit plus la matrice dense
+    type_distance : str (optionnel)
+        type de stockage de la matrice dense parmi les clés de `TYPES_DISTANCE`
+    dossier_cache : str (optionnel)
+        dossier de stockage des matrices denses déjà calculées
+
+    Returns
+    -------
+    np.ndarray | DistancesCoordonnees
+        la matrice dense des distances pour les petites instances, un fournisseur de
+        distances calculées à la demande sinon. Pour une instance `EXPLICIT`, la
+        matrice lue dans le fichier
+    """
+    if type_poids(villes) == 'EXPLICIT':
+        dist_matrice = np.array(poids_explicites(villes), dtype=TYPES_DISTANCE[type_distance])
+        np.fill_diagonal(dist_matrice, DISTANCE_INFINIE_ENTIERE if type_distance == 'nint' else np.Inf)
+        return dist_matrice
+    if len(villes) <= taille_max_dense:
+        return matrice_distance_compacte(villes, type_distance, dossier_cache=dossier_cache)
+    return DistancesCoordonnees(coordonnees_villes(villes), type_poids=type_poids(villes))
+
+
 def distance_trajet(itineraire: list[int], matrice_distance: np.ndarray) -> float:
     """Calcul de la distance totale d'un trajet
 
@@ -52,7 +531,7 @@ def distance_trajet(itineraire: list[int], matrice_distance: np.ndarray) -> floa
     ----------
     itineraire : list[int]
         liste ordonnées des villes parcourues
-    matrice_distance : np.ndarray
+    matrice_distance : np.ndarray | DistancesCoordonnees
         matrice stockant l'integralité des distances inter villes
 
     Returns
@@ -60,11 +539,48 @@ def distance_trajet(itineraire: list[int], matrice_distance: np.ndarray) -> floa
     float
         la distance de l'itinéraire considéré
     """
-    distance = 0
-    for index, ville in enumerate(itineraire[:-1]):
-        # distance entre la ville itineraire[index] et itineraire[index+1]
-        distance += matrice_distance[ville, itineraire[index+1]]
-    return distance
+    if len(itineraire) < 2:
+        return 0.0
+    trajets = np.asarray(itineraire, dtype=np.intp)[np.newaxis, :]
+    return float(distances_trajets(trajets, matrice_distance)[0])
+
+
+def distances_trajets(trajets: np.ndarray, matrice_distance: np.ndarray, taille_bloc=TAILLE_BLOC_TRAJETS) -> np.ndarray:
+    """Calcul des distances totales d'un ensemble de trajets de même longueur
+
+    Les arêtes de tous les trajets sont lues en une seule indexation de
+    `matrice_distance` puis sommées par trajet. Les trajets sont traités par blocs
+    d'au plus `taille_bloc` arêtes pour borner la mémoire utilisée.
+
+    Parameters
+    ----------
+    trajets : np.ndarray
+        tableau d'entiers de dimension (nombre de trajets, nombre de villes + 1), chaque
+        ligne étant une liste ordonnée des villes parcourues
+    matrice_distance : np.ndarray | DistancesCoordonnees
+        matrice stockant l'integralité des distances inter villes
+    taille_bloc : int (optionnel)
+        nombre maximal d'arêtes lues à la fois
+
+    Returns
+    -------
+    np.ndarray
+        la distance de chacun des trajets
+    """
+    trajets = np.asarray(trajets)
+    nombre_trajets, nombre_etapes = trajets.shape
+    distances = np.zeros(nombre_trajets, dtype=np.float64)
+    if nombre_etapes < 2:
+        return distances
+
+    # Nombre de trajets traités à la fois
+    taille_bloc_trajets = max(1, taille_bloc // (nombre_etapes - 1))
+    for debut in range(0, nombre_trajets, taille_bloc_trajets):
+        bloc = trajets[debut:debut + taille_bloc_trajets]
+        # Somme en flottant pour ne pas accumuler dans le type entier d'une matrice `nint`
+        distances[debut:debut + len(bloc)] = np.asarray(
+            matrice_distance[bloc[:, :-1], bloc[:, 1:]]).sum(axis=1, dtype=np.float64)
+    return distances
 
 
 def neurone_gagnant(neurones: np.ndarray, ville: np.ndarray) -> np.intp:
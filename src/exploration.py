@@ -0,0 +1,118 @@
+from array import array
+
+import numpy as np
+
+# Les chemins explorés par les recherches locales ne sont pas stockés un par un : cela
+# représenterait O(n²) entiers en mémoire pour quelques centaines de villes. On enregistre
+# seulement les mouvements appliqués au tour dans un tableau d'entiers, les chemins sont
+# reconstruits à la demande lors de l'affichage.
+
+# Codes des mouvements enregistrés. Chaque mouvement occupe 4 entiers : son code suivi
+# de ses paramètres `a`, `b` et `c`
+AJOUT = 0  # ajout de la ville `a` à la fin du chemin
+INVERSION = 1  # inversion cyclique des positions `a` à `b` du tour
+ECHANGE = 2  # échange des segments consécutifs commençant aux positions `a`, `b` et `c`
+ROTATION = 3  # le tour est réécrit en commençant par la ville `a`
+
+
+class TraceExploration:
+    """Journal compact des chemins explorés par un algorithme.
+
+    Pour un tour (`cycle=True`), l'itinéraire initial est donné par `depart` puis chaque
+    modification par `inversion` ou `echange`, avec les positions utilisées sur le
+    tableau de travail de l'algorithme. Pour un chemin construit ville par ville
+    (`cycle=False`), on utilise `ajout`. Un chemin est enregistré à chaque appel de
+    `instantane` et les chemins sont restitués dans l'ordre en parcourant la trace.
+
+    Parameters
+    ----------
+    cycle : bool (optionnel)
+        vrai si les chemins sont des tours fermés, faux s'ils sont construits ville
+        par ville
+    """
+
+    def __init__(self, cycle=True):
+        self.cycle = cycle
+        self.itineraire_initial = None
+        self.mouvements = array('i')
+        # Nombre de mouvements appliqués lors de chaque chemin enregistré
+        self.etapes = array('i')
+
+    def __len__(self) -> int:
+        return len(self.etapes)
+
+    def __iter__(self):
+        return self.chemins()
+
+    def mouvement(self, code: int, a: int, b=0, c=0):
+        """Ajout d'un mouvement à la trace"""
+        self.mouvements.extend((code, int(a), int(b), int(c)))
+
+    def depart(self, itineraire: list[int], instantane=True):
+        """Itinéraire à partir duquel un algorithme commence ses modifications
+
+        Au premier appel il s'agit de l'itinéraire initial, enregistré si `instantane`
+        est vrai. Lorsqu'un algorithme reprend le résultat du précédent, son tableau de
+        travail commence par la même ville que `itineraire` : on enregistre seulement
+        cette rotation, le chemin restant le dernier enregistré.
+        """
+        if self.itineraire_initial is not None:
+            self.mouvement(ROTATION, itineraire[0])
+            return
+        self.itineraire_initial = list(itineraire)
+        if instantane:
+            self.instantane()
+
+    def ajout(self, ville: int):
+        """Ajout d'une ville à la fin du chemin"""
+        self.mouvement(AJOUT, ville)
+
+    def inversion(self, debut_inversion: int, fin_inversion: int):
+        """Inversion cyclique, voir `algo_2_opt.inversion_cyclique`"""
+        self.mouvement(INVERSION, debut_inversion, fin_inversion)
+
+    def echange(self, debut_a: int, debut_b: int, debut_c: int):
+        """Echange de deux segments consécutifs, voir `algo_3_opt.echange_segments`"""
+        self.mouvement(ECHANGE, debut_a, debut_b, debut_c)
+
+    def instantane(self):
+        """Enregistrement du chemin courant"""
+        self.etapes.append(len(self.mouvements) // 4)
+
+    def chemins(self):
+        """Reconstruction paresseuse des chemins enregistrés
+
+        Yields
+        ------
+        list[int]
+            chemin enregistré, fermé par la ville de départ pour un tour
+        """
+        # Import local : les algorithmes importent eux même ce module
+        from src.algo_2_opt import chemin_ferme, inversion_cyclique
+        from src.algo_3_opt import echange_segments
+
+        if self.itineraire_initial is None:
+            return
+        if self.cycle:
+            ville_depart = self.itineraire_initial[0]
+            tour = np.array(self.itineraire_initial[:-1], dtype=np.intp)
+            position = np.empty(len(tour), dtype=np.intp)
+            position[tour] = np.arange(len(tour))
+        else:
+            chemin = list(self.itineraire_initial)
+
+        mouvements = np.array(self.mouvements, dtype=np.int32).reshape(-1, 4)
+        nombre_appliques = 0
+        for etape in self.etapes:
+            for code, a, b, c in mouvements[nombre_appliques:etape].tolist():
+                if code == AJOUT:
+                    chemin.append(a)
+                elif code == INVERSION:
+                    inversion_cyclique(tour, position, a, b)
+                elif code == ECHANGE:
+                    echange_segments(tour, position, a, b, c)
+                else:
+                    tour = np.array(chemin_ferme(tour, a)[:-1], dtype=np.intp)
+                    position[tour] = np.arange(len(tour))
+            nombre_appliques = etape
+            yield chemin_ferme(tour, ville_depart) if self.cycle else list(chemin)
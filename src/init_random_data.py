@@ -1,37 +1,137 @@
-import random
-
+import numpy as np
 import pandas as pd
 
+from src.init_test_data import ecriture_TSPLIB
+from src.instance import Instance
+
+# Les instances aléatoires sont tirées d'un coup dans des tableaux NumPy, ce qui permet
+# d'en construire de plusieurs millions de villes pour mesurer le passage à l'échelle
+# des algorithmes. A graine égale, une même instance est reproduite.
+
+# Borne des coordonnées x et y des villes
+TAILLE_FENETRE = 1000
+
+# Répartitions des villes disponibles : uniforme dans la fenêtre, en amas gaussiens
+# autour de centres tirés uniformément, ou sur les noeuds d'une grille régulière
+DISTRIBUTIONS = ('uniforme', 'amas', 'grille')
+
+# Nombre d'amas par défaut de la répartition en amas
+NOMBRE_AMAS = 10
+
+# Ecart type d'un amas, en proportion de la taille de la fenêtre
+ECART_TYPE_AMAS = 0.05
+
+
+def coordonnees_aleatoires(n: int, distribution="uniforme", graine=None, bornes=(0, TAILLE_FENETRE),
+                           nombre_amas=NOMBRE_AMAS, ecart_type_amas=ECART_TYPE_AMAS) -> np.ndarray:
+    """Tirage des coordonnées de N villes
+
+    Parameters
+    ----------
+    n : int
+        nombre de villes
+    distribution : str (optionnel)
+        répartition des villes parmi `DISTRIBUTIONS`
+    graine : int (optionnel)
+        graine du générateur de nombres aléatoires
+    bornes : tuple (optionnel)
+        coordonnées minimale et maximale des villes, communes aux deux axes ou sous
+        la forme `((x_min, y_min), (x_max, y_max))`
+    nombre_amas : int (optionnel)
+        nombre d'amas de la répartition `'amas'`
+    ecart_type_amas : float (optionnel)
+        écart type des amas en proportion de la taille de la fenêtre
+
+    Returns
+    -------
+    np.ndarray
+        coordonnées des villes de dimension (n, 2)
+    """
+    assert distribution in DISTRIBUTIONS, print(
+        "Veuillez choisir une distribution parmi : {}".format(DISTRIBUTIONS))
+
+    generateur = np.random.default_rng(graine)
+    minimum = np.broadcast_to(np.asarray(bornes[0], dtype=np.float64), 2)
+    maximum = np.broadcast_to(np.asarray(bornes[1], dtype=np.float64), 2)
+    etendue = maximum - minimum
+
+    if distribution == 'uniforme':
+        coordonnees = generateur.uniform(minimum, maximum, (n, 2))
+    elif distribution == 'amas':
+        centres = generateur.uniform(minimum, maximum, (nombre_amas, 2))
+        coordonnees = centres[generateur.integers(nombre_amas, size=n)]
+        coordonnees += generateur.normal(0, 1, (n, 2)) * (ecart_type_amas * etendue)
+        # Les villes tirées hors de la fenêtre sont ramenées sur son bord
+        np.clip(coordonnees, minimum, maximum, out=coordonnees)
+    else:
+        # Les villes occupent des noeuds distincts tirés parmi ceux de la plus petite
+        # grille carrée pouvant toutes les contenir
+        cote = max(2, int(np.ceil(np.sqrt(n))))
+        noeuds = generateur.choice(cote * cote, n, replace=False)
+        coordonnees = np.column_stack(np.divmod(noeuds, cote)).astype(np.float64)
+        coordonnees *= etendue / (cote - 1)
+        coordonnees += minimum
+    return coordonnees
+
+
+def instance_aleatoire(n: int, distribution="uniforme", graine=None, bornes=(0, TAILLE_FENETRE),
+                       fichier=None, **parametres) -> Instance:
+    """Construction d'une instance de N villes tirées aléatoirement
+
+    Parameters
+    ----------
+    n : int
+        nombre de villes
+    distribution : str (optionnel)
+        répartition des villes parmi `DISTRIBUTIONS`
+    graine : int (optionnel)
+        graine du générateur de nombres aléatoires
+    bornes : tuple (optionnel)
+        coordonnées minimale et maximale des villes, voir `coordonnees_aleatoires`
+    fichier : str (optionnel)
+        si donné, l'instance est aussi écrite au format .tsp dans ce fichier
+    **parametres
+        paramètres optionnels de la répartition (`nombre_amas`, `ecart_type_amas`)
+
+    Returns
+    -------
+    Instance
+        l'instance ainsi créée
+    """
+    instance = Instance(coordonnees_aleatoires(n, distribution, graine, bornes, **parametres),
+                        nom="{}{}".format(distribution, n))
+    if fichier is not None:
+        ecriture_TSPLIB(instance, fichier, "Instance aleatoire {} de graine {}".format(
+            distribution, graine))
+    return instance
+
 
-def init_random_df(n: int) -> pd.DataFrame:
+def init_random_df(n: int, distribution="uniforme", graine=None, bornes=(0, TAILLE_FENETRE),
+                   **parametres) -> pd.DataFrame:
     """Initialisation d'un dataframe de ville à traverser
 
-    Un ensemble de N villes definies par un couple de coordonnées (x,y). 
+    Un ensemble de N villes definies par un couple de coordonnées (x,y).
     Les villes ont un index entre [0:N-1]
 
     Parameters
     ----------
     n : int
         nombre de villes présentent dans le dataframe
+    distribution : str (optionnel)
+        répartition des villes parmi `DISTRIBUTIONS`
+    graine : int (optionnel)
+        graine du générateur de nombres aléatoires
+    bornes : tuple (optionnel)
+        coordonnées minimale et maximale des villes, voir `coordonnees_aleatoires`
+    **parametres
+        paramètres optionnels de la répartition (`nombre_amas`, `ecart_type_amas`)
 
     Returns
     -------
     DataFrame
         L'ensemble des villes ainsi crée
     """
-    # Borne des coordonnées x et y des villes
-    TAILLE_FENETRE = 1000
-    x = []
-    y = []
-    while len(x) < n:
-        # Initialisation aléatoire des coordonnées d'une ville
-        a = random.randint(0, TAILLE_FENETRE)
-        b = random.randint(0, TAILLE_FENETRE)
-        # Ajout si la ville n'est pas déjà présente
-        if a not in x and b not in y:
-            x.append(a)
-            y.append(b)
-    index = [a for a in range(len(x))]
+    coordonnees = coordonnees_aleatoires(n, distribution, graine, bornes, **parametres)
     # Création du dataframe
-    data = pd.DataFrame({'Ville': index, 'x': x, 'y': y})
+    data = pd.DataFrame({'Ville': np.arange(n), 'x': coordonnees[:, 0], 'y': coordonnees[:, 1]})
     return (data)
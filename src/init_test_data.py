@@ -1,6 +1,14 @@
+import gzip
+import hashlib
+import json
+import os
+
 import numpy as np
 import pandas as pd
 
+from src.distance import TYPES_POIDS
+from src.instance import Instance, en_instance
+
 
 # Pour favoriser la réutilisation par la comunauté scientifique
 # les tests des algorithmes implémentés peuvent être réalisées sur
@@ -9,16 +17,290 @@ import pandas as pd
 # Lien de téléchargement des fichier .tsp
 # http://comopt.ifi.uni-heidelberg.de/software/TSPLIB95/tsp/
 
+# Formats de la section `EDGE_WEIGHT_SECTION` des instances `EXPLICIT` supportés
+FORMATS_POIDS = ('FULL_MATRIX', 'UPPER_ROW', 'LOWER_ROW', 'UPPER_DIAG_ROW', 'LOWER_DIAG_ROW',
+                 'UPPER_COL', 'LOWER_COL', 'UPPER_DIAG_COL', 'LOWER_DIAG_COL')
+
+# Dossier de stockage des instances déjà lues, au format binaire
+DOSSIER_CACHE_INSTANCES = 'data/cache/instances/'
+
+# Taille des blocs lus pour calculer l'empreinte du contenu d'un fichier
+TAILLE_BLOC_EMPREINTE = 1 << 20
+
+# Nombre de lignes des sections de données converties ensemble lors de la lecture d'un .tsp
+TAILLE_BLOC_LIGNES = 4096
+
 
-def data_TSPLIB(fichier: str) -> pd.DataFrame:
+def ouverture_tsplib(fichier: str):
+    """Ouverture en binaire d'un fichier .tsp, éventuellement compressé avec gzip"""
+    with open(fichier, 'rb') as f:
+        compresse = f.read(2) == b'\x1f\x8b'
+    return gzip.open(fichier, 'rb') if compresse else open(fichier, 'rb')
+
+
+def nombre_poids(format_poids: str, dimension: int) -> int:
+    """Nombre de distances d'une section `EDGE_WEIGHT_SECTION` selon son format"""
+    if format_poids == 'FULL_MATRIX':
+        return dimension * dimension
+    if 'DIAG' in format_poids:
+        return dimension * (dimension + 1) // 2
+    return dimension * (dimension - 1) // 2
+
+
+def matrice_poids(poids: np.ndarray, format_poids: str, dimension: int) -> np.ndarray:
+    """Construction de la matrice complète des distances d'une instance `EXPLICIT`
+
+    Parameters
+    ----------
+    poids : np.ndarray
+        distances lues dans la section `EDGE_WEIGHT_SECTION`
+    format_poids : str
+        format de la section parmi les formats de `FORMATS_POIDS`
+    dimension : int
+        nombre de villes
+
+    Returns
+    -------
+    np.ndarray
+        matrice symétrique des distances
+    """
+    if format_poids == 'FULL_MATRIX':
+        return poids.reshape(dimension, dimension)
+    # Parcourir le triangle supérieur par colonnes revient à parcourir le triangle
+    # inférieur par lignes, et inversement
+    decalage = 0 if 'DIAG' in format_poids else 1
+    matrice = np.zeros((dimension, dimension))
+    if format_poids in ('UPPER_ROW', 'UPPER_DIAG_ROW', 'LOWER_COL', 'LOWER_DIAG_COL'):
+        lignes, colonnes = np.triu_indices(dimension, decalage)
+    else:
+        lignes, colonnes = np.tril_indices(dimension, -decalage)
+    matrice[lignes, colonnes] = poids
+    matrice[colonnes, lignes] = poids
+    return matrice
+
+
+def empreinte_fichier(fichier: str) -> str:
+    """Empreinte du contenu d'un fichier, lu par blocs"""
+    empreinte = hashlib.sha1()
+    with open(fichier, 'rb') as f:
+        for bloc in iter(lambda: f.read(TAILLE_BLOC_EMPREINTE), b''):
+            empreinte.update(bloc)
+    return empreinte.hexdigest()
+
+
+def ecriture_atomique(fichier: str, ecriture, mode='wb'):
+    """Ecriture dans un fichier temporaire renommé une fois complet, pour ne jamais
+    laisser de fichier incomplet dans le cache"""
+    fichier_temporaire = "{}.{}.tmp".format(fichier, os.getpid())
+    with open(fichier_temporaire, mode) as f:
+        ecriture(f)
+    os.replace(fichier_temporaire, fichier)
+
+
+def instance_TSPLIB_cache(fichier: str, dossier_cache=DOSSIER_CACHE_INSTANCES) -> Instance:
+    """Lecture d'un fichier .tsp en passant par sa copie binaire
+
+    La première lecture d'un fichier enregistre ses coordonnées au format `.npy` (et sa
+    matrice des distances pour une instance `EXPLICIT`), avec ses informations dans un
+    fichier `.json`. Les lectures suivantes projettent ces tableaux en mémoire
+    (`np.memmap`, en copie sur écriture) sans relire le texte. La copie d'un fichier est
+    identifiée par son chemin, et reste valide tant que sa date de modification et sa
+    taille sont inchangées ou, à défaut, tant que l'empreinte de son contenu l'est.
+
+    Parameters
+    ----------
+    fichier : str
+        nom du fichier à traiter. Fichier dans le dossier `data`
+    dossier_cache : str (optionnel)
+        dossier de stockage des instances déjà lues
+
+    Returns
+    -------
+    Instance
+        l'instance décrite par le fichier .tsp
+    """
+    base = os.path.join(dossier_cache, hashlib.sha1(
+        os.path.abspath(fichier).encode()).hexdigest())
+    fichier_infos = base + '.json'
+    etat = os.stat(fichier)
+
+    if os.path.exists(fichier_infos):
+        with open(fichier_infos) as f:
+            infos = json.load(f)
+        valide = infos['date_modification'] == etat.st_mtime_ns and infos['taille'] == etat.st_size
+        if not valide and infos['empreinte'] == empreinte_fichier(fichier):
+            # Fichier touché sans que son contenu change : seule sa date est mise à jour
+            valide = True
+            infos['date_modification'] = etat.st_mtime_ns
+            infos['taille'] = etat.st_size
+            ecriture_atomique(fichier_infos, lambda f: json.dump(infos, f), 'w')
+        if valide:
+            coordonnees = np.load(base + '.npy', mmap_mode='c')
+            poids = np.load(base + '.poids.npy', mmap_mode='c') \
+                if infos['type_poids'] == 'EXPLICIT' else None
+            return Instance(coordonnees, infos['nom'], infos['type_poids'], poids)
+
+    instance = instance_TSPLIB(fichier)
+    os.makedirs(dossier_cache, exist_ok=True)
+    ecriture_atomique(base + '.npy', lambda f: np.save(f, instance.coordonnees))
+    if instance.type_poids == 'EXPLICIT':
+        ecriture_atomique(base + '.poids.npy', lambda f: np.save(f, instance.poids))
+    # Les informations sont écrites en dernier : leur présence valide les tableaux
+    infos = {
+        'fichier': os.path.abspath(fichier),
+        'date_modification': etat.st_mtime_ns,
+        'taille': etat.st_size,
+        'empreinte': empreinte_fichier(fichier),
+        'nom': instance.nom,
+        'type_poids': instance.type_poids,
+    }
+    ecriture_atomique(fichier_infos, lambda f: json.dump(infos, f), 'w')
+    return instance
+
+
+def mot_cle_section(ligne: bytes) -> str | None:
+    """Nom de la section ouverte par une ligne d'un fichier .tsp, None si la ligne
+    n'ouvre pas de section"""
+    mots = ligne.split()
+    if not mots:
+        return None
+    mot_cle = mots[0].decode('latin-1').upper().rstrip(':')
+    return mot_cle if mot_cle.endswith('_SECTION') else None
+
+
+def lecture_nombres(f, nombre: int) -> np.ndarray:
+    """Lecture des `nombre` prochains nombres d'un fichier .tsp ouvert
+
+    Les lignes sont lues une à une et converties par blocs de `TAILLE_BLOC_LIGNES`
+    lignes, quelle que soit la répartition des nombres sur les lignes. Seul le bloc
+    courant est conservé sous forme de texte.
+
+    Parameters
+    ----------
+    f : file
+        fichier ouvert en binaire, positionné au début des nombres
+    nombre : int
+        nombre de valeurs à lire
+
+    Returns
+    -------
+    np.ndarray
+        les valeurs lues
+    """
+    valeurs = np.empty(nombre, dtype=np.float64)
+    position = 0
+    bloc = []
+    taille_bloc = 0
+    while position + taille_bloc < nombre:
+        ligne = f.readline()
+        assert ligne, print("Fin de fichier atteinte après {} valeurs sur {}".format(
+            position + taille_bloc, nombre))
+        taille_bloc += len(ligne.split())
+        bloc.append(ligne)
+        if len(bloc) == TAILLE_BLOC_LIGNES or position + taille_bloc >= nombre:
+            lus = np.fromstring(b' '.join(bloc), sep=' ')[:nombre - position]
+            valeurs[position:position + len(lus)] = lus
+            position += len(lus)
+            bloc = []
+            taille_bloc = 0
+    return valeurs
+
+
+def instance_TSPLIB(fichier: str, dossier_cache=None) -> Instance:
+    """Lecture d'un fichier au format .tsp
+
+    Le fichier est lu en une passe : les lignes de l'entête une par une, quelle que soit
+    la façon dont les mots clés sont séparés de leur valeur, puis les sections de données
+    comme une suite de nombres séparés par des espaces, des tabulations ou des retours à
+    la ligne. Les fichiers compressés avec gzip sont lus directement.
+
+    Le type de distance (`EDGE_WEIGHT_TYPE`) est conservé dans l'instance pour le calcul
+    des distances. Pour une instance `EXPLICIT` la matrice des distances est conservée
+    dans `Instance.poids` et les coordonnées sont celles de la section `DISPLAY_DATA_SECTION`, inconnues (NaN)
+    en son absence.
+
+    Parameters
+    ----------
+    fichier : str
+        nom du fichier à traiter. Fichier dans le dossier `data`
+    dossier_cache : str (optionnel)
+        dossier de stockage des instances déjà lues, voir `instance_TSPLIB_cache`. Le
+        fichier est relu à chaque appel par défaut
+
+    Returns
+    -------
+    Instance
+        l'instance décrite par le fichier .tsp
+    """
+    if dossier_cache is not None:
+        return instance_TSPLIB_cache(fichier, dossier_cache)
+
+    with ouverture_tsplib(fichier) as f:
+        # Lecture des informations de l'entête jusqu'à la première section
+        entete = {}
+        section = None
+        for ligne in f:
+            section = mot_cle_section(ligne)
+            if section is not None:
+                break
+            cle, _, valeur = ligne.decode('latin-1').partition(':')
+            cle = cle.strip().upper()
+            if cle == 'EOF':
+                break
+            if cle:
+                entete[cle] = valeur.strip()
+
+        assert 'DIMENSION' in entete, print("Le fichier {} n'est pas au format TSPLIB".format(fichier))
+        dimension = int(entete['DIMENSION'])
+        type_poids = entete.get('EDGE_WEIGHT_TYPE', 'EUC_2D').upper()
+        assert type_poids in TYPES_POIDS, print(
+            "Type de distance {} non supporté, types supportés : {}".format(type_poids, TYPES_POIDS))
+        format_poids = entete.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX').upper()
+
+        # Les sections sont lues directement depuis le fichier, sans le charger en mémoire
+        coordonnees = np.full((dimension, 2), np.nan)
+        poids = None
+        while section is not None:
+            if section in ('NODE_COORD_SECTION', 'DISPLAY_DATA_SECTION'):
+                # Une ligne par ville : son numéro puis ses coordonnées
+                noeuds = lecture_nombres(f, 3 * dimension).reshape(dimension, 3)
+                # Les coordonnées d'affichage ne servent qu'aux instances sans coordonnées
+                if section == 'NODE_COORD_SECTION' or type_poids == 'EXPLICIT':
+                    coordonnees[noeuds[:, 0].astype(np.intp) - 1] = noeuds[:, 1:]
+            elif section == 'EDGE_WEIGHT_SECTION':
+                poids = matrice_poids(lecture_nombres(f, nombre_poids(format_poids, dimension)),
+                                      format_poids, dimension)
+            else:
+                # Les autres sections (FIXED_EDGES_SECTION, TOUR_SECTION) se terminent par -1
+                for ligne in f:
+                    if b'-1' in ligne.split():
+                        break
+
+            # Recherche de la section suivante
+            section = None
+            for ligne in f:
+                section = mot_cle_section(ligne)
+                if section is not None or ligne.strip().upper().startswith(b'EOF'):
+                    break
+
+    if type_poids == 'EXPLICIT':
+        assert poids is not None, print("La section EDGE_WEIGHT_SECTION est absente")
+    else:
+        poids = None
+    return Instance(coordonnees, entete.get('NAME', ''), type_poids, poids)
+
+
+def data_TSPLIB(fichier: str, dossier_cache=None) -> pd.DataFrame:
     """
     Lecture d'un fichier au format .tsp en copiant les informations dans 
-    un dataframe pandas
+    un dataframe pandas, voir `instance_TSPLIB`
 
     Parameters
     ----------
     fichier : str
         nom du fichier à traiter. Fichier dans le dossier `data`
+    dossier_cache : str (optionnel)
+        dossier de stockage des instances déjà lues
 
     Returns
     -------
@@ -26,72 +308,87 @@ def data_TSPLIB(fichier: str) -> pd.DataFrame:
         L'ensemble des villes ainsi crées depuis le fichier .tsp. Sous la forme 
         `'Ville', 'x', 'y'`
     """
-    with open(fichier) as f:
-        noeud_coord_debut = None
-        dimension = None
-        lignes = f.readlines()
-
-        # Lecture des informations du fichier .tsp
-        i = 0
-        while not dimension or not noeud_coord_debut:
-            ligne = lignes[i]
-            if ligne.startswith('DIMENSION :'):
-                dimension = int(ligne.split()[-1])
-            if ligne.startswith('NODE_COORD_SECTION'):
-                noeud_coord_debut = i
-            i = i+1
-
-        # On définit le point de référence au début du fichier
-        f.seek(0)
-
-        villes = pd.read_csv(
-            f,
-            # On commence la lecture du fichier au bon endroit
-            skiprows=noeud_coord_debut + 1,
-            # Définition du séparateur
-            sep=' ',
-            # Définition des colonnes du dataframe
-            names=['Ville', 'x', 'y'],
-            # Définition du type des colonnes
-            dtype={'Ville': str, 'x': np.float64, 'y': np.float64},
-            header=None,
-            nrows=dimension
-        )
-
-        return villes
-
-
-def trajet_en_df(trajet: list[int], data: pd.DataFrame) -> pd.DataFrame:
+    return instance_TSPLIB(fichier, dossier_cache).en_dataframe()
+
+
+def ecriture_TSPLIB(data: pd.DataFrame | Instance, fichier: str, commentaire=""):
+    """Ecriture d'une instance au format .tsp, compressée avec gzip si le nom du
+    fichier se termine par `.gz`
+
+    Parameters
+    ----------
+    data : Instance | DataFrame
+        instance ou dataframe stockant l'intégralité des coordonnées des villes
+    fichier : str
+        nom du fichier à écrire
+    commentaire : str (optionnel)
+        commentaire ajouté à l'entête
+    """
+    instance = en_instance(data)
+    assert instance.type_poids != 'EXPLICIT', print(
+        "Seules les instances définies par leurs coordonnées peuvent être écrites")
+
+    entete = "NAME : {}\n".format(instance.nom or os.path.basename(fichier).split('.')[0])
+    if commentaire:
+        entete += "COMMENT : {}\n".format(commentaire)
+    entete += "TYPE : TSP\nDIMENSION : {}\nEDGE_WEIGHT_TYPE : {}\nNODE_COORD_SECTION\n".format(
+        len(instance), instance.type_poids)
+    noeuds = np.column_stack((np.arange(1, len(instance) + 1), instance.coordonnees))
+
+    with (gzip.open if fichier.endswith('.gz') else open)(fichier, 'wb') as f:
+        f.write(entete.encode())
+        # 17 chiffres significatifs suffisent à relire exactement les mêmes flottants
+        np.savetxt(f, noeuds, fmt=('%d', '%.17g', '%.17g'))
+        f.write(b"EOF\n")
+
+
+def trajet_en_df(trajet: list[int], data: pd.DataFrame | Instance) -> pd.DataFrame:
     """Convertion d'un trajet en un dataframe afin de l'afficher simplement
 
     Parameters
     ----------
     trajet : list
         list ordonne de villes
-    data : DataFrame
-        Dataframe stockant l'intégralité des coordonnées des villes à parcourir
+    data : Instance | DataFrame
+        instance ou dataframe stockant l'intégralité des coordonnées des villes à parcourir
 
     Returns
     -------
     DataFrame
         DataFrame ordonné pour afficher correctement le trajet trouvé
     """
-    # Récupération des coordonnées des villes pour pouvoir les afficher
-    x = []
-    y = []
-    index = []
-    for i in trajet:
-        x.append(data.iloc[i, 1])
-        y.append(data.iloc[i, 2])
-        index.append(i)
+    # Récupération des coordonnées des villes pour pouvoir les afficher, en une indexation
+    index = np.asarray(trajet, dtype=np.intp)
+    coordonnees = en_instance(data).coordonnees[index]
     # Un dataframe d'une ligne par ville
-    df_res = pd.DataFrame({'Ville': index, 'x': x, 'y': y})
+    df_res = pd.DataFrame({'Ville': index, 'x': coordonnees[:, 0], 'y': coordonnees[:, 1]})
     return df_res
 
 
-def normalisation(villes: pd.DataFrame) -> pd.Series:
+def normalisation_coordonnees(coordonnees: np.ndarray) -> np.ndarray:
+    """Normalisation des coordonnées des villes dans [0,1] en conservant les proportions
+    de l'instance : la dimension la plus étendue occupe tout l'intervalle
+
+    Parameters
+    ----------
+    coordonnees : np.ndarray
+        coordonnées 2D des villes de dimension (nombre de villes, 2)
+
+    Returns
+    -------
+    np.ndarray
+        coordonnées normalisées
+    """
+    minimum = coordonnees.min(axis=0)
+    etendue = coordonnees.max(axis=0) - minimum
+    ratio = np.array((etendue[0] / etendue[1], 1))
+    ratio /= ratio.max()
+    return (coordonnees - minimum) * (ratio / etendue)
+
+
+def normalisation(villes: pd.DataFrame) -> pd.DataFrame:
     """Normalisation des coordonnées des villes afin de faciliter
-    l'apprentissage du réseau de neuronnes
+    l'apprentissage du réseau de neuronnes, voir `normalisation_coordonnees`
 
     Parameters
     ----------
@@ -101,11 +398,8 @@ def normalisation(villes: pd.DataFrame) -> pd.Series:
 
     Returns
     -------
-    Series
+    DataFrame
         Villes du dataframe normalisées
     """
-    ratio = (villes.x.max() - villes.x.min()) / \
-        (villes.y.max() - villes.y.min()), 1
-    ratio = np.array(ratio) / max(ratio)
-    norm = villes.apply(lambda c: (c - c.min()) / (c.max() - c.min()))
-    return norm.apply(lambda p: ratio * p, axis=1)
+    return pd.DataFrame(normalisation_coordonnees(villes.to_numpy(dtype=np.float64)),
+                        index=villes.index, columns=villes.columns)
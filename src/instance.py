@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+
+from src.distance import DistancesCoordonnees, fournisseur_distance, type_poids
+
+# Les villes d'une instance circulent entre les modules sous la forme d'un tableau de
+# coordonnées plutôt que d'un dataframe : les algorithmes n'utilisent que les coordonnées,
+# et l'accès à une ville d'un dataframe est lent. Le dataframe `'Ville', 'x', 'y'` reste
+# disponible pour le notebook avec `Instance.en_dataframe` et `en_instance`.
+
+
+class Instance:
+    """Instance du TSP
+
+    Les distances inter villes sont construites au premier accès à `distances` avec
+    `fournisseur_distance` : la matrice dense pour les petites instances, un
+    fournisseur de distances calculées à la demande sinon.
+
+    Parameters
+    ----------
+    coordonnees : np.ndarray
+        coordonnées 2D des villes de dimension (nombre de villes, 2), conservées en
+        `float64` contigus
+    nom : str (optionnel)
+        nom de l'instance
+    type_poids : str (optionnel)
+        type de distance TSPLIB parmi `TYPES_POIDS`
+    poids : np.ndarray (optionnel)
+        matrice des distances d'une instance `EXPLICIT`
+    dossier_cache : str (optionnel)
+        dossier de stockage des matrices denses déjà calculées
+    """
+
+    __slots__ = ('coordonnees', 'nom', 'type_poids', 'poids', 'dossier_cache', '_distances')
+
+    def __init__(self, coordonnees: np.ndarray, nom="", type_poids="EUC_2D", poids=None, dossier_cache=None):
+        self.coordonnees = np.ascontiguousarray(coordonnees, dtype=np.float64)
+        self.nom = nom
+        self.type_poids = type_poids
+        self.poids = poids
+        self.dossier_cache = dossier_cache
+        self._distances = None
+
+    def __len__(self) -> int:
+        return len(self.coordonnees)
+
+    def __reduce__(self):
+        # Les distances sont reconstruites par le destinataire plutôt que copiées
+        return (Instance, (self.coordonnees, self.nom, self.type_poids, self.poids, self.dossier_cache))
+
+    @property
+    def distances(self) -> np.ndarray | DistancesCoordonnees:
+        """Distances inter villes, construites au premier accès"""
+        if self._distances is None:
+            self._distances = fournisseur_distance(self, dossier_cache=self.dossier_cache)
+        return self._distances
+
+    def en_dataframe(self) -> pd.DataFrame:
+        """Dataframe `'Ville', 'x', 'y'` des villes, les villes étant numérotées à partir de
+        1 comme dans les fichiers .tsp et les informations de l'instance conservées
+        dans `attrs`"""
+        villes = pd.DataFrame(self.coordonnees, columns=['x', 'y'], copy=False)
+        villes.insert(0, 'Ville', np.arange(1, len(self) + 1).astype(str))
+        villes.attrs['nom'] = self.nom
+        villes.attrs['type_poids'] = self.type_poids
+        if self.poids is not None:
+            villes.attrs['poids'] = self.poids
+        return villes
+
+
+def en_instance(data: pd.DataFrame | Instance) -> Instance:
+    """Instance des villes d'un dataframe `'Ville', 'x', 'y'`, une instance étant
+    retournée telle quelle"""
+    if isinstance(data, Instance):
+        return data
+    return Instance(data[['x', 'y']].to_numpy(dtype=np.float64), data.attrs.get('nom', ''),
+                    type_poids(data), data.attrs.get('poids'))
+
+
+def distances_instance(matrice_distance) -> np.ndarray | DistancesCoordonnees:
+    """Distances inter villes d'une instance, une matrice ou un fournisseur de distances
+    étant retourné tel quel"""
+    if isinstance(matrice_distance, Instance):
+        return matrice_distance.distances
+    return matrice_distance
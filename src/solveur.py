@@ -0,0 +1,94 @@
+import pandas as pd
+
+import src.algo_2_opt
+import src.algo_3_opt
+import src.algo_genetique
+import src.algo_kohonen
+import src.algo_proche_voisin
+from src.arret import CritereArret
+from src.distance import TYPES_POIDS_EUCLIDIENS
+from src.instance import Instance, en_instance
+
+# Point d'entrée commun aux algorithmes pour une résolution à budget fixé : le temps est
+# compté dès l'appel, et le meilleur trajet trouvé est rendu lorsque le budget est épuisé.
+
+# Nom des algo résolvables sous un critère d'arrêt
+ALGORITHMES = ['2-opt', 'plus_proche_voisin', 'genetique', 'kohonen', '3-opt']
+
+
+def resoudre(algorithme: str, data: pd.DataFrame | Instance, matrice_distance=None, nom_dataset="",
+             temps_max=None, iterations_max=None, fenetre_stagnation=None, **parametres) -> pd.DataFrame:
+    """Résolution du TSP par un algorithme sous un budget de temps, d'itérations et de
+    stagnation
+
+    Parameters
+    ----------
+    algorithme : str
+        le nom de l'algorithme à utiliser parmi `ALGORITHMES`
+    data : Instance | DataFrame
+        instance ou dataframe stockant l'intégralité des coordonnées des villes à parcourir
+    matrice_distance : np.ndarray | DistancesCoordonnees (optionnel)
+        matrice stockant l'integralité des distances inter villes, par défaut les
+        distances de l'instance
+    nom_dataset : str (optionnel)
+        nom du dataset à traiter
+    temps_max : float (optionnel)
+        temps de calcul maximal en secondes
+    iterations_max : int (optionnel)
+        nombre maximal d'itérations de l'algorithme
+    fenetre_stagnation : int (optionnel)
+        nombre d'itérations sans amélioration au bout duquel on s'arrête. Une
+        construction par le plus proche voisin n'évaluant pas de trajet, elle n'y est
+        pas soumise
+    **parametres
+        paramètres optionnels transmis à la fonction `main` de l'algorithme choisi (par
+        exemple `strategie` pour le 2-opt et le 3-opt, `croisement` pour l'algorithme génétique ou
+        `taille_lot` pour l'algorithme de kohonen). Un paramètre inconnu de
+        l'algorithme lève une `TypeError`
+
+    Returns
+    -------
+    Dataframe
+        variable stockant un ensemble de variables importantes pour analyser
+        l'algorithme
+    """
+    assert algorithme in ALGORITHMES, print(
+        "Veuillez choisir un algorithme parmi : {}".format(ALGORITHMES))
+
+    data = en_instance(data)
+    if matrice_distance is None:
+        matrice_distance = data.distances
+
+    # Sans budget, chaque algorithme s'arrête sur son propre critère
+    if temps_max is None and iterations_max is None and fenetre_stagnation is None:
+        arret = None
+    else:
+        arret = CritereArret(temps_max, iterations_max, fenetre_stagnation)
+
+    if algorithme in ('2-opt', '3-opt'):
+        # Le chemin initial du plus proche voisin est compris dans le budget de temps. Les
+        # voisins ne se cherchent dans un arbre que pour des distances euclidiennes
+        if data.type_poids in TYPES_POIDS_EUCLIDIENS:
+            chemin_initial, _, _ = src.algo_proche_voisin.plus_proche_voisin_kdtree(
+                data.coordonnees)
+        else:
+            chemin_initial, _, _ = src.algo_proche_voisin.plus_proche_voisin(matrice_distance)
+    if algorithme == '2-opt':
+        parametres.setdefault('strategie', 'voisins')
+        df_res, _ = src.algo_2_opt.main(
+            matrice_distance, chemin_initial, nom_dataset, arret=arret, **parametres)
+    elif algorithme == '3-opt':
+        # Le 2-opt, le Or-opt et le 3-opt restreint se partagent le même budget
+        df_res, _ = src.algo_3_opt.main(
+            matrice_distance, chemin_initial, nom_dataset, arret=arret, **parametres)
+    elif algorithme == 'plus_proche_voisin':
+        df_res, _ = src.algo_proche_voisin.main(
+            matrice_distance, nom_dataset, arret=arret, **parametres)
+    elif algorithme == 'genetique':
+        df_res = src.algo_genetique.main(
+            data, matrice_distance, nom_dataset, arret=arret, **parametres)
+    else:
+        df_res, _ = src.algo_kohonen.main(
+            data, matrice_distance, nom_dataset, arret=arret, **parametres)
+
+    return df_res
@@ -1,29 +1,53 @@
+import contextlib
+import multiprocessing
+import os
+from collections.abc import Iterable
+
 import numpy as np
 import pandas as pd
 
 import src.algo_2_opt
+import src.algo_3_opt
 import src.algo_genetique
 import src.algo_kohonen
 import src.algo_proche_voisin
 from src.affichage_resultats import affichage, affichage_chemins_explores
-from src.distance import matrice_distance
-from src.init_test_data import data_TSPLIB
+from src.distance import TYPES_POIDS_EUCLIDIENS, fournisseur_distance
+from src.init_test_data import DOSSIER_CACHE_INSTANCES, instance_TSPLIB
 
 # Nom des data de test
 ENSEMBLE_TEST = ['dj38', 'xqf131', 'qa194', 'xqg237',
                  'pma343', 'pka379', 'pbl395', 'pbk411', 'pbn423']
 
-# Nom des algo implémentés
-ENSEMBLE_ALGOS = ['2-opt', 'plus_proche_voisin', 'genetique', 'kohonen']
+# Dossier de stockage des matrices des distances déjà calculées
+DOSSIER_CACHE_MATRICES = 'data/cache/'
+
+# Nom des algo implémentés. Les notebooks choisissent un algorithme par son index : les
+# nouveaux algorithmes sont ajoutés à la fin pour ne pas décaler les anciens
+ENSEMBLE_ALGOS = ['2-opt', 'plus_proche_voisin', 'genetique', 'kohonen', '3-opt']
+
+# Fichier des résultats du banc d'essai, complété test par test
+FICHIER_BANC_ESSAI = 'resultats/csv/banc_essai.csv'
 
+# Graines testées par défaut par le banc d'essai
+GRAINES = [0]
 
-def test_global(algorithme: str) -> pd.DataFrame:
-    """Lancement de tous les tests unitaires pour un algorithme
+# Colonnes des résultats du banc d'essai
+COLONNES_RESULTATS = ['Algorithme', 'Nom dataset', 'Graine', 'Nombre de villes', 'Solution',
+                      'Distance', 'Temps de calcul (en s)']
+
+
+def test_global(algorithme: str, nombre_processus=None, affichage_figure=True) -> pd.DataFrame:
+    """Lancement de tous les tests unitaires pour un algorithme, voir `banc_essai`
 
     Parameters
     ----------
     algo : str
-        le nom de l'algorithme à utiliser parmi `['2-opt', 'plus_proche_voisin', 'genetique', 'kohonen']`
+        le nom de l'algorithme à utiliser parmi `['2-opt', 'plus_proche_voisin', 'genetique', 'kohonen', '3-opt']`
+    nombre_processus : int (optionnel)
+        nombre de tests réalisés en parallèle, par défaut le nombre de coeurs
+    affichage_figure : bool (optionnel)
+        si vrai le chemin trouvé sur chaque jeu de données est sauvegardé au format .png
 
     Returns
     -------
@@ -31,43 +55,161 @@ def test_global(algorithme: str) -> pd.DataFrame:
         Données retourné sur l'algorithme : 
         `'Algorithme', 'Nom dataset', 'Nombre de villes', 'Solution', 'Distance', 'Temps de calcul (en s)'`
     """
-    assert algorithme in ENSEMBLE_ALGOS, print(
-        "Veuillez choisir un algorithme parmi : {}".format(ENSEMBLE_ALGOS))
+    df_resultat_test = banc_essai([algorithme], graines=[None], fichier_resultats=None,
+                                  nombre_processus=nombre_processus, affichage_figure=affichage_figure)
+    return df_resultat_test.drop(columns='Graine')
+
+
+def execution_test(test: tuple[str, str, int | None, bool]) -> pd.DataFrame:
+    """Réalisation d'un test du banc d'essai dans un processus du pool
+
+    Parameters
+    ----------
+    test : tuple
+        algorithme, nom du dataset, graine et affichage de la figure du test
+
+    Returns
+    -------
+    Dataframe
+        résultat du test, avec sa graine
+    """
+    algorithme, dataset, graine, affichage_figure = test
+    df_res, _ = test_unitaire(ENSEMBLE_TEST.index(dataset), algorithme,
+                              graine=graine, affichage_figure=affichage_figure)
+    df_res.insert(2, 'Graine', pd.array([graine], dtype='Int64'))
+    return df_res
+
+
+def tests_realises(fichier_resultats: str) -> set[tuple[str, str, int | None]]:
+    """Tests dont le résultat est déjà écrit dans le fichier de résultats
+
+    Parameters
+    ----------
+    fichier_resultats : str
+        fichier csv des résultats du banc d'essai
+
+    Returns
+    -------
+    set
+        triplets `(algorithme, dataset, graine)` des tests réalisés
+    """
+    if not os.path.exists(fichier_resultats):
+        return set()
+    resultats = pd.read_csv(fichier_resultats, usecols=['Algorithme', 'Nom dataset', 'Graine'],
+                            dtype={'Graine': 'Int64'})
+    return {(algorithme, dataset, None if pd.isna(graine) else int(graine))
+            for algorithme, dataset, graine in zip(
+                resultats['Algorithme'], resultats['Nom dataset'], resultats['Graine'])}
+
+
+def reparation_resultats(fichier_resultats: str):
+    """Suppression de la dernière ligne du fichier de résultats si elle est incomplète,
+    ce qui arrive lorsqu'un banc d'essai est interrompu pendant son écriture"""
+    if not os.path.exists(fichier_resultats):
+        return
+    with open(fichier_resultats, 'rb+') as f:
+        contenu = f.read()
+        if contenu and not contenu.endswith(b'\n'):
+            f.truncate(contenu.rfind(b'\n') + 1)
+
 
-    # Dataframe à retourner, une ligne représente un test de l'algorithme
-    df_resultat_test = pd.DataFrame({
-        # Nom de l'algorithme
-        'Algorithme': [],
-        # Nom du jeu de données
-        'Nom dataset': [],
-        # Nombre de villes du jeu de données
-        'Nombre de villes': [],
-        # Chemin le plus court trouvé
-        'Solution': [],
-        # Distance du trajet final
-        'Distance': [],
-        # Temps mis par l'algorithme pour trouver le résultat
-        'Temps de calcul (en s)': []
-    })
-    # Test sur l'ensemble des jeux de données
-    for num_dataset in range(len(ENSEMBLE_TEST)):
-        # Feeback d'avancement
-        print(f"Etape du test : {num_dataset+1}/{len(ENSEMBLE_TEST)}")
-        if algorithme == '2-opt':
-            df_res, _ = test_unitaire(num_dataset, algorithme)
-        elif algorithme == 'plus_proche_voisin':
-            df_res, _ = test_unitaire(num_dataset, algorithme)
-        elif algorithme == 'genetique':
-            df_res, _ = test_unitaire(num_dataset, algorithme)
+def ajout_resultat(fichier_resultats: str, df_res: pd.DataFrame):
+    """Ajout du résultat d'un test à la fin du fichier de résultats, écrit d'un coup
+    avec l'entête pour le premier résultat"""
+    ligne = df_res.to_csv(index=False, header=not os.path.exists(fichier_resultats) or
+                          os.path.getsize(fichier_resultats) == 0)
+    with open(fichier_resultats, 'a') as f:
+        f.write(ligne)
+
+
+def banc_essai(algorithmes=ENSEMBLE_ALGOS, datasets=ENSEMBLE_TEST, graines=GRAINES,
+               fichier_resultats=FICHIER_BANC_ESSAI, nombre_processus=None,
+               affichage_figure=False) -> pd.DataFrame:
+    """Lancement des tests de plusieurs algorithmes sur plusieurs jeux de données
+
+    Chaque triplet (algorithme, dataset, graine) est un test, les tests étant répartis
+    sur un pool de processus. Le résultat d'un test est ajouté au fichier de résultats
+    dès qu'il est terminé : un banc d'essai interrompu reprend là où il s'était arrêté,
+    les tests déjà présents dans le fichier n'étant pas relancés.
+
+    Parameters
+    ----------
+    algorithmes : list[str] (optionnel)
+        algorithmes testés parmi `ENSEMBLE_ALGOS`
+    datasets : list[str] (optionnel)
+        jeux de données parmi `ENSEMBLE_TEST`
+    graines : list[int | None] (optionnel)
+        graines du générateur de nombres aléatoires, un test par graine. None pour
+        un test non reproductible
+    fichier_resultats : str (optionnel)
+        fichier csv où sont ajoutés les résultats. Si None, les résultats ne sont
+        pas enregistrés et tous les tests sont réalisés
+    nombre_processus : int (optionnel)
+        nombre de tests réalisés en parallèle, par défaut le nombre de coeurs. Avec
+        1, les tests sont réalisés dans le processus courant
+    affichage_figure : bool (optionnel)
+        si vrai le chemin trouvé par chaque test est sauvegardé au format .png
+
+    Returns
+    -------
+    Dataframe
+        résultats de tous les tests, y compris ceux réalisés lors de lancements
+        précédents : `'Algorithme', 'Nom dataset', 'Graine', 'Nombre de villes',
+        'Solution', 'Distance', 'Temps de calcul (en s)'`
+    """
+    for algorithme in algorithmes:
+        assert algorithme in ENSEMBLE_ALGOS, print(
+            "Veuillez choisir un algorithme parmi : {}".format(ENSEMBLE_ALGOS))
+    for dataset in datasets:
+        assert dataset in ENSEMBLE_TEST, print(
+            "Veuillez choisir un dataset parmi : {}".format(ENSEMBLE_TEST))
+
+    realises = set()
+    if fichier_resultats is not None:
+        reparation_resultats(fichier_resultats)
+        realises = tests_realises(fichier_resultats)
+    tests = [(algorithme, dataset, graine, affichage_figure)
+             for algorithme in algorithmes for dataset in datasets for graine in graines
+             if (algorithme, dataset, graine) not in realises]
+    if fichier_resultats is not None:
+        os.makedirs(os.path.dirname(fichier_resultats) or '.', exist_ok=True)
+
+    if nombre_processus is None:
+        nombre_processus = os.cpu_count() or 1
+    nombre_processus = max(1, min(nombre_processus, len(tests)))
+
+    resultats = []
+    with contextlib.ExitStack() as pile:
+        if nombre_processus > 1:
+            pool = pile.enter_context(multiprocessing.Pool(nombre_processus))
+            # Les tests sur les plus grands jeux de données, plus longs, sont lancés en premier
+            termines = pool.imap_unordered(execution_test, sorted(
+                tests, key=lambda test: -ENSEMBLE_TEST.index(test[1])))
         else:
-            df_res, _ = test_unitaire(num_dataset, algorithme)
-        df_resultat_test = pd.concat(
-            [df_resultat_test, df_res], ignore_index=True)
+            termines = map(execution_test, tests)
 
-    return df_resultat_test
+        for numero, df_res in enumerate(termines, start=1):
+            # Feeback d'avancement
+            print("Etape du test : {}/{} ({} sur {})".format(
+                numero, len(tests), df_res['Algorithme'][0], df_res['Nom dataset'][0]))
+            if fichier_resultats is None:
+                resultats.append(df_res)
+            else:
+                ajout_resultat(fichier_resultats, df_res)
 
+    if fichier_resultats is not None:
+        return pd.read_csv(fichier_resultats, dtype={'Graine': 'Int64'})
+    if not resultats:
+        return pd.DataFrame(columns=COLONNES_RESULTATS)
+    # Résultats dans l'ordre des algorithmes et des jeux de données demandés
+    rang = {nom: position for position, nom in enumerate(list(algorithmes) + list(datasets))}
+    return pd.concat(resultats, ignore_index=True).sort_values(
+        ['Algorithme', 'Nom dataset', 'Graine'], ignore_index=True,
+        key=lambda colonne: colonne if colonne.name == 'Graine' else colonne.map(rang))
 
-def test_unitaire(num_dataset: int, algo: str) -> tuple[pd.DataFrame, list]:
+
+def test_unitaire(num_dataset: int, algo: str, enregistrer_exploration=False, graine=None,
+                  affichage_figure=True, **parametres) -> tuple[pd.DataFrame, Iterable]:
     """Lancement d'un test unitaire pour un algorithme
 
     Parameters
@@ -77,41 +219,62 @@ def test_unitaire(num_dataset: int, algo: str) -> tuple[pd.DataFrame, list]:
         index dans `ENSEMBLE_TEST`
     algo : str
         le nom de l'algorithme à utiliser
+    enregistrer_exploration : bool (optionnel)
+        si vrai les chemins explorés par le 2-opt, le 3-opt et le plus proche voisin
+        sont enregistrés pour être affichés
+    graine : int (optionnel)
+        graine du générateur de nombres aléatoires de l'algorithme génétique et de
+        l'algorithme de kohonen
+    affichage_figure : bool (optionnel)
+        si vrai le chemin trouvé est sauvegardé au format .png
+    **parametres
+        paramètres optionnels transmis à la fonction `main` de l'algorithme (par
+        exemple `strategie` pour le 2-opt ou `nombre_iles` pour l'algorithme génétique)
 
     Returns
     -------
     df_res : Dataframe
         Données retourné sur l'algorithme sur un jeu de données : 
         `'Algorithme', 'Nom dataset', 'Nombre de villes', 'Solution', 'Distance', 'Temps de calcul (en s)'`
-    exploration : list[list[int]] | list[np.ndarray]
+    exploration : TraceExploration | list[np.ndarray] | None
         variable stockant l'évolution de la recherche de l'algorithme
     """
     assert algo in ENSEMBLE_ALGOS, print(
         "Veuillez choisir un algorithme parmi : {}".format(ENSEMBLE_ALGOS))
 
-    # Initialisation du dataframe avec TSPLIB
-    data = data_TSPLIB(f'data/{ENSEMBLE_TEST[num_dataset]}.tsp')
+    # Initialisation de l'instance avec TSPLIB
+    data = instance_TSPLIB(f'data/{ENSEMBLE_TEST[num_dataset]}.tsp',
+                           dossier_cache=DOSSIER_CACHE_INSTANCES)
 
-    # Initialisation de la matrice des distances relatives
-    mat_distance = matrice_distance(data)
+    # Initialisation de la matrice des distances relatives (calculées à la demande
+    # pour les grandes instances)
+    mat_distance = fournisseur_distance(
+        data, dossier_cache=DOSSIER_CACHE_MATRICES)
 
-    if algo == '2-opt':
-        # On prend un chemin initial meilleur qu'un chemin aléatoire
-        chemin_initial, _, _ = src.algo_proche_voisin.plus_proche_voisin(
-            mat_distance)
-        # Lancement de l'algorithme 2-opt
-        df_res, exploration = src.algo_2_opt.main(
-            mat_distance, chemin_initial, ENSEMBLE_TEST[num_dataset])
+    if algo in ('2-opt', '3-opt'):
+        # On prend un chemin initial meilleur qu'un chemin aléatoire, construit sur
+        # les coordonnées pour ne pas parcourir la matrice des distances lorsque
+        # celles-ci sont euclidiennes
+        if data.type_poids in TYPES_POIDS_EUCLIDIENS:
+            chemin_initial, _, _ = src.algo_proche_voisin.plus_proche_voisin_kdtree(
+                data.coordonnees)
+        else:
+            chemin_initial, _, _ = src.algo_proche_voisin.plus_proche_voisin(mat_distance)
+        # Lancement du 2-opt, ou du 2-opt suivi du Or-opt et du 3-opt restreint
+        module = src.algo_2_opt if algo == '2-opt' else src.algo_3_opt
+        df_res, exploration = module.main(
+            mat_distance, chemin_initial, ENSEMBLE_TEST[num_dataset],
+            enregistrer_exploration=enregistrer_exploration, **parametres)
 
     elif algo == 'plus_proche_voisin':
         # Lancement de l'algorithme plus proche voisin
         df_res, exploration = src.algo_proche_voisin.main(
-            mat_distance, ENSEMBLE_TEST[num_dataset])
+            mat_distance, ENSEMBLE_TEST[num_dataset], enregistrer_exploration, **parametres)
 
     elif algo == 'genetique':
         # Lancement de l'algorithme génétique
         df_res = src.algo_genetique.main(
-            data, mat_distance, ENSEMBLE_TEST[num_dataset])
+            data, mat_distance, ENSEMBLE_TEST[num_dataset], graine=graine, **parametres)
         # Il n'y a pas de réelle méthode d'exploration : le fruit du hasard
         # Exploration est donc initialisée à une liste vide pour conserver le bon type
         exploration = []
@@ -119,10 +282,11 @@ def test_unitaire(num_dataset: int, algo: str) -> tuple[pd.DataFrame, list]:
     else:
         # Lancement de l'algorithme de kohonen
         df_res, exploration = src.algo_kohonen.main(
-            data, mat_distance, ENSEMBLE_TEST[num_dataset])
+            data, mat_distance, ENSEMBLE_TEST[num_dataset], graine=graine, **parametres)
 
     # Sauvegarde au format .png du chemin final trouvé
-    affichage(df_res, data, nom_fichier="{}/chemin_{}".format(algo,
-              ENSEMBLE_TEST[num_dataset]))
+    if affichage_figure:
+        affichage(df_res, data, nom_fichier="{}/chemin_{}".format(algo,
+                  ENSEMBLE_TEST[num_dataset]))
 
     return df_res, exploration
@@ -0,0 +1,116 @@
+import numpy as np
+import pytest
+
+from src.algo_2_opt import (EPSILON, chemin_ferme, deux_opt, deux_opt_balayage, deux_opt_voisins, gain,
+                            gains_inversions, inversion_cyclique)
+from src.algo_proche_voisin import plus_proche_voisin_kdtree
+from src.arret import CritereArret
+from src.distance import distance_trajet
+from src.init_test_data import instance_TSPLIB
+
+
+def deux_opt_tableau(itineraire_initial: list[int], matrice_distance: np.ndarray) -> list[int]:
+    """Version précédente de `deux_opt`, parcourant le tour dans un tableau NumPy"""
+    tour = np.array(itineraire_initial[:-1], dtype=np.intp)
+    position = np.empty(len(tour), dtype=np.intp)
+    position[tour] = np.arange(len(tour))
+    amelioration = True
+    while amelioration:
+        amelioration = False
+        for i in range(1, len(tour) - 1):
+            for j in range(i + 1, len(tour)):
+                if gain(matrice_distance, tour, i, j) > EPSILON:
+                    inversion_cyclique(tour, position, i, j)
+                    amelioration = True
+    return chemin_ferme(tour, itineraire_initial[0])
+
+
+def verification_tour(chemin: list[int], chemin_initial: list[int], matrice: np.ndarray):
+    """Le chemin est un tour fermé de toutes les villes, partant de la même ville que
+    le chemin initial et pas plus long que lui"""
+    assert sorted(chemin[:-1]) == list(range(len(matrice)))
+    assert chemin[0] == chemin[-1] == chemin_initial[0]
+    assert distance_trajet(chemin, matrice) <= distance_trajet(chemin_initial, matrice)
+
+
+def optimum_local(chemin: list[int], matrice: np.ndarray) -> bool:
+    """Vrai si aucune inversion n'améliore le chemin"""
+    tour = chemin[:-1]
+    return all(gain(matrice, tour, i, j) <= EPSILON
+               for i in range(1, len(tour) - 1) for j in range(i + 1, len(tour)))
+
+
+@pytest.mark.parametrize("nom", ['dj38', 'xqf131', 'qa194'])
+def test_deux_opt_identique_a_la_version_tableau(nom):
+    instance = instance_TSPLIB('data/{}.tsp'.format(nom))
+    matrice = instance.distances
+    chemin_initial, _, _ = plus_proche_voisin_kdtree(instance.coordonnees)
+    arret = CritereArret()
+    chemin, _, _ = deux_opt(chemin_initial, matrice, arret=arret)
+    assert chemin == deux_opt_tableau(chemin_initial, matrice)
+    # La distance mise à jour par les gains est celle du tour final
+    assert arret.meilleure_distance == pytest.approx(distance_trajet(chemin, matrice))
+
+
+@pytest.mark.parametrize("debut, fin", [(2, 5), (1, 8), (7, 2), (9, 0), (0, 9), (3, 3)])
+def test_inversion_cyclique_liste(debut, fin):
+    tableau = np.random.default_rng(0).permutation(10)
+    position = np.empty(10, dtype=np.intp)
+    position[tableau] = np.arange(10)
+    liste = tableau.tolist()
+    position_liste = position.copy()
+    inversion_cyclique(tableau, position, debut, fin)
+    inversion_cyclique(liste, position_liste, debut, fin)
+    assert liste == tableau.tolist()
+    assert np.array_equal(position_liste, position)
+
+
+@pytest.mark.parametrize("nom", ['dj38', 'xqf131', 'qa194'])
+def test_deux_opt_voisins(nom):
+    instance = instance_TSPLIB('data/{}.tsp'.format(nom))
+    matrice = instance.distances
+    chemin_initial, _, _ = plus_proche_voisin_kdtree(instance.coordonnees)
+    chemin, _, _ = deux_opt_voisins(chemin_initial, matrice)
+    verification_tour(chemin, chemin_initial, matrice)
+    # Avec toutes les villes pour voisines, les don't-look bits ne manquent aucune inversion
+    chemin, _, _ = deux_opt_voisins(chemin_initial, matrice, nombre_voisins=len(instance) - 1)
+    verification_tour(chemin, chemin_initial, matrice)
+    assert optimum_local(chemin, matrice)
+
+
+def test_deux_opt_voisins_budget():
+    instance = instance_TSPLIB('data/qa194.tsp')
+    matrice = instance.distances
+    chemin_initial, _, _ = plus_proche_voisin_kdtree(instance.coordonnees)
+    chemin, _, _ = deux_opt_voisins(chemin_initial, matrice, budget=20)
+    verification_tour(chemin, chemin_initial, matrice)
+    assert distance_trajet(chemin, matrice) > distance_trajet(deux_opt_voisins(chemin_initial, matrice)[0], matrice)
+
+
+def test_gains_inversions():
+    instance = instance_TSPLIB('data/dj38.tsp')
+    tour = np.random.default_rng(0).permutation(len(instance))
+    for i in range(1, len(tour) - 1):
+        attendus = [gain(instance.distances, tour, i, j) for j in range(i + 1, len(tour))]
+        assert gains_inversions(instance.distances, tour, i) == pytest.approx(attendus)
+
+
+@pytest.mark.parametrize("premiere_amelioration", [False, True])
+@pytest.mark.parametrize("nom", ['dj38', 'xqf131', 'qa194'])
+def test_deux_opt_balayage(nom, premiere_amelioration):
+    instance = instance_TSPLIB('data/{}.tsp'.format(nom))
+    matrice = instance.distances
+    chemin_initial, _, _ = plus_proche_voisin_kdtree(instance.coordonnees)
+    chemin, _, _ = deux_opt_balayage(chemin_initial, matrice, premiere_amelioration=premiere_amelioration)
+    verification_tour(chemin, chemin_initial, matrice)
+    assert optimum_local(chemin, matrice)
+
+
+def test_deux_opt_balayage_arret():
+    instance = instance_TSPLIB('data/qa194.tsp')
+    matrice = instance.distances
+    chemin_initial, _, _ = plus_proche_voisin_kdtree(instance.coordonnees)
+    arret = CritereArret(iterations_max=50)
+    chemin, _, _ = deux_opt_balayage(chemin_initial, matrice, arret=arret)
+    assert arret.iterations == 50
+    verification_tour(chemin, chemin_initial, matrice)
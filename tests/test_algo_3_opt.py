@@ -0,0 +1,43 @@
+import pytest
+
+from src.algo_2_opt import NOMBRE_VOISINS, deux_opt, deux_opt_voisins, liste_voisins
+from src.algo_3_opt import main, or_opt
+from src.algo_proche_voisin import plus_proche_voisin_kdtree
+from src.arret import CritereArret
+from src.distance import DistancesCoordonnees, distance_trajet
+from src.init_random_data import instance_aleatoire
+from src.init_test_data import instance_TSPLIB
+
+
+@pytest.mark.parametrize("nom", ['xqf131', 'pbn423'])
+def test_chaine_par_defaut_meilleure_que_2_opt(nom):
+    instance = instance_TSPLIB('data/{}.tsp'.format(nom))
+    chemin_initial, _, _ = plus_proche_voisin_kdtree(instance.coordonnees)
+    chemin_2_opt, _, _ = deux_opt(chemin_initial, instance.distances)
+    df_res, _ = main(instance, chemin_initial, nom)
+    assert df_res['Distance'][0] <= distance_trajet(chemin_2_opt, instance.distances)
+
+
+def test_or_opt_distances_a_la_demande():
+    instance = instance_aleatoire(3000, graine=0)
+    distances = DistancesCoordonnees(instance.coordonnees)
+    voisins = liste_voisins(distances, NOMBRE_VOISINS)
+    chemin_initial, _, _ = plus_proche_voisin_kdtree(instance.coordonnees)
+    chemin_2_opt, _, _ = deux_opt_voisins(chemin_initial, distances, voisins=voisins)
+    chemin, _, _ = or_opt(chemin_2_opt, distances, voisins=voisins)
+    assert sorted(chemin[:-1]) == list(range(3000))
+    assert chemin[0] == chemin[-1] == chemin_initial[0]
+    assert distance_trajet(chemin, distances) < distance_trajet(chemin_2_opt, distances)
+
+
+def test_budget_partage_par_la_chaine():
+    instance = instance_TSPLIB('data/pbn423.tsp')
+    chemin_initial, _, _ = plus_proche_voisin_kdtree(instance.coordonnees)
+    arret = CritereArret(iterations_max=500)
+    df_res, _ = main(instance, chemin_initial, 'pbn423', arret=arret)
+    chemin = df_res['Solution'][0]
+    assert arret.iterations == 500
+    assert sorted(chemin[:-1]) == list(range(len(instance)))
+    # La distance suivie par le critère d'arrêt est celle du tour rendu
+    assert arret.meilleure_distance == pytest.approx(df_res['Distance'][0])
+    assert df_res['Distance'][0] < distance_trajet(chemin_initial, instance.distances)
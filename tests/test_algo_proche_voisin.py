@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from src.algo_proche_voisin import plus_proche_voisin, plus_proche_voisin_kdtree
+from src.arret import CritereArret
+from src.distance import DistancesCoordonnees, matrice_distance
+from src.init_test_data import instance_TSPLIB
+from src.instance import Instance
+
+
+@pytest.mark.parametrize("nom", ['dj38', 'xqf131', 'qa194', 'pbn423'])
+def test_kdtree_identique_a_la_matrice(nom):
+    instance = instance_TSPLIB('data/{}.tsp'.format(nom))
+    attendu, _, _ = plus_proche_voisin(instance.distances)
+    assert plus_proche_voisin_kdtree(instance.coordonnees)[0] == attendu
+
+
+def test_kdtree_egalites():
+    # Sur une grille régulière les égalités sont départagées par le plus petit index
+    x, y = np.meshgrid(np.arange(12.), np.arange(9.))
+    coordonnees = np.column_stack((x.ravel(), y.ravel()))
+    coordonnees = coordonnees[np.random.default_rng(0).permutation(len(coordonnees))]
+    attendu, _, _ = plus_proche_voisin(matrice_distance(Instance(coordonnees)))
+    assert plus_proche_voisin_kdtree(coordonnees)[0] == attendu
+    assert plus_proche_voisin(DistancesCoordonnees(coordonnees))[0] == attendu
+
+
+def test_kdtree_arret():
+    coordonnees = np.random.default_rng(0).uniform(0, 1000, (500, 2))
+    arret = CritereArret(iterations_max=100)
+    itineraire, _, _ = plus_proche_voisin_kdtree(coordonnees, arret=arret)
+    assert sorted(itineraire[:-1]) == list(range(500))
+    assert itineraire[0] == itineraire[-1] == 0
+    attendu, _, _ = plus_proche_voisin_kdtree(coordonnees)
+    assert itineraire[:100] == attendu[:100]
@@ -0,0 +1,58 @@
+import pandas as pd
+import pytest
+
+# Le banc d'essai importe l'algorithme de kohonen et donc l'affichage des résultats
+pytest.importorskip("PIL")
+pytest.importorskip("plotly")
+
+# Import du module seul : ses fonctions `test_*` ne sont pas des tests pytest
+import src.test_algo  # noqa: E402
+
+ENTETE = "Algorithme,Nom dataset,Graine,Nombre de villes,Solution,Distance,Temps de calcul (en s)\n"
+
+
+def test_reparation_resultats(tmp_path):
+    fichier = tmp_path / "resultats.csv"
+    src.test_algo.reparation_resultats(str(fichier))
+    assert not fichier.exists()
+    complet = ENTETE + "plus_proche_voisin,dj38,0,38,\"[0, 1, 0]\",1.0,0.1\n"
+    fichier.write_text(complet + "plus_proche_voisin,xqf131,0,131,\"[0, 2")
+    src.test_algo.reparation_resultats(str(fichier))
+    assert fichier.read_text() == complet
+    src.test_algo.reparation_resultats(str(fichier))
+    assert fichier.read_text() == complet
+
+
+def test_tests_realises(tmp_path):
+    fichier = tmp_path / "resultats.csv"
+    assert src.test_algo.tests_realises(str(fichier)) == set()
+    fichier.write_text(ENTETE + "genetique,dj38,3,38,\"[0, 1, 0]\",1.0,0.1\n"
+                                "kohonen,qa194,,194,\"[0, 1, 0]\",1.0,0.1\n")
+    assert src.test_algo.tests_realises(str(fichier)) == {('genetique', 'dj38', 3), ('kohonen', 'qa194', None)}
+
+
+def test_reprise_banc_essai(tmp_path):
+    fichier = tmp_path / "csv" / "banc_essai.csv"
+    fichier.parent.mkdir()
+    # Un test déjà réalisé, de distance factice pour vérifier qu'il n'est pas relancé,
+    # suivi d'une ligne interrompue pendant son écriture
+    fichier.write_text(ENTETE + "plus_proche_voisin,dj38,0,38,\"[0, 1, 0]\",1.0,0.1\n"
+                                "plus_proche_voisin,xqf131,0,131,\"[0, 2")
+    resultats = src.test_algo.banc_essai(['plus_proche_voisin'], ['dj38', 'xqf131'], graines=[0],
+                                         fichier_resultats=str(fichier), nombre_processus=1)
+    assert resultats[['Nom dataset', 'Graine']].values.tolist() == [['dj38', 0], ['xqf131', 0]]
+    assert resultats['Distance'][0] == 1.0
+    assert resultats['Nombre de villes'][1] == 131
+    # Un nouveau lancement ne relance aucun test
+    relance = src.test_algo.banc_essai(['plus_proche_voisin'], ['dj38', 'xqf131'], graines=[0],
+                                       fichier_resultats=str(fichier), nombre_processus=1)
+    pd.testing.assert_frame_equal(relance, resultats)
+
+
+def test_banc_essai_sans_fichier():
+    resultats = src.test_algo.banc_essai(['plus_proche_voisin', '2-opt'], ['xqf131', 'dj38'], graines=[None],
+                                         fichier_resultats=None, nombre_processus=1)
+    # Résultats dans l'ordre des algorithmes et des jeux de données demandés
+    assert resultats[['Algorithme', 'Nom dataset']].values.tolist() == [
+        ['plus_proche_voisin', 'xqf131'], ['plus_proche_voisin', 'dj38'], ['2-opt', 'xqf131'], ['2-opt', 'dj38']]
+    assert list(resultats.columns) == src.test_algo.COLONNES_RESULTATS
@@ -0,0 +1,142 @@
+import numpy as np
+import pytest
+
+from src.distance import (DISTANCE_INFINIE_ENTIERE, TYPES_DISTANCE, DistancesCoordonnees, distance_trajet,
+                          distances_bloc, distances_trajets, matrice_distance, matrice_distance_compacte)
+from src.init_test_data import instance_TSPLIB
+
+# Instance burma14 de TSPLIB, de tour optimal publié 3323
+BURMA14 = """NAME: burma14
+TYPE: TSP
+COMMENT: 14-Staedte in Burma (Zaw Win)
+DIMENSION: 14
+EDGE_WEIGHT_TYPE: GEO
+EDGE_WEIGHT_FORMAT: FUNCTION
+DISPLAY_DATA_TYPE: COORD_DISPLAY
+NODE_COORD_SECTION
+   1  16.47       96.10
+   2  16.47       94.44
+   3  20.09       92.54
+   4  22.39       93.37
+   5  25.23       97.24
+   6  22.00       96.05
+   7  20.47       97.02
+   8  17.20       96.29
+   9  16.30       97.38
+  10  14.05       98.12
+  11  16.53       97.38
+  12  21.52       95.59
+  13  19.41       97.13
+  14  20.09       94.55
+EOF
+"""
+TOUR_OPTIMAL_BURMA14 = [1, 2, 14, 3, 4, 5, 6, 12, 7, 13, 8, 11, 9, 10, 1]
+
+
+def ecriture_instance(dossier, type_poids: str, coordonnees: list[tuple[float, float]]) -> str:
+    fichier = str(dossier / "instance.tsp")
+    with open(fichier, 'w') as f:
+        f.write("NAME: instance\nDIMENSION: {}\nEDGE_WEIGHT_TYPE: {}\nNODE_COORD_SECTION\n".format(
+            len(coordonnees), type_poids))
+        for numero, (x, y) in enumerate(coordonnees, start=1):
+            f.write("{} {} {}\n".format(numero, x, y))
+        f.write("EOF\n")
+    return fichier
+
+
+def test_burma14_geo(tmp_path):
+    fichier = tmp_path / "burma14.tsp"
+    fichier.write_text(BURMA14)
+    instance = instance_TSPLIB(str(fichier))
+    tour = [ville - 1 for ville in TOUR_OPTIMAL_BURMA14]
+    assert distance_trajet(tour, matrice_distance(instance)) == 3323
+    distances = DistancesCoordonnees(instance.coordonnees, type_poids='GEO')
+    assert distance_trajet(tour, distances) == 3323
+
+
+@pytest.mark.parametrize("type_poids, attendues", [
+    # nint(|dx| + |dy|) de la norme TSPLIB : nint(3.7), nint(1.9), nint(5.6)
+    ('MAN_2D', [4, 2, 6]),
+    # nint(max(|dx|, |dy|)) de la norme TSPLIB : nint(2.3), nint(1.6), nint(3.0)
+    ('MAX_2D', [2, 2, 3]),
+])
+def test_arrondi_man_max(tmp_path, type_poids, attendues):
+    coordonnees = [(0, 0), (1.4, 2.3), (3.0, 2.6)]
+    instance = instance_TSPLIB(ecriture_instance(tmp_path, type_poids, coordonnees))
+    matrice = matrice_distance(instance)
+    distances = DistancesCoordonnees(instance.coordonnees, type_poids=type_poids)
+    for (i, j), attendue in zip([(0, 1), (1, 2), (0, 2)], attendues):
+        assert matrice[i, j] == attendue
+        assert distances.distance(i, j) == attendue
+        assert distances[i, j] == attendue
+    assert distance_trajet([0, 1, 2, 0], matrice) == sum(attendues)
+
+
+@pytest.mark.parametrize("type_poids", ['EUC_2D', 'CEIL_2D', 'ATT', 'MAN_2D', 'MAX_2D', 'GEO'])
+def test_distance_scalaire(type_poids):
+    generateur = np.random.default_rng(0)
+    coordonnees = generateur.uniform(0, 90, (200, 2)) if type_poids == 'GEO' \
+        else generateur.uniform(0, 1e4, (200, 2))
+    distances = DistancesCoordonnees(coordonnees, type_poids=type_poids)
+    for i in range(0, 200, 7):
+        ligne = distances_bloc(coordonnees[[i]], coordonnees, type_poids)[0]
+        ligne[i] = np.Inf
+        assert [distances.distance(i, j) for j in range(200)] == ligne.tolist()
+
+
+@pytest.mark.parametrize("type_distance", ['float64', 'float32', 'nint'])
+def test_matrice_compacte(type_distance):
+    instance = instance_TSPLIB('data/xqf131.tsp')
+    attendue = matrice_distance(instance)
+    # Des blocs qui ne divisent pas le nombre de villes
+    matrice = matrice_distance_compacte(instance, type_distance, taille_bloc=50)
+    assert matrice.dtype == TYPES_DISTANCE[type_distance]
+    hors_diagonale = ~np.eye(len(instance), dtype=bool)
+    if type_distance == 'nint':
+        assert np.array_equal(matrice[hors_diagonale], np.floor(attendue[hors_diagonale] + 0.5))
+        assert (np.diag(matrice) == DISTANCE_INFINIE_ENTIERE).all()
+    else:
+        assert np.array_equal(matrice[hors_diagonale], attendue[hors_diagonale].astype(matrice.dtype))
+        assert np.isinf(np.diag(matrice)).all()
+
+
+@pytest.mark.parametrize("type_distance", ['float64', 'float32', 'nint'])
+def test_matrice_compacte_cache(tmp_path, type_distance):
+    instance = instance_TSPLIB('data/dj38.tsp')
+    calculee = matrice_distance_compacte(instance, type_distance, dossier_cache=str(tmp_path))
+    assert len(list(tmp_path.iterdir())) == 1
+    relue = matrice_distance_compacte(instance, type_distance, dossier_cache=str(tmp_path))
+    assert isinstance(relue, np.memmap)
+    assert relue.dtype == TYPES_DISTANCE[type_distance]
+    assert np.array_equal(relue, calculee)
+    assert np.array_equal(relue, matrice_distance_compacte(instance, type_distance))
+    # Une autre instance ou un autre type de stockage ne relit pas la même matrice
+    autre = matrice_distance_compacte(instance_TSPLIB('data/xqf131.tsp'), type_distance,
+                                      dossier_cache=str(tmp_path))
+    assert autre.shape == (131, 131)
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+@pytest.mark.parametrize("taille_bloc", [1, 100, 1 << 20])
+@pytest.mark.parametrize("type_distance", ['float64', 'nint', 'coordonnees'])
+def test_distances_trajets(type_distance, taille_bloc):
+    instance = instance_TSPLIB('data/qa194.tsp')
+    if type_distance == 'coordonnees':
+        matrice = DistancesCoordonnees(instance.coordonnees)
+    else:
+        matrice = matrice_distance_compacte(instance, type_distance)
+    generateur = np.random.default_rng(0)
+    trajets = np.array([generateur.permutation(len(instance)) for _ in range(25)])
+    trajets = np.column_stack((trajets, trajets[:, 0]))
+    distances = distances_trajets(trajets, matrice, taille_bloc=taille_bloc)
+    for trajet, distance in zip(trajets.tolist(), distances):
+        # Somme arête par arête, sans passer par l'évaluation groupée
+        attendue = sum(float(matrice[a, b]) for a, b in zip(trajet, trajet[1:]))
+        assert distance == pytest.approx(attendue)
+        assert distance == pytest.approx(distance_trajet(trajet, matrice))
+
+
+def test_distances_trajets_entiers_sans_debordement():
+    # La somme d'un trajet d'une matrice `nint` dépasse le plus grand entier 32 bits
+    matrice = np.full((4, 4), 2**30, dtype=np.int32)
+    assert distances_trajets(np.array([[0, 1, 2, 3, 0]]), matrice)[0] == 4 * 2**30
@@ -0,0 +1,55 @@
+import pytest
+
+import src.algo_2_opt
+import src.algo_3_opt
+import src.algo_proche_voisin
+from src.algo_proche_voisin import plus_proche_voisin_kdtree
+from src.distance import distance_trajet
+from src.init_test_data import instance_TSPLIB
+
+
+@pytest.fixture(scope="module")
+def instance():
+    return instance_TSPLIB('data/xqf131.tsp')
+
+
+def verification_trace(trace, solution, matrice):
+    """La trace rejoue des tours complets de longueur décroissante jusqu'à la solution"""
+    chemins = list(trace)
+    assert len(chemins) == len(trace) > 1
+    distances = [distance_trajet(chemin, matrice) for chemin in chemins]
+    for chemin in chemins:
+        assert sorted(chemin[:-1]) == list(range(len(matrice)))
+        assert chemin[0] == chemin[-1]
+    assert all(apres <= avant + 1e-6 for avant, apres in zip(distances, distances[1:]))
+    assert chemins[-1] == solution
+
+
+@pytest.mark.parametrize("strategie", list(src.algo_2_opt.STRATEGIES))
+def test_trace_2_opt(instance, strategie):
+    chemin_initial, _, _ = plus_proche_voisin_kdtree(instance.coordonnees)
+    df_res, trace = src.algo_2_opt.main(instance.distances, chemin_initial, strategie=strategie,
+                                        enregistrer_exploration=True)
+    assert list(trace)[0] == chemin_initial
+    verification_trace(trace, df_res['Solution'][0], instance.distances)
+
+
+def test_trace_3_opt(instance):
+    chemin_initial, _, _ = plus_proche_voisin_kdtree(instance.coordonnees)
+    df_res, trace = src.algo_3_opt.main(instance.distances, chemin_initial, enregistrer_exploration=True)
+    verification_trace(trace, df_res['Solution'][0], instance.distances)
+
+
+def test_trace_plus_proche_voisin(instance):
+    df_res, trace = src.algo_proche_voisin.main(instance.distances, enregistrer_exploration=True)
+    chemins = list(trace)
+    # Une ville de plus à chaque chemin enregistré, le dernier chemin n'étant pas refermé
+    for avant, apres in zip(chemins, chemins[1:]):
+        assert apres[:-1] == avant
+    assert chemins[-1] + [chemins[-1][0]] == df_res['Solution'][0]
+
+
+def test_trace_desactivee(instance):
+    chemin_initial, _, _ = plus_proche_voisin_kdtree(instance.coordonnees)
+    _, trace = src.algo_2_opt.main(instance.distances, chemin_initial)
+    assert trace is None
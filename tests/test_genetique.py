@@ -0,0 +1,112 @@
+import numpy as np
+import pytest
+
+from src.algo_genetique import (CROISEMENTS, MUTATIONS, evaluation, generation, init_population,
+                                init_population_plus_proche_voisin, main, mutation_possible, selection)
+from src.algo_proche_voisin import plus_proche_voisin, plus_proche_voisin_kdtree
+from src.arret import CritereArret
+from src.distance import distance_trajet, matrice_distance_compacte
+from src.init_test_data import instance_TSPLIB
+from src.instance import Instance
+
+
+def instance_geo() -> Instance:
+    # Villes réparties sur tout le globe, pour lesquelles les plus proches voisins
+    # géographiques diffèrent de ceux des coordonnées vues comme des points du plan
+    generateur = np.random.default_rng(0)
+    coordonnees = np.column_stack((generateur.uniform(-80, 80, 60), generateur.uniform(-179, 179, 60)))
+    return Instance(coordonnees, nom="geo60", type_poids='GEO')
+
+
+def test_init_plus_proche_voisin_geo():
+    instance = instance_geo()
+    matrice = instance.distances
+    attendu, _, _ = plus_proche_voisin(matrice)
+    assert attendu != plus_proche_voisin_kdtree(instance.coordonnees)[0]
+
+    population, distances = init_population_plus_proche_voisin(
+        10, instance, matrice, np.random.default_rng(0))
+    assert population[0].tolist() == attendu
+    assert distances[0] == distance_trajet(attendu, matrice)
+    df_res = main(instance, initialisation='plus_proche_voisin', nombre_epoch=5, graine=0)
+    assert df_res['Distance'][0] <= distance_trajet(attendu, matrice)
+
+
+def test_mode_iles():
+    instance = instance_TSPLIB('data/dj38.tsp')
+    arret = CritereArret(iterations_max=15)
+    df_res = main(instance, nombre_iles=2, initialisation='plus_proche_voisin', nombre_raffines=1,
+                  intervalle_migration=5, graine=0, arret=arret)
+    solution = df_res['Solution'][0]
+    assert sorted(solution[:-1]) == list(range(len(instance)))
+    assert solution[0] == solution[-1]
+    assert df_res['Distance'][0] == pytest.approx(min(df_res['Distance par île'][0]))
+    assert len(df_res['Distance initiale par île'][0]) == 2
+
+
+@pytest.mark.parametrize("mutation", list(MUTATIONS))
+@pytest.mark.parametrize("initialisation", ['aleatoire', 'plus_proche_voisin'])
+def test_quatre_villes(mutation, initialisation):
+    # Le cadre de mutation d'un trajet de 4 villes ne contient qu'une position
+    instance = Instance(np.random.default_rng(0).uniform(0, 10, (4, 2)))
+    assert not mutation_possible(np.zeros((1, 5), dtype=np.int32))
+    df_res = main(instance, nombre_epoch=5, initialisation=initialisation, mutation=mutation,
+                  graine=0, verification=True)
+    solution = df_res['Solution'][0]
+    assert sorted(solution[:-1]) == list(range(4))
+    assert df_res['Distance'][0] == pytest.approx(distance_trajet(solution, instance.distances))
+
+
+def aretes(trajet) -> set[frozenset]:
+    """Arêtes non orientées d'un tour"""
+    return {frozenset(arete) for arete in zip(trajet, np.roll(trajet, -1))}
+
+
+@pytest.mark.parametrize("croisement", list(CROISEMENTS))
+@pytest.mark.parametrize("nombre_villes", [2, 5, 38, 131])
+def test_croisements_permutations(croisement, nombre_villes):
+    generateur = np.random.default_rng(0)
+    parents_a = np.array([generateur.permutation(nombre_villes) for _ in range(200)], dtype=np.int32)
+    parents_b = np.array([generateur.permutation(nombre_villes) for _ in range(200)], dtype=np.int32)
+    enfants = CROISEMENTS[croisement](parents_a, parents_b, generateur)
+    assert enfants.shape == parents_a.shape
+    assert enfants.dtype == parents_a.dtype
+    assert (np.sort(enfants, axis=1) == np.arange(nombre_villes)).all()
+
+
+@pytest.mark.parametrize("croisement", list(CROISEMENTS))
+def test_croisements_parents_identiques(croisement):
+    # Avec deux parents identiques l'enfant ne contient que les arêtes des parents
+    generateur = np.random.default_rng(0)
+    parents = np.array([generateur.permutation(38) for _ in range(50)], dtype=np.int32)
+    enfants = CROISEMENTS[croisement](parents, parents.copy(), generateur)
+    for parent, enfant in zip(parents, enfants):
+        assert aretes(enfant) == aretes(parent)
+
+
+@pytest.mark.parametrize("mutation", list(MUTATIONS))
+@pytest.mark.parametrize("type_distance", ['float64', 'nint'])
+def test_variation_mutation(mutation, type_distance):
+    instance = instance_TSPLIB('data/xqf131.tsp')
+    matrice = matrice_distance_compacte(instance, type_distance)
+    generateur = np.random.default_rng(0)
+    population, distances = init_population(300, instance, matrice, generateur)
+    for _ in range(5):
+        distances += MUTATIONS[mutation](population, matrice, generateur)
+        assert (np.sort(population[:, :-1], axis=1) == np.arange(len(instance))).all()
+        assert (population[:, 0] == population[:, -1]).all()
+        assert distances == pytest.approx(evaluation(population, matrice))
+
+
+@pytest.mark.parametrize("mutation", list(MUTATIONS))
+@pytest.mark.parametrize("croisement", list(CROISEMENTS))
+def test_generation_distances_mises_a_jour(croisement, mutation):
+    instance = instance_TSPLIB('data/dj38.tsp')
+    matrice = instance.distances
+    generateur = np.random.default_rng(0)
+    population, distances = init_population(100, instance, matrice, generateur)
+    for _ in range(10):
+        nombre_selectionne = selection(population, distances, 0.5)
+        # `verification` compare les distances mises à jour aux distances recalculées
+        generation(population, distances, nombre_selectionne, 0.5, matrice, generateur,
+                   croisement=croisement, mutation=mutation, verification=True)
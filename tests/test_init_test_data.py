@@ -0,0 +1,105 @@
+import os
+
+import numpy as np
+import pytest
+
+from src.distance import empreinte_instance, matrice_distance
+from src.init_random_data import instance_aleatoire
+import src.init_test_data
+from src.init_test_data import ecriture_TSPLIB, instance_TSPLIB, instance_TSPLIB_cache
+
+
+@pytest.mark.parametrize("extension", ['.tsp', '.tsp.gz'])
+def test_ecriture_lecture_sans_perte(tmp_path, extension):
+    instance = instance_aleatoire(500, graine=0)
+    fichier = str(tmp_path / ("uniforme500" + extension))
+    ecriture_TSPLIB(instance, fichier)
+    relue = instance_TSPLIB(fichier)
+    assert np.array_equal(relue.coordonnees, instance.coordonnees)
+    assert np.array_equal(matrice_distance(relue), matrice_distance(instance))
+    assert empreinte_instance(relue.coordonnees, 'float64') == \
+        empreinte_instance(instance.coordonnees, 'float64')
+
+
+@pytest.mark.parametrize("format_poids", ['FULL_MATRIX', 'UPPER_ROW', 'LOWER_DIAG_ROW'])
+def test_lecture_explicit(tmp_path, format_poids):
+    generateur = np.random.default_rng(0)
+    dimension = 7
+    matrice = np.triu(generateur.integers(1, 100, (dimension, dimension)), 1)
+    matrice = matrice + matrice.T
+    if format_poids == 'FULL_MATRIX':
+        poids = matrice.ravel()
+    elif format_poids == 'UPPER_ROW':
+        poids = matrice[np.triu_indices(dimension, 1)]
+    else:
+        poids = matrice[np.tril_indices(dimension)]
+    # Les distances sont réparties sur les lignes sans suivre les lignes de la matrice
+    lignes = [" ".join(map(str, poids[i:i + 4])) for i in range(0, len(poids), 4)]
+    fichier = tmp_path / "explicit7.tsp"
+    fichier.write_text("NAME : explicit7\nDIMENSION: {}\nEDGE_WEIGHT_TYPE : EXPLICIT\n"
+                       "EDGE_WEIGHT_FORMAT: {}\nEDGE_WEIGHT_SECTION\n{}\n"
+                       "TOUR_SECTION\n1 2 3 4 5 6 7 -1\nEOF\n".format(dimension, format_poids, "\n".join(lignes)))
+    instance = instance_TSPLIB(str(fichier))
+    assert instance.nom == "explicit7"
+    assert np.array_equal(instance.poids, matrice)
+    assert np.isnan(instance.coordonnees).all()
+
+
+def test_lecture_par_blocs(tmp_path, monkeypatch):
+    # Des blocs de quelques lignes seulement pour traverser de nombreuses frontières de blocs
+    monkeypatch.setattr('src.init_test_data.TAILLE_BLOC_LIGNES', 3)
+    instance = instance_aleatoire(100, graine=0)
+    fichier = str(tmp_path / "uniforme100.tsp")
+    ecriture_TSPLIB(instance, fichier)
+    assert np.array_equal(instance_TSPLIB(fichier).coordonnees, instance.coordonnees)
+
+
+def lecture_interdite(fichier, dossier_cache=None):
+    raise AssertionError("Le fichier {} est relu au lieu de sa copie binaire".format(fichier))
+
+
+def test_cache_instance(tmp_path, monkeypatch):
+    fichier = str(tmp_path / "uniforme200.tsp")
+    ecriture_TSPLIB(instance_aleatoire(200, graine=0), fichier)
+    dossier_cache = str(tmp_path / "cache")
+    lue = instance_TSPLIB(fichier)
+    premiere = instance_TSPLIB(fichier, dossier_cache)
+    assert np.array_equal(premiere.coordonnees, lue.coordonnees)
+
+    # Les lectures suivantes ne relisent pas le texte, même si le fichier a été touché
+    monkeypatch.setattr(src.init_test_data, 'instance_TSPLIB', lecture_interdite)
+    os.utime(fichier, ns=(0, 0))
+    for _ in range(2):
+        relue = instance_TSPLIB_cache(fichier, dossier_cache)
+        # Les coordonnées sont une vue du fichier projeté en mémoire, sans copie
+        assert isinstance(relue.coordonnees.base, np.memmap)
+        assert np.array_equal(relue.coordonnees, lue.coordonnees)
+        assert (relue.nom, relue.type_poids) == (lue.nom, lue.type_poids)
+    # La copie sur écriture ne modifie pas le cache
+    relue.coordonnees[0] = -1
+    assert np.array_equal(instance_TSPLIB_cache(fichier, dossier_cache).coordonnees, lue.coordonnees)
+
+
+def test_cache_instance_modifiee(tmp_path):
+    fichier = str(tmp_path / "uniforme.tsp")
+    dossier_cache = str(tmp_path / "cache")
+    ecriture_TSPLIB(instance_aleatoire(200, graine=0), fichier)
+    instance_TSPLIB(fichier, dossier_cache)
+    # Un contenu différent invalide le cache, même à date de modification identique
+    ecriture_TSPLIB(instance_aleatoire(200, graine=1), fichier)
+    os.utime(fichier, ns=(0, 0))
+    attendue = instance_aleatoire(200, graine=1)
+    assert np.array_equal(instance_TSPLIB(fichier, dossier_cache).coordonnees, attendue.coordonnees)
+
+
+def test_cache_instance_explicit(tmp_path):
+    fichier = tmp_path / "explicit4.tsp"
+    fichier.write_text("NAME: explicit4\nDIMENSION: 4\nEDGE_WEIGHT_TYPE: EXPLICIT\n"
+                       "EDGE_WEIGHT_FORMAT: UPPER_ROW\nEDGE_WEIGHT_SECTION\n1 2 3\n4 5\n6\nEOF\n")
+    dossier_cache = str(tmp_path / "cache")
+    lue = instance_TSPLIB(str(fichier))
+    instance_TSPLIB(str(fichier), dossier_cache)
+    relue = instance_TSPLIB(str(fichier), dossier_cache)
+    assert relue.type_poids == 'EXPLICIT'
+    assert isinstance(relue.poids, np.memmap)
+    assert np.array_equal(relue.poids, lue.poids)
@@ -0,0 +1,54 @@
+import pickle
+
+import numpy as np
+
+from src.distance import TAILLE_MAX_MATRICE_DENSE, DistancesCoordonnees, matrice_distance
+from src.init_random_data import instance_aleatoire
+from src.init_test_data import instance_TSPLIB
+from src.instance import Instance, distances_instance, en_instance
+
+
+def test_distances_construites_au_premier_acces():
+    instance = instance_TSPLIB('data/dj38.tsp')
+    assert instance._distances is None
+    distances = instance.distances
+    assert instance.distances is distances
+    assert np.array_equal(distances, matrice_distance(instance))
+    assert distances_instance(instance) is distances
+    assert distances_instance(distances) is distances
+    # Au delà de la taille maximale de la matrice dense, les distances sont calculées à la demande
+    grande = instance_aleatoire(TAILLE_MAX_MATRICE_DENSE + 1, graine=0)
+    assert isinstance(grande.distances, DistancesCoordonnees)
+
+
+def test_pickle_sans_distances():
+    instance = instance_TSPLIB('data/qa194.tsp')
+    instance.distances
+    donnees = pickle.dumps(instance)
+    # Seules les coordonnées sont transmises, pas la matrice des distances
+    assert len(donnees) < instance.distances.nbytes / 10
+    copie = pickle.loads(donnees)
+    assert copie._distances is None
+    assert np.array_equal(copie.coordonnees, instance.coordonnees)
+    assert (copie.nom, copie.type_poids, copie.poids) == (instance.nom, instance.type_poids, None)
+    assert np.array_equal(copie.distances, instance.distances)
+
+
+def test_conversion_dataframe():
+    instance = instance_TSPLIB('data/xqf131.tsp')
+    villes = instance.en_dataframe()
+    assert list(villes.columns) == ['Ville', 'x', 'y']
+    assert villes['Ville'].tolist() == [str(ville) for ville in range(1, len(instance) + 1)]
+    relue = en_instance(villes)
+    assert np.array_equal(relue.coordonnees, instance.coordonnees)
+    assert (relue.nom, relue.type_poids) == (instance.nom, instance.type_poids)
+    assert en_instance(instance) is instance
+
+
+def test_conversion_dataframe_explicit():
+    poids = np.array([[0, 3, 4], [3, 0, 5], [4, 5, 0]], dtype=np.float64)
+    instance = Instance(np.full((3, 2), np.nan), "explicit3", 'EXPLICIT', poids)
+    relue = en_instance(instance.en_dataframe())
+    assert relue.type_poids == 'EXPLICIT'
+    assert np.array_equal(relue.poids, poids)
+    assert relue.distances[0, 2] == 4
@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+
+# L'algorithme de kohonen importe l'affichage des résultats
+pytest.importorskip("PIL")
+pytest.importorskip("plotly")
+
+from src.algo_kohonen import (carte_auto_adaptatives, carte_auto_adaptatives_lots, chemin_final,  # noqa: E402
+                             creation_reseau, main, reechantillonnage, tranches_cycliques)
+from src.arret import CritereArret  # noqa: E402
+from src.distance import distance_trajet  # noqa: E402
+from src.init_test_data import instance_TSPLIB  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def instance():
+    return instance_TSPLIB('data/dj38.tsp')
+
+
+def verification_tour(itineraire: list[int], nombre_villes: int):
+    assert sorted(itineraire[:-1]) == list(range(nombre_villes))
+    assert itineraire[0] == itineraire[-1]
+
+
+def test_apprentissage_sur_coordonnees(instance):
+    itineraire, _, evolution_reseau = carte_auto_adaptatives(instance, 3000, graine=0)
+    verification_tour(itineraire, len(instance))
+    # Une instance ou le dataframe équivalent donnent le même apprentissage
+    assert carte_auto_adaptatives(instance.en_dataframe(), 3000, graine=0)[0] == itineraire
+    # Les sauvegardes sont des copies du réseau, pas le tableau mis à jour en place
+    assert len(evolution_reseau) == 2
+    assert all(reseau.shape == (8 * len(instance), 2) for reseau in evolution_reseau)
+    assert not np.array_equal(evolution_reseau[0], evolution_reseau[1])
+
+
+def test_main(instance):
+    df_res, _ = main(instance, nom_dataset='dj38', graine=0)
+    itineraire = df_res['Solution'][0]
+    verification_tour(itineraire, len(instance))
+    assert df_res['Distance'][0] == pytest.approx(distance_trajet(itineraire, instance.distances))
+    assert main(instance, graine=0)[0]['Solution'][0] == itineraire
+
+
+@pytest.mark.parametrize("nombre_neurones", [1, 7, 16])
+def test_tranches_cycliques(nombre_neurones):
+    neurones = np.arange(nombre_neurones)
+    for debut in range(-2 * nombre_neurones, 2 * nombre_neurones):
+        for longueur in range(1, nombre_neurones + 1):
+            portion = np.empty(longueur, dtype=np.intp)
+            for tranche_neurones, tranche_portion in tranches_cycliques(debut, longueur, nombre_neurones):
+                portion[tranche_portion] = neurones[tranche_neurones]
+            assert portion.tolist() == [(debut + k) % nombre_neurones for k in range(longueur)]
+
+
+def test_fenetre_couvrant_le_cycle(instance):
+    # Une fenêtre plus large que le cycle met à jour tous les neurones, comme sans fenêtre
+    complet, _, evolution_complet = carte_auto_adaptatives(instance, 20000, graine=0, largeur_fenetre=None)
+    fenetre, _, evolution_fenetre = carte_auto_adaptatives(instance, 20000, graine=0, largeur_fenetre=1e6)
+    assert fenetre == complet
+    for reseau_complet, reseau_fenetre in zip(evolution_complet, evolution_fenetre):
+        assert np.allclose(reseau_fenetre, reseau_complet)
+
+
+def test_fenetre_par_defaut(instance):
+    # Les poids négligés hors de la fenêtre ne dégradent pas le trajet
+    complet, _, _ = carte_auto_adaptatives(instance, 100000, graine=0, largeur_fenetre=None)
+    fenetre, _, _ = carte_auto_adaptatives(instance, 100000, graine=0)
+    verification_tour(fenetre, len(instance))
+    assert distance_trajet(fenetre, instance.distances) <= 1.05 * distance_trajet(complet, instance.distances)
+
+
+def test_assignation_kdtree():
+    generateur = np.random.default_rng(0)
+    villes = generateur.random((500, 2))
+    for taille in (50, 4000):
+        neurones = creation_reseau(taille, generateur)
+        assert chemin_final(villes, neurones, 'kdtree') == chemin_final(villes, neurones, 'exhaustive')
+    # Plusieurs villes d'un même neurone gardent l'ordre de leurs index
+    assert chemin_final(villes, np.array([[0.5, 0.5]]), 'kdtree') == list(range(500)) + [0]
+
+
+def test_recherche_gagnant_kdtree(instance):
+    # La recherche du gagnant parmi les candidats de l'arbre est approchée
+    exhaustive, _, _ = carte_auto_adaptatives(instance, 100000, graine=0)
+    kdtree, _, _ = carte_auto_adaptatives(instance, 100000, graine=0, recherche_gagnant='kdtree')
+    verification_tour(kdtree, len(instance))
+    assert distance_trajet(kdtree, instance.distances) <= 1.05 * distance_trajet(exhaustive, instance.distances)
+
+
+@pytest.mark.parametrize("taille_lot", [16, 1000])
+def test_apprentissage_par_lots(instance, taille_lot):
+    # Au delà du nombre de villes, toutes les villes sont présentées à chaque lot
+    itineraire, _, _ = carte_auto_adaptatives_lots(instance, 100000, taille_lot, graine=0)
+    verification_tour(itineraire, len(instance))
+    assert carte_auto_adaptatives_lots(instance, 100000, taille_lot, graine=0)[0] == itineraire
+
+
+def test_apprentissage_par_lots_qualite(instance):
+    en_ligne, _, _ = carte_auto_adaptatives(instance, 100000, graine=0)
+    par_lots, _, _ = carte_auto_adaptatives_lots(instance, 100000, 16, graine=0)
+    assert distance_trajet(par_lots, instance.distances) <= 1.05 * distance_trajet(en_ligne, instance.distances)
+
+
+def test_apprentissage_par_lots_arret(instance):
+    # Une itération du critère d'arrêt par lot, le meilleur trajet évalué est rendu
+    arret = CritereArret(iterations_max=50)
+    itineraire, _, _ = carte_auto_adaptatives_lots(instance, 100000, 16, graine=0, arret=arret,
+                                                   matrice_distance=instance.distances)
+    assert arret.iterations == 50
+    verification_tour(itineraire, len(instance))
+    df_res, _ = main(instance, graine=0, taille_lot=16, arret=CritereArret(iterations_max=50))
+    assert df_res['Solution'][0] == itineraire
+
+
+def test_reechantillonnage():
+    neurones = creation_reseau(64, np.random.default_rng(0))
+    assert np.array_equal(reechantillonnage(neurones, 64), neurones)
+    # En doublant le réseau, les anciens neurones sont conservés et les nouveaux sont
+    # au milieu de leurs voisins dans le cycle
+    double = reechantillonnage(neurones, 128)
+    assert np.allclose(double[::2], neurones)
+    assert np.allclose(double[1::2], (neurones + np.roll(neurones, -1, axis=0)) / 2)
+    assert reechantillonnage(neurones, 100).shape == (100, 2)
+
+
+def test_croissance(instance):
+    fixe, _, _ = carte_auto_adaptatives(instance, 100000, graine=0)
+    croissance, _, evolution_reseau = carte_auto_adaptatives(instance, 100000, graine=0, croissance=True)
+    verification_tour(croissance, len(instance))
+    tailles = [len(reseau) for reseau in evolution_reseau]
+    assert tailles[0] < tailles[-1] == 8 * len(instance)
+    assert tailles == sorted(tailles)
+    assert distance_trajet(croissance, instance.distances) <= 1.05 * distance_trajet(fixe, instance.distances)
@@ -0,0 +1,48 @@
+import time
+
+import pytest
+
+# Le solveur importe l'algorithme de kohonen et donc l'affichage des résultats
+pytest.importorskip("PIL")
+pytest.importorskip("plotly")
+
+from src.init_random_data import instance_aleatoire  # noqa: E402
+from src.init_test_data import instance_TSPLIB  # noqa: E402
+from src.solveur import resoudre  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def instance():
+    return instance_TSPLIB('data/dj38.tsp')
+
+
+def test_parametres_transmis_au_kohonen(instance):
+    par_lots = resoudre('kohonen', instance, graine=0, taille_lot=16)
+    en_ligne = resoudre('kohonen', instance, graine=0)
+    assert par_lots['Distance'][0] != en_ligne['Distance'][0]
+
+
+def test_parametres_transmis_au_plus_proche_voisin(instance):
+    df_res = resoudre('plus_proche_voisin', instance, enregistrer_exploration=True)
+    assert df_res['Nombre de villes'][0] == len(instance)
+
+
+def test_parametre_inconnu(instance):
+    with pytest.raises(TypeError):
+        resoudre('plus_proche_voisin', instance, taille_lot=16)
+
+
+def test_trois_opt_sous_budget(instance):
+    sans_budget = resoudre('3-opt', instance)
+    sous_budget = resoudre('3-opt', instance, iterations_max=20)
+    assert sorted(sous_budget['Solution'][0][:-1]) == list(range(len(instance)))
+    assert sous_budget['Distance'][0] >= sans_budget['Distance'][0]
+
+
+def test_kohonen_respecte_le_temps_max():
+    grande_instance = instance_aleatoire(10000, graine=0)
+    debut = time.time()
+    df_res = resoudre('kohonen', grande_instance, graine=0, temps_max=1)
+    # L'assignation finale des villes aux neurones est comprise dans le budget
+    assert time.time() - debut < 1.5
+    assert sorted(df_res['Solution'][0][:-1]) == list(range(10000))